@@ -71,13 +71,16 @@ def _detect_from_script_location(script_path: Optional[Path] = None) -> Optional
     if script_path is None:
         # Try to get the caller's __file__ from the call stack
         # This handles cases where bazinga_paths is imported
-        import inspect
-        for frame_info in inspect.stack():
-            frame_file = frame_info.filename
+        # Walk raw frames: inspect.stack() reads source context for every
+        # frame, which dominated CLI startup time.
+        frame = sys._getframe()
+        while frame is not None:
+            frame_file = frame.f_code.co_filename
             # Skip this module and standard library
             if 'bazinga_paths' not in frame_file and 'importlib' not in frame_file:
                 script_path = Path(frame_file).resolve()
                 break
+            frame = frame.f_back
 
     if script_path is None:
         return None
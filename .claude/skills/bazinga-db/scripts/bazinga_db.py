@@ -12,16 +12,141 @@ Path Resolution:
     If none provided, auto-detects by walking up from script location or CWD.
 """
 
+import contextlib
+import io
 import sqlite3
 import json
 import sys
+import threading
 import time
 import re
 import random
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Tuple, Union
-import argparse
+from types import SimpleNamespace
+from typing import Optional, List, Dict, Any, Tuple, Union, Iterator, TextIO
+
+
+# Optional fast JSON codec (same pattern as fcntl/msvcrt below)
+# orjson is several times faster than stdlib json for large state/skill payloads
+# and CLI output. Both codecs produce plain JSON text, so stored columns stay
+# readable by the dashboards either way. orjson.JSONDecodeError subclasses
+# json.JSONDecodeError, so existing except clauses keep working.
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+_NON_ASCII_RE = re.compile(r'[^\x00-\x7f]')
+
+
+def _escape_non_ascii_char(match: re.Match) -> str:
+    code = ord(match.group())
+    if code > 0xFFFF:
+        # Outside the BMP: UTF-16 surrogate pair, as json.dumps writes it
+        code -= 0x10000
+        return '\\u%04x\\u%04x' % (0xD800 | (code >> 10), 0xDC00 | (code & 0x3FF))
+    return '\\u%04x' % code
+
+
+def _ascii_json(text: str) -> str:
+    """Escape non-ASCII characters in JSON text as \\uXXXX (like ensure_ascii=True).
+
+    CLI output keeps the stdlib's ASCII-only contract, so it prints on any
+    stdout encoding. Non-ASCII can only occur inside JSON strings, where the
+    escape is equivalent.
+    """
+    if text.isascii():
+        return text
+    return _NON_ASCII_RE.sub(_escape_non_ascii_char, text)
+
+
+def _stdlib_json_dumps(obj: Any, pretty: bool = False) -> str:
+    """Serialize obj with the stdlib json module (the reference format)."""
+    if pretty:
+        return json.dumps(obj, indent=2)
+    # Compact UTF-8, byte-for-byte like orjson: no ", "/": " padding or
+    # \uXXXX escapes in stored state/skill payloads
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+
+
+if HAS_ORJSON:
+    # OPT_NON_STR_KEYS: get_token_summary(by='agent_id') can have a None key
+    _ORJSON_OPTS = orjson.OPT_NON_STR_KEYS
+    # Integers of 19+ digits may be outside orjson's 64-bit range; maps every
+    # byte to '0' (digit) or ' ' so one bytes.find() spots such a run
+    _DIGIT_MASK = bytes(0x30 if 0x30 <= c <= 0x39 else 0x20 for c in range(256))
+    _LONG_DIGIT_RUN = b'0' * 19
+
+    def _json_dumps(obj: Any, pretty: bool = False) -> str:
+        """Serialize obj to a JSON string.
+
+        pretty is the CLI output format: 2-space indent, ASCII-only like
+        json.dumps(indent=2). Otherwise compact UTF-8 (stored payloads).
+
+        Values orjson cannot write exactly go through the stdlib instead, so
+        the result never depends on whether orjson is installed: integers
+        beyond 64 bits (orjson raises) and NaN/Infinity (orjson writes null,
+        so any output containing null is re-checked by the stdlib).
+        """
+        option = _ORJSON_OPTS | orjson.OPT_INDENT_2 if pretty else _ORJSON_OPTS
+        try:
+            data = orjson.dumps(obj, option=option)
+        except TypeError:
+            return _stdlib_json_dumps(obj, pretty)
+        if b'null' in data:
+            return _stdlib_json_dumps(obj, pretty)
+        text = data.decode('utf-8')
+        return _ascii_json(text) if pretty else text
+
+    def _json_loads(text: Union[str, bytes]) -> Any:
+        """Parse JSON text, exactly as json.loads() would.
+
+        orjson parses integers beyond 64 bits as floats and rejects NaN and
+        Infinity; text with a long digit run, or that orjson rejects, is
+        parsed by the stdlib instead (which also raises the real errors).
+        """
+        data = text.encode('utf-8', 'surrogatepass') if isinstance(text, str) else bytes(text)
+        if data.translate(_DIGIT_MASK).find(_LONG_DIGIT_RUN) != -1:
+            return json.loads(text)
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return json.loads(text)
+else:
+    _json_dumps = _stdlib_json_dumps
+    _json_loads = json.loads
+
+
+def _fetch_dicts(cursor: sqlite3.Cursor, size: Optional[int] = None) -> List[Dict]:
+    """Fetch rows from cursor as plain dicts, skipping sqlite3.Row.
+
+    Column names are read once per cursor rather than once per row, so each
+    row costs one tuple and one dict instead of a Row plus a dict copy.
+    With size set, fetches at most that many rows (fetchmany semantics).
+    """
+    cursor.row_factory = None
+    rows = cursor.fetchall() if size is None else cursor.fetchmany(size)
+    if not rows:
+        return []
+    columns = [d[0] for d in cursor.description]
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def _decode_json_extract(value_type: Optional[str], value: Any) -> Any:
+    """Map a (json_type, json_extract) result pair back to a Python value.
+
+    json_extract returns JSON text for containers and 1/0 for booleans, so
+    json_type is needed to tell them apart from plain strings and integers.
+    """
+    if value_type in ('object', 'array'):
+        return _json_loads(value)
+    if value_type == 'true':
+        return True
+    if value_type == 'false':
+        return False
+    return value
 
 # Secret patterns for redaction (compiled for performance)
 # See: research/agent-reasoning-capture-ultrathink.md
@@ -99,6 +224,10 @@ GROUP_ID_PATTERN = re.compile(r'^[a-zA-Z0-9_-]+$')
 # Reserved names - checked CASE-INSENSITIVELY per OpenAI review
 RESERVED_GROUP_IDS = frozenset({'global', 'session', 'all', 'default'})
 
+# Read-only guard for query(): first keyword after whitespace/comments must be SELECT or WITH.
+# Anchored match only scans the statement prefix, never the whole SQL text.
+READ_ONLY_QUERY_PATTERN = re.compile(r'(?:\s+|--[^\n]*(?:\n|$)|/\*.*?\*/)*(?:SELECT|WITH)\b', re.I | re.S)
+
 # Investigation status whitelist (per CI review suggestion)
 VALID_INVESTIGATION_STATUSES = frozenset({
     'under_investigation',
@@ -114,6 +243,10 @@ MAX_INVESTIGATION_ITERATION = 20  # Reasonable upper bound
 
 # Valid session statuses (matches schema CHECK constraint)
 VALID_SESSION_STATUSES = frozenset({'active', 'completed', 'failed'})
+# Statuses that close a session (set end_time)
+TERMINAL_SESSION_STATUSES = frozenset({'completed', 'failed'})
+# Valid orchestration modes (matches schema CHECK constraint)
+VALID_SESSION_MODES = frozenset({'simple', 'parallel'})
 
 
 def _validate_group_id_base(group_id: Any) -> Optional[str]:
@@ -293,15 +426,117 @@ def _ensure_cwd_at_project_root():
         print(f"[WARNING] Failed to chdir to project root: {e}", file=sys.stderr)
 
 # Import SCHEMA_VERSION from init_db.py to avoid duplication
+# The module itself is kept for in-process schema creation (no interpreter fork)
 try:
+    import init_db as _init_db
     from init_db import SCHEMA_VERSION as EXPECTED_SCHEMA_VERSION
 except ImportError:
+    _init_db = None
     # Fallback if init_db.py is not accessible
     print("Warning: Could not import SCHEMA_VERSION from init_db.py, using fallback value 7. "
           "Check if init_db.py exists in the same directory.", file=sys.stderr)
     EXPECTED_SCHEMA_VERSION = 7
 
 
+# Explicit projections for the row-returning getters (schema v21 columns), so
+# a column added by a later migration is only read once a getter opts in
+_SESSION_COLUMNS = (
+    "session_id, start_time, end_time, mode, original_requirements, status, "
+    "initial_branch, metadata, created_at"
+)
+_LOG_COLUMNS = (
+    "id, session_id, timestamp, iteration, agent_type, agent_id, content, log_type, "
+    "reasoning_phase, confidence_level, references_json, redacted, group_id, "
+    "event_subtype, event_payload, idempotency_key"
+)
+_TASK_GROUP_COLUMNS = (
+    "id, session_id, name, status, assigned_to, revision_count, last_review_status, "
+    "feature_branch, merge_status, complexity, initial_tier, context_references, "
+    "specializations, item_count, security_sensitive, qa_attempts, tl_review_attempts, "
+    "component_path, review_iteration, no_progress_count, blocking_issues_count, "
+    "speckit_task_ids, created_at, updated_at"
+)
+
+# Fixed SQL text for hot reads: one constant per filter combination, so no
+# per-call string building and identical statements for sqlite3's cache.
+_SQL_TASK_GROUPS = (
+    f"SELECT {_TASK_GROUP_COLUMNS} FROM task_groups WHERE session_id = ? ORDER BY created_at"
+)
+_SQL_TASK_GROUPS_BY_STATUS = (
+    f"SELECT {_TASK_GROUP_COLUMNS} FROM task_groups "
+    "WHERE session_id = ? AND status = ? ORDER BY created_at"
+)
+_SQL_TASK_GROUP = f"SELECT {_TASK_GROUP_COLUMNS} FROM task_groups WHERE id = ? AND session_id = ?"
+_SQL_SESSION = f"SELECT {_SESSION_COLUMNS} FROM sessions WHERE session_id = ?"
+_SQL_LIST_SESSIONS = f"SELECT {_SESSION_COLUMNS} FROM sessions ORDER BY created_at DESC LIMIT ?"
+
+# Hot-path INSERTs shared by the single-row and batch writers
+_SQL_INSERT_LOG = (
+    "INSERT INTO orchestration_logs (session_id, iteration, agent_type, agent_id, content, timestamp) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+_SQL_INSERT_TOKENS = (
+    "INSERT INTO token_usage (session_id, agent_type, agent_id, tokens_estimated) VALUES (?, ?, ?, ?)"
+)
+
+
+def _build_token_summary_query(column: str) -> str:
+    """Per-group SUM plus a grand-total row, computed by SQLite in one statement.
+
+    The 'total' row comes last, so it wins over any group literally named 'total'.
+    """
+    return (
+        f"SELECT {column}, SUM(tokens_estimated) AS total FROM token_usage "
+        f"WHERE session_id = ? GROUP BY {column} "
+        "UNION ALL "
+        "SELECT 'total', COALESCE(SUM(tokens_estimated), 0) FROM token_usage WHERE session_id = ?"
+    )
+
+
+# get_token_summary(by=...) -> SQL; anything other than 'agent_type' groups by agent_id
+_SQL_TOKEN_SUMMARY = {
+    column: _build_token_summary_query(column) for column in ('agent_type', 'agent_id')
+}
+
+
+# Terminal statuses stamp end_time server-side, in the same UTC
+# 'YYYY-MM-DD HH:MM:SS' format as start_time (keyed by is-terminal)
+_SQL_UPDATE_SESSION_STATUS = {
+    True: "UPDATE sessions SET status = ?, end_time = CURRENT_TIMESTAMP WHERE session_id = ?",
+    False: "UPDATE sessions SET status = ?, end_time = NULL WHERE session_id = ?",
+}
+
+def _build_log_query(by_agent: bool, since: bool, oldest_first: bool) -> str:
+    """Build the iter_logs SELECT for one combination of optional filters."""
+    query = f"SELECT {_LOG_COLUMNS} FROM orchestration_logs WHERE session_id = ?"
+    if by_agent:
+        query += " AND agent_type = ?"
+    if since:
+        query += " AND timestamp >= ?"
+    query += " ORDER BY timestamp DESC LIMIT ? OFFSET ?"
+    if oldest_first:
+        # Same most-recent window, re-ordered oldest first in SQL
+        query = f"SELECT * FROM ({query}) ORDER BY timestamp ASC, id ASC"
+    return query
+
+
+# stream_logs: most recent window, rendered oldest first, only the columns it prints
+_SQL_STREAM_LOGS = (
+    "SELECT timestamp, iteration, agent_type, content FROM ("
+    "SELECT id, timestamp, iteration, agent_type, content FROM orchestration_logs "
+    "WHERE session_id = ? ORDER BY timestamp DESC LIMIT ? OFFSET ?"
+    ") ORDER BY timestamp ASC, id ASC"
+)
+
+# (agent_type filter?, since filter?, oldest_first) -> SQL, built once at import
+_LOG_QUERIES = {
+    (by_agent, since, oldest_first): _build_log_query(by_agent, since, oldest_first)
+    for by_agent in (False, True)
+    for since in (False, True)
+    for oldest_first in (False, True)
+}
+
+
 class DatabaseInitError(Exception):
     """Exception raised when database initialization fails.
 
@@ -316,6 +551,36 @@ class MigrationLockError(Exception):
     pass
 
 
+class TransactionAbortedError(Exception):
+    """Exception raised when a write inside a transaction() block failed.
+
+    The whole block has been rolled back by the time this is raised.
+    """
+    pass
+
+
+class _Connection(sqlite3.Connection):
+    """sqlite3 connection that lets an open transaction() block own the transaction.
+
+    Inside the block a writer's own commit() is a no-op, and its rollback()
+    (its error path) only marks the block as failed, so transaction() can roll
+    back every write in the block instead of committing the ones around the
+    failed write.
+    """
+    in_block = False
+    block_failed = False
+
+    def commit(self) -> None:
+        if not self.in_block:
+            super().commit()
+
+    def rollback(self) -> None:
+        if self.in_block:
+            self.block_failed = True
+        else:
+            super().rollback()
+
+
 class BazingaDB:
     """Database client for BAZINGA orchestration."""
 
@@ -330,6 +595,9 @@ class BazingaDB:
         # "attempt to write a readonly database" - permission issue, not corruption
     ]
 
+    # db_path values that passed _ensure_db_exists in this process (shared by all instances)
+    _verified_paths = set()
+
     # Tables to salvage during recovery (ordered for FK dependencies)
     # Includes all tables from schema.md - code handles missing tables gracefully
     SALVAGE_TABLE_ORDER = [
@@ -358,6 +626,8 @@ class BazingaDB:
     def __init__(self, db_path: str, quiet: bool = False):
         self.db_path = db_path
         self.quiet = quiet
+        # Per-thread cached connection (see _get_connection)
+        self._local = threading.local()
         self._ensure_db_exists()
 
     def _print_success(self, message: str):
@@ -514,8 +784,7 @@ class BazingaDB:
         try:
             # Use a short timeout - if DB is badly corrupted, don't hang
             # Open in read-only mode to prevent accidental writes to corrupted DB
-            uri = f"file:{self.db_path}?mode=ro"
-            with sqlite3.connect(uri, uri=True, timeout=5.0) as conn:
+            with sqlite3.connect(self._read_only_uri(), uri=True, timeout=5.0) as conn:
                 cursor = conn.cursor()
 
                 for table in self.SALVAGE_TABLE_ORDER:
@@ -558,6 +827,14 @@ class BazingaDB:
                 # Table ordering handles most cases, but this is a safety layer
                 cursor.execute("PRAGMA foreign_keys = OFF")
 
+                # One transaction for the whole restore. Secondary indexes are
+                # dropped and rebuilt once after the bulk insert instead of being
+                # maintained row by row; a failure rolls the DROPs back as well
+                cursor.execute("BEGIN")
+                deferred_indexes = self._drop_secondary_indexes(
+                    cursor, [t for t in self.SALVAGE_TABLE_ORDER if salvaged.get(t, {}).get('rows')]
+                )
+
                 for table in self.SALVAGE_TABLE_ORDER:
                     if table not in salvaged:
                         continue
@@ -613,6 +890,8 @@ class BazingaDB:
                         # Warn when salvaged data couldn't be restored (schema mismatch, constraints)
                         self._print_error(f"  Warning: 0/{len(rows)} rows restored to {table}")
 
+                self._create_indexes(cursor, deferred_indexes)
+
                 # Re-enable FK constraints after restore
                 cursor.execute("PRAGMA foreign_keys = ON")
                 conn.commit()
@@ -621,6 +900,57 @@ class BazingaDB:
 
         return total_restored
 
+    @staticmethod
+    def _drop_secondary_indexes(cursor: sqlite3.Cursor, tables: List[str]) -> List[str]:
+        """Drop the non-UNIQUE indexes on tables and return their CREATE statements.
+
+        UNIQUE indexes are kept: INSERT OR IGNORE and ON CONFLICT rely on them.
+        """
+        if not tables:
+            return []
+        placeholders = ', '.join('?' for _ in tables)
+        cursor.execute(f"""
+            SELECT name, sql FROM sqlite_master
+            WHERE type = 'index' AND sql IS NOT NULL AND tbl_name IN ({placeholders})
+        """, tables)
+        dropped = []
+        for name, sql in cursor.fetchall():
+            if sql.lstrip().upper().startswith('CREATE UNIQUE'):
+                continue
+            cursor.execute(f'DROP INDEX "{name}"')
+            dropped.append(sql)
+        return dropped
+
+    @staticmethod
+    def _create_indexes(cursor: sqlite3.Cursor, create_sqls: List[str]) -> None:
+        """Recreate indexes dropped by _drop_secondary_indexes, then refresh planner stats."""
+        for sql in create_sqls:
+            cursor.execute(sql)
+        if create_sqls:
+            cursor.execute("ANALYZE")
+
+    def rebuild_indexes(self) -> Dict[str, Any]:
+        """Recreate any missing schema indexes and refresh planner statistics.
+
+        For import/restore tools that DROP INDEX before a bulk insert: init_db
+        creates every index with IF NOT EXISTS, so re-running it restores the
+        dropped ones; ANALYZE then updates sqlite_stat1 for the new data.
+        """
+        ok, output = self._run_init_db(seed=False)
+        if not ok:
+            return {"success": False, "error": output}
+        conn = self._get_connection()
+        try:
+            conn.execute("ANALYZE")
+            conn.commit()
+            count = conn.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'index'"
+            ).fetchone()[0]
+        finally:
+            self._release_connection(conn)
+        self._print_success(f"✓ Rebuilt indexes ({count} total) and refreshed statistics")
+        return {"success": True, "indexes": count}
+
     def _recover_from_corruption(self) -> bool:
         """Attempt to recover from database corruption by reinitializing.
 
@@ -631,6 +961,9 @@ class BazingaDB:
         """
         self._print_error("Database corruption detected. Attempting recovery...")
 
+        # Drop the cached connection - it points at the file about to be replaced
+        self.close()
+
         # Step 1: Try to salvage data before doing anything destructive
         self._print_error("Attempting to salvage data from corrupted database...")
         salvaged_data = self._extract_salvageable_data()
@@ -654,18 +987,9 @@ class BazingaDB:
 
         # Step 4: Reinitialize with fresh schema
         try:
-            script_dir = Path(__file__).parent
-            init_script = script_dir / "init_db.py"
-
-            import subprocess
-            result = subprocess.run(
-                [sys.executable, str(init_script), self.db_path],
-                capture_output=True,
-                text=True
-            )
-
-            if result.returncode != 0:
-                self._print_error(f"Failed to reinitialize database: {result.stderr}")
+            ok, output = self._run_init_db()
+            if not ok:
+                self._print_error(f"Failed to reinitialize database: {output}")
                 return False
 
         except Exception as e:
@@ -705,7 +1029,20 @@ class BazingaDB:
             return {"ok": False, "details": f"Integrity check failed: {e}"}
 
     def _ensure_db_exists(self):
-        """Ensure database exists and has schema, create if not."""
+        """Ensure database exists and has schema, create if not.
+
+        A path that passed once is remembered for the process, so constructing
+        BazingaDB again for it costs one stat() instead of a full integrity
+        check and schema-version probe.
+        """
+        if self.db_path in BazingaDB._verified_paths and Path(self.db_path).exists():
+            return
+        self._verify_or_init_db()
+        if self.db_path != ':memory:':
+            BazingaDB._verified_paths.add(self.db_path)
+
+    def _verify_or_init_db(self):
+        """Check integrity and schema version, initializing or migrating as needed."""
         db_path = Path(self.db_path)
         needs_init = False
         is_corrupted = False
@@ -736,8 +1073,14 @@ class BazingaDB:
                                 print(f"Database missing schema at {self.db_path}. Auto-initializing...", file=sys.stderr)
                             else:
                                 # Check schema version - run migrations if outdated
-                                cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='schema_version'")
-                                if cursor.fetchone():
+                                # (PRAGMA user_version is stamped since v24; older
+                                # databases only have the schema_version table)
+                                current_version = cursor.execute("PRAGMA user_version").fetchone()[0]
+                                if current_version:
+                                    if current_version < EXPECTED_SCHEMA_VERSION:
+                                        needs_init = True
+                                        print(f"Database schema outdated (v{current_version} < v{EXPECTED_SCHEMA_VERSION}). Running migrations...", file=sys.stderr)
+                                elif cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='schema_version'").fetchone():
                                     cursor.execute("SELECT version FROM schema_version ORDER BY version DESC LIMIT 1")
                                     version_row = cursor.fetchone()
                                     current_version = version_row[0] if version_row else 0
@@ -888,14 +1231,16 @@ class BazingaDB:
                                 # Corruption was fixed by another process
                                 is_corrupted = False
 
-                        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='schema_version'")
-                        if cursor.fetchone():
+                        current_version = cursor.execute("PRAGMA user_version").fetchone()[0]
+                        if not current_version and cursor.execute(
+                            "SELECT name FROM sqlite_master WHERE type='table' AND name='schema_version'"
+                        ).fetchone():
                             cursor.execute("SELECT version FROM schema_version ORDER BY version DESC LIMIT 1")
                             version_row = cursor.fetchone()
                             current_version = version_row[0] if version_row else 0
-                            if current_version >= EXPECTED_SCHEMA_VERSION and not is_corrupted:
-                                print(f"Schema already up-to-date (migrated by another process)", file=sys.stderr)
-                                return  # Another process already migrated
+                        if current_version >= EXPECTED_SCHEMA_VERSION and not is_corrupted:
+                            print(f"Schema already up-to-date (migrated by another process)", file=sys.stderr)
+                            return  # Another process already migrated
                 except (sqlite3.Error, OSError) as e:
                     # Log the specific error for debugging, but don't abort migration
                     print(f"Warning: Schema re-check failed ({type(e).__name__}): {e}", file=sys.stderr)
@@ -914,19 +1259,10 @@ class BazingaDB:
                 return  # Recovery includes re-initialization, no need to continue
 
             # Auto-initialize the database (non-corrupted case: new or schema upgrade)
-            script_dir = Path(__file__).parent
-            init_script = script_dir / "init_db.py"
-
-            import subprocess
-            result = subprocess.run(
-                [sys.executable, str(init_script), self.db_path],
-                capture_output=True,
-                text=True
-            )
-
-            if result.returncode != 0:
+            ok, output = self._run_init_db()
+            if not ok:
                 raise DatabaseInitError(
-                    f"Failed to initialize database at {self.db_path}: {result.stderr}"
+                    f"Failed to initialize database at {self.db_path}: {output}"
                 )
 
             print(f"✓ Database auto-initialized at {self.db_path}", file=sys.stderr)
@@ -950,9 +1286,51 @@ class BazingaDB:
                     # Ignore errors during lock release - not critical if cleanup fails
                     pass
 
+    def _run_init_db(self, seed: bool = True) -> Tuple[bool, str]:
+        """Create or upgrade the schema in-process via init_db.
+
+        Equivalent to running init_db.py on self.db_path, minus the cost of
+        starting a second interpreter. init_db's progress output is captured
+        so CLI stdout stays machine-readable. seed=False skips re-seeding
+        the workflow configs.
+
+        Returns:
+            Tuple of (success, captured output / error text).
+        """
+        if _init_db is None:
+            return False, "init_db.py could not be imported"
+
+        buffer = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(buffer), contextlib.redirect_stderr(buffer):
+                Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+                _init_db.init_database(self.db_path)
+                if seed:
+                    _init_db.seed_workflow_configs(self.db_path)
+        except Exception as e:
+            return False, f"{buffer.getvalue()}{e}"
+        return True, buffer.getvalue()
+
+    # Max bytes of the database file SQLite may memory-map per connection (256 MiB)
+    MMAP_SIZE = 256 * 1024 * 1024
+    # Page cache size per connection, in KiB (~64 MB)
+    CACHE_SIZE_KIB = 64000
+    # Prepared statements kept per connection by the sqlite3 module
+    CACHED_STATEMENTS = 256
+    # SQLite's own wait for a lock before returning "database is locked" (ms).
+    # Matches the old sqlite3 timeout=30.0: most writers commit directly and
+    # get no retries beyond this wait
+    BUSY_TIMEOUT_MS = 30000
+    # Extra attempts _execute_write makes once busy_timeout has given up
+    WRITE_RETRIES = 5
+
     def _get_connection(self, retry_on_corruption: bool = True, _lock_retry: int = 0) -> sqlite3.Connection:
         """Get database connection with proper settings.
 
+        The connection is opened once per thread and reused by later calls, so
+        PRAGMA setup and SQLite's page cache survive across operations. Pair
+        every call with _release_connection() instead of conn.close().
+
         Args:
             retry_on_corruption: If True, attempt recovery on corruption errors.
             _lock_retry: Internal counter for lock retry attempts (max 3 retries with backoff).
@@ -960,15 +1338,39 @@ class BazingaDB:
         Returns:
             sqlite3.Connection with WAL mode and foreign keys enabled.
         """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
         try:
-            conn = sqlite3.connect(self.db_path, timeout=30.0)
-            # Enable WAL mode for better concurrency (reduces "database is locked" errors)
-            conn.execute("PRAGMA journal_mode=WAL")
-            # Enable foreign key constraints
-            conn.execute("PRAGMA foreign_keys = ON")
-            # Increase busy timeout to handle concurrent access
-            conn.execute("PRAGMA busy_timeout = 30000")
+            # Larger statement cache: the connection is long-lived and this
+            # module issues well over the default 128 distinct statements
+            conn = sqlite3.connect(self.db_path, cached_statements=self.CACHED_STATEMENTS,
+                                   factory=_Connection)
+            # Lock waits are handled inside SQLite; _execute_write also retries past this
+            # (first, so the journal_mode switch below also waits for a busy lock)
+            pragmas = [f"PRAGMA busy_timeout = {self.BUSY_TIMEOUT_MS}"]
+            if self.db_path != ':memory:':
+                # Enable WAL mode for better concurrency (reduces "database is locked" errors)
+                pragmas.append("PRAGMA journal_mode = WAL")
+                # WAL + NORMAL: fsync at checkpoints, not every commit (still crash-safe);
+                # BAZINGA_DB_SYNCHRONOUS=FULL restores an fsync per commit
+                sync_mode = _init_db.get_synchronous_mode() if _init_db else 'NORMAL'
+                pragmas.append(f"PRAGMA synchronous = {sync_mode}")
+            pragmas += [
+                # Enable foreign key constraints
+                "PRAGMA foreign_keys = ON",
+                # Read pages (incl. large state/skill JSON) via the OS page cache
+                # instead of copying them into SQLite's own buffers
+                f"PRAGMA mmap_size = {self.MMAP_SIZE}",
+                # Larger page cache (negative = KiB); kept warm by the cached connection
+                f"PRAGMA cache_size = -{self.CACHE_SIZE_KIB}",
+                # Sorts/temp B-trees (GROUP BY, ORDER BY without index) stay in memory
+                "PRAGMA temp_store = MEMORY",
+            ]
+            # One executescript() call instead of a statement round trip per PRAGMA
+            conn.executescript(";\n".join(pragmas) + ";")
             conn.row_factory = sqlite3.Row
+            self._local.conn = conn
             return conn
         except sqlite3.OperationalError as e:
             # Handle transient "database is locked" errors with retry/backoff
@@ -985,6 +1387,158 @@ class BazingaDB:
                     return self._get_connection(retry_on_corruption=False)
             raise
 
+    def _read_only_uri(self) -> str:
+        """SQLite URI opening db_path read-only.
+
+        Built from the escaped absolute path, so '#', '?' or '%' in the path
+        stay part of the file name instead of starting the URI's query/fragment.
+        """
+        return Path(self.db_path).resolve().as_uri() + "?mode=ro"
+
+    def _get_read_only_connection(self) -> sqlite3.Connection:
+        """Get this thread's cached read-only connection, used by query().
+
+        Opened with mode=ro and query_only, so ad-hoc SQL can never write
+        (even via WITH ... DELETE or ATTACH) and never queues for the write
+        lock held by another writer.
+        """
+        conn = getattr(self._local, 'ro_conn', None)
+        if conn is not None:
+            return conn
+        conn = sqlite3.connect(self._read_only_uri(), uri=True,
+                               cached_statements=self.CACHED_STATEMENTS)
+        conn.executescript(
+            "PRAGMA query_only = ON;\n"
+            f"PRAGMA busy_timeout = {self.BUSY_TIMEOUT_MS};\n"
+            f"PRAGMA mmap_size = {self.MMAP_SIZE};"
+        )
+        self._local.ro_conn = conn
+        return conn
+
+    def _release_connection(self, conn: sqlite3.Connection) -> None:
+        """Finish using a connection obtained from _get_connection().
+
+        The cached connection stays open; any transaction left uncommitted
+        (e.g. by an exception) is rolled back, matching what close() did.
+        Connections that are no longer cached (replaced after recovery) are closed.
+        """
+        if conn is getattr(self._local, 'conn', None):
+            # Inside _read_snapshot()/transaction() the open transaction is the point
+            held = getattr(self._local, 'snapshot', False) or getattr(self._local, 'transaction', False)
+            if conn.in_transaction and not held:
+                conn.rollback()
+        else:
+            conn.close()
+
+    def _execute_write(self, conn: sqlite3.Connection, sql: str, params: Any = (),
+                       many: bool = False) -> sqlite3.Cursor:
+        """Execute one write statement and commit, retrying while the database is locked.
+
+        busy_timeout bounds each wait inside SQLite; if it still gives up,
+        the transaction is rolled back and the write retried after a short
+        jittered exponential backoff (10-50ms, doubling), so concurrent writers
+        spread out instead of retrying in lockstep.
+
+        Inside transaction() the statement joins the open transaction and is
+        committed with the rest of the block.
+        """
+        if getattr(self._local, 'transaction', False):
+            return conn.executemany(sql, params) if many else conn.execute(sql, params)
+        for attempt in range(self.WRITE_RETRIES + 1):
+            try:
+                cursor = conn.executemany(sql, params) if many else conn.execute(sql, params)
+                conn.commit()
+                return cursor
+            except sqlite3.OperationalError as e:
+                if attempt == self.WRITE_RETRIES or "database is locked" not in str(e).lower():
+                    raise
+                if conn.in_transaction:
+                    conn.rollback()
+                time.sleep(random.uniform(0.01, 0.05) * 2 ** attempt)
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator['BazingaDB']:
+        """Group several writes into one transaction (one commit, one fsync).
+
+        Usage:
+            with db.transaction():
+                db.log_interaction(session_id, 'developer', content)
+                db.save_state(session_id, 'orchestrator', state)
+
+        The block is all-or-nothing. Writers' own commits are deferred to the
+        end of the block, and a writer that fails (and would roll back its own
+        work) marks the block as failed instead of returning with the earlier
+        writes discarded and the later ones committed. The block commits on
+        normal exit; it rolls back if it raises, and rolls back and raises
+        TransactionAbortedError if any write in it failed. BEGIN IMMEDIATE
+        takes the write lock up front, so no write inside waits on it.
+        """
+        if getattr(self._local, 'transaction', False):
+            raise RuntimeError("transaction() blocks cannot be nested")
+        conn = self._get_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.transaction = True
+        conn.in_block = True
+        conn.block_failed = False
+        try:
+            yield self
+        except BaseException:
+            conn.in_block = False
+            conn.rollback()
+            raise
+        else:
+            conn.in_block = False
+            if conn.block_failed:
+                conn.rollback()
+                raise TransactionAbortedError(
+                    "A write inside transaction() failed; the block was rolled back")
+            conn.commit()
+        finally:
+            conn.in_block = False
+            self._local.transaction = False
+            self._release_connection(conn)
+
+    @contextlib.contextmanager
+    def _read_snapshot(self) -> Iterator[sqlite3.Connection]:
+        """Run several read methods against one consistent database snapshot.
+
+        Opens a deferred transaction on this thread's cached connection and
+        keeps it open across the _release_connection() calls made by the
+        wrapped reads, so they all see the same WAL snapshot instead of each
+        starting its own. Only for reads: a commit inside would end it early.
+        """
+        conn = self._get_connection()
+        self._local.snapshot = True
+        try:
+            conn.execute("BEGIN")
+            yield conn
+        finally:
+            self._local.snapshot = False
+            self._release_connection(conn)
+
+    def close(self) -> None:
+        """Close this thread's cached connections (reopened on next use).
+
+        The writable connection runs PRAGMA optimize first, which re-ANALYZEs
+        only the tables its queries showed to have missing or stale stats
+        (analysis_limit keeps that a bounded sample, not a full scan).
+        """
+        for attr in ('conn', 'ro_conn'):
+            conn = getattr(self._local, attr, None)
+            setattr(self._local, attr, None)
+            if conn is None:
+                continue
+            if attr == 'conn':
+                try:
+                    conn.execute("PRAGMA analysis_limit = 400")
+                    conn.execute("PRAGMA optimize")
+                except sqlite3.Error:
+                    pass  # Stats refresh is opportunistic (e.g. database busy)
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass  # Best-effort: connection may already be unusable
+
     # ==================== SESSION OPERATIONS ====================
 
     def create_session(self, session_id: str, mode: str, requirements: str,
@@ -1000,11 +1554,11 @@ class BazingaDB:
             metadata: JSON string containing original_scope and other extensible data
         """
         # Validate inputs
-        if not session_id or not session_id.strip():
+        if not session_id or session_id.isspace():
             raise ValueError("session_id cannot be empty")
-        if mode not in ['simple', 'parallel']:
+        if mode not in VALID_SESSION_MODES:
             raise ValueError(f"Invalid mode: {mode}. Must be 'simple' or 'parallel'")
-        if not requirements or not requirements.strip():
+        if not requirements or requirements.isspace():
             raise ValueError("requirements cannot be empty")
 
         # Default initial_branch to 'main' if not provided
@@ -1013,11 +1567,10 @@ class BazingaDB:
 
         conn = self._get_connection()
         try:
-            cursor = conn.execute("""
+            self._execute_write(conn, """
                 INSERT INTO sessions (session_id, mode, original_requirements, status, initial_branch, metadata)
                 VALUES (?, ?, ?, 'active', ?, ?)
             """, (session_id, mode, requirements, initial_branch, metadata))
-            conn.commit()
 
             # Verify the insert by reading it back
             verify = conn.execute("""
@@ -1060,38 +1613,32 @@ class BazingaDB:
                 # Other integrity error (e.g., foreign key, check constraint)
                 raise RuntimeError(f"Database constraint violation: {e}")
         finally:
-            conn.close()
+            self._release_connection(conn)
 
     def update_session_status(self, session_id: str, status: str) -> None:
         """Update session status."""
         conn = self._get_connection()
-        end_time = datetime.now().isoformat() if status in ['completed', 'failed'] else None
-        conn.execute("""
-            UPDATE sessions
-            SET status = ?, end_time = ?
-            WHERE session_id = ?
-        """, (status, end_time, session_id))
-        conn.commit()
-        conn.close()
+        self._execute_write(
+            conn,
+            _SQL_UPDATE_SESSION_STATUS[status in TERMINAL_SESSION_STATUSES],
+            (status, session_id)
+        )
+        self._release_connection(conn)
         self._print_success(f"✓ Session {session_id} status updated to: {status}")
 
     def get_session(self, session_id: str) -> Optional[Dict]:
         """Get session details."""
         conn = self._get_connection()
-        row = conn.execute("""
-            SELECT * FROM sessions WHERE session_id = ?
-        """, (session_id,)).fetchone()
-        conn.close()
+        row = conn.execute(_SQL_SESSION, (session_id,)).fetchone()
+        self._release_connection(conn)
         return dict(row) if row else None
 
     def list_sessions(self, limit: int = 10) -> List[Dict]:
         """List recent sessions ordered by created_at (most recent first)."""
         conn = self._get_connection()
-        rows = conn.execute("""
-            SELECT * FROM sessions ORDER BY created_at DESC LIMIT ?
-        """, (limit,)).fetchall()
-        conn.close()
-        return [dict(row) for row in rows]
+        rows = _fetch_dicts(conn.execute(_SQL_LIST_SESSIONS, (limit,)))
+        self._release_connection(conn)
+        return rows
 
     # ==================== LOG OPERATIONS ====================
 
@@ -1108,12 +1655,12 @@ class BazingaDB:
             self._print_error(f"Max retries exceeded for log_interaction")
             return {"success": False, "error": "Max retries exceeded after recovery attempt"}
 
-        # Validate inputs
-        if not session_id or not session_id.strip():
+        # Validate inputs (isspace() avoids copying large content via strip())
+        if not session_id or session_id.isspace():
             raise ValueError("session_id cannot be empty")
-        if not agent_type or not agent_type.strip():
+        if not agent_type or agent_type.isspace():
             raise ValueError("agent_type cannot be empty")
-        if not content or not content.strip():
+        if not content or content.isspace():
             raise ValueError("content cannot be empty")
 
         # Note: No agent_type validation against a hardcoded list.
@@ -1123,30 +1670,26 @@ class BazingaDB:
 
         conn = None
         try:
+            # Timestamp generated client-side in CURRENT_TIMESTAMP's format (UTC,
+            # 'YYYY-MM-DD HH:MM:SS') so the result needs no read-back query
+            timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
             conn = self._get_connection()
-            cursor = conn.execute("""
-                INSERT INTO orchestration_logs (session_id, iteration, agent_type, agent_id, content)
-                VALUES (?, ?, ?, ?, ?)
-            """, (session_id, iteration, agent_type, agent_id, content))
+            cursor = self._execute_write(
+                conn, _SQL_INSERT_LOG,
+                (session_id, iteration, agent_type, agent_id, content, timestamp)
+            )
             log_id = cursor.lastrowid
-            conn.commit()
 
-            # Verify the insert by reading it back
-            verify = conn.execute("""
-                SELECT id, session_id, agent_type, LENGTH(content) as content_length, timestamp
-                FROM orchestration_logs WHERE id = ?
-            """, (log_id,)).fetchone()
-
-            if not verify:
-                raise RuntimeError(f"Failed to verify log insertion for log_id={log_id}")
+            if not log_id:
+                raise RuntimeError("Failed to log interaction: no row id returned")
 
             result = {
                 'success': True,
                 'log_id': log_id,
-                'session_id': verify['session_id'],
-                'agent_type': verify['agent_type'],
-                'content_length': verify['content_length'],
-                'timestamp': verify['timestamp'],
+                'session_id': session_id,
+                'agent_type': agent_type,
+                'content_length': len(content),
+                'timestamp': timestamp,
                 'iteration': iteration,
                 'agent_id': agent_id
             }
@@ -1179,53 +1722,120 @@ class BazingaDB:
             return {"success": False, "error": str(e)}
         finally:
             if conn:
-                conn.close()
+                self._release_connection(conn)
+
+    def log_interactions_batch(self, session_id: str,
+                               entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Log several agent interactions in one transaction.
+
+        One executemany() and a single commit (one fsync) for the whole batch,
+        instead of a commit per log_interaction() call. All rows share one
+        timestamp; the batch is all-or-nothing.
+
+        Args:
+            session_id: Session identifier
+            entries: Dicts with 'agent_type' and 'content', optionally
+                'iteration' and 'agent_id'
+
+        Returns:
+            Dict with 'success', 'count' and 'timestamp', or 'error' on failure.
+        """
+        if not session_id or session_id.isspace():
+            raise ValueError("session_id cannot be empty")
+        timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        rows = []
+        for i, entry in enumerate(entries):
+            agent_type = entry.get('agent_type')
+            content = entry.get('content')
+            if not agent_type or agent_type.isspace():
+                raise ValueError(f"entries[{i}]: agent_type cannot be empty")
+            if not content or content.isspace():
+                raise ValueError(f"entries[{i}]: content cannot be empty")
+            rows.append((session_id, entry.get('iteration'), agent_type,
+                         entry.get('agent_id'), content, timestamp))
 
-    def get_logs(self, session_id: str, limit: int = 50, offset: int = 0,
-                 agent_type: Optional[str] = None, since: Optional[str] = None) -> List[Dict]:
-        """Get orchestration logs with optional filtering."""
         conn = self._get_connection()
+        try:
+            self._execute_write(conn, _SQL_INSERT_LOG, rows, many=True)
+        except sqlite3.Error as e:
+            conn.rollback()
+            self._print_error(f"Failed to log interaction batch: {str(e)}")
+            return {"success": False, "error": f"Database error: {str(e)}"}
+        finally:
+            self._release_connection(conn)
 
-        query = "SELECT * FROM orchestration_logs WHERE session_id = ?"
-        params = [session_id]
+        self._print_success(f"✓ Logged {len(rows)} interactions")
+        return {"success": True, "count": len(rows), "timestamp": timestamp}
+
+    # Rows fetched per round-trip by iter_logs (bounds peak memory on large sessions)
+    LOG_FETCH_BATCH_SIZE = 256
 
+    def iter_logs(self, session_id: str, limit: int = 50, offset: int = 0,
+                  agent_type: Optional[str] = None, since: Optional[str] = None,
+                  oldest_first: bool = False) -> Iterator[Dict]:
+        """Lazily yield orchestration logs with optional filtering.
+
+        Rows are pulled with fetchmany() so only one batch is materialized at a
+        time. The window is always the most recent `limit` rows (after `offset`);
+        oldest_first=True re-orders that window in SQL instead of in Python.
+        """
+        query = _LOG_QUERIES[bool(agent_type), bool(since), bool(oldest_first)]
+        params = [session_id]
         if agent_type:
-            query += " AND agent_type = ?"
             params.append(agent_type)
-
         if since:
-            query += " AND timestamp >= ?"
             params.append(since)
-
-        query += " ORDER BY timestamp DESC LIMIT ? OFFSET ?"
         params.extend([limit, offset])
 
-        rows = conn.execute(query, params).fetchall()
-        conn.close()
-        return [dict(row) for row in rows]
+        conn = self._get_connection()
+        try:
+            cursor = conn.execute(query, params)
+            while True:
+                batch = _fetch_dicts(cursor, self.LOG_FETCH_BATCH_SIZE)
+                if not batch:
+                    break
+                yield from batch
+        finally:
+            self._release_connection(conn)
 
-    def stream_logs(self, session_id: str, limit: int = 50, offset: int = 0) -> str:
-        """Stream logs in markdown format (for dashboard)."""
-        logs = self.get_logs(session_id, limit, offset)
+    def get_logs(self, session_id: str, limit: int = 50, offset: int = 0,
+                 agent_type: Optional[str] = None, since: Optional[str] = None) -> List[Dict]:
+        """Get orchestration logs with optional filtering (most recent first)."""
+        return list(self.iter_logs(session_id, limit, offset, agent_type, since))
 
-        if not logs:
-            return "No logs found."
+    def stream_logs(self, session_id: str, limit: int = 50, offset: int = 0,
+                    out: Optional[TextIO] = None) -> Optional[str]:
+        """Stream logs in markdown format (for dashboard).
+
+        Each log entry is written to `out` as soon as it is fetched, so the CLI
+        never holds the whole markdown document in memory. When `out` is None the
+        markdown is collected and returned as a string (backward compatible).
+        """
+        collect = out is None
+        if collect:
+            out = io.StringIO()
+        write = out.write
 
-        output = []
-        for log in reversed(logs):  # Show oldest first
-            timestamp = log['timestamp']
-            agent_type = log['agent_type'].upper()
-            iteration = log['iteration'] if log['iteration'] else '?'
-            content = log['content']
+        wrote_any = False
+        conn = self._get_connection()
+        try:
+            # Plain tuples of just the rendered columns, iterated lazily off the cursor
+            cursor = conn.execute(_SQL_STREAM_LOGS, (session_id, limit, offset))
+            cursor.row_factory = None
+            for timestamp, iteration, agent_type, content in cursor:
+                write(f"## [{timestamp}] Iteration {iteration or '?'} - "
+                      f"{agent_type.upper()}\n\n{content}\n\n---\n\n")
+                wrote_any = True
+        finally:
+            self._release_connection(conn)
 
-            output.append(f"## [{timestamp}] Iteration {iteration} - {agent_type}")
-            output.append("")
-            output.append(content)
-            output.append("")
-            output.append("---")
-            output.append("")
+        if not wrote_any:
+            write("No logs found.\n")
 
-        return "\n".join(output)
+        if collect:
+            # Drop the trailing newline to match the previous "\n".join() output
+            return out.getvalue()[:-1]
+        return None
 
     # ==================== EVENT OPERATIONS (v9) ====================
 
@@ -1257,9 +1867,9 @@ class BazingaDB:
             return {"success": False, "error": "Max retries exceeded"}
 
         # Validate inputs
-        if not session_id or not session_id.strip():
+        if not session_id or session_id.isspace():
             raise ValueError("session_id cannot be empty")
-        if not event_subtype or not event_subtype.strip():
+        if not event_subtype or event_subtype.isspace():
             raise ValueError("event_subtype cannot be empty")
         # Phase 6: Use explicit validator for scope (events can be session-level)
         error = validate_scope_global_or_group(group_id)
@@ -1356,7 +1966,7 @@ class BazingaDB:
             return {"success": False, "error": str(e)}
         finally:
             if conn:
-                conn.close()
+                self._release_connection(conn)
 
     def get_events(self, session_id: str, event_subtype: Optional[str] = None,
                    limit: int = 50) -> List[Dict]:
@@ -1387,7 +1997,7 @@ class BazingaDB:
         params.append(limit)
 
         rows = conn.execute(query, params).fetchall()
-        conn.close()
+        self._release_connection(conn)
 
         return [dict(row) for row in rows]
 
@@ -1509,7 +2119,7 @@ class BazingaDB:
             return {'success': False, 'error': str(e), 'atomic': False}
         finally:
             if conn:
-                conn.close()
+                self._release_connection(conn)
 
     # ==================== STATE OPERATIONS ====================
 
@@ -1543,16 +2153,15 @@ class BazingaDB:
             raise ValueError(error)
 
         conn = self._get_connection()
-        conn.execute("""
+        self._execute_write(conn, """
             INSERT INTO state_snapshots (session_id, group_id, state_type, state_data, timestamp)
             VALUES (?, ?, ?, ?, datetime('now'))
             ON CONFLICT(session_id, state_type, group_id)
             DO UPDATE SET
                 state_data = excluded.state_data,
                 timestamp = excluded.timestamp
-        """, (session_id, group_id, state_type, json.dumps(state_data)))
-        conn.commit()
-        conn.close()
+        """, (session_id, group_id, state_type, _json_dumps(state_data)))
+        self._release_connection(conn)
         self._print_success(f"✓ Saved {state_type} state (group={group_id})")
         return {
             'success': True,
@@ -1587,8 +2196,51 @@ class BazingaDB:
             SELECT state_data FROM state_snapshots
             WHERE session_id = ? AND state_type = ? AND group_id = ?
         """, (session_id, state_type, group_id)).fetchone()
-        conn.close()
-        return json.loads(row['state_data']) if row else None
+        self._release_connection(conn)
+        return _json_loads(row['state_data']) if row else None
+
+    def get_state_field(self, session_id: str, state_type: str, json_path: str,
+                        group_id: str = 'global') -> Any:
+        """Get a single field from the latest state snapshot.
+
+        The projection is pushed into SQLite via json_extract(), so only the
+        requested sub-value crosses into Python instead of the whole blob.
+
+        Args:
+            session_id: The session ID
+            state_type: Type of state ('pm', 'orchestrator', 'group_status', 'investigation')
+            json_path: SQLite JSON path (e.g. '$.phase', '$.task_groups[0].id')
+            group_id: Group isolation key (default 'global' for session-level state)
+
+        Returns:
+            The field value (objects/arrays decoded), or None if the state or path is missing
+
+        Raises:
+            ValueError: If group_id or json_path is invalid
+        """
+        error = validate_scope_global_or_group(group_id)
+        if error:
+            raise ValueError(error)
+        if not isinstance(json_path, str) or not json_path.startswith('$'):
+            raise ValueError(f"json_path must start with '$', got: {json_path!r}")
+
+        conn = self._get_connection()
+        try:
+            row = conn.execute("""
+                SELECT json_type(state_data, ?), json_extract(state_data, ?)
+                FROM state_snapshots
+                WHERE session_id = ? AND state_type = ? AND group_id = ?
+            """, (json_path, json_path, session_id, state_type, group_id)).fetchone()
+        except sqlite3.OperationalError as e:
+            if "json path" in str(e).lower():
+                raise ValueError(f"Invalid json_path {json_path!r}: {e}")
+            raise
+        finally:
+            self._release_connection(conn)
+
+        if not row or row[0] is None:
+            return None
+        return _decode_json_extract(row[0], row[1])
 
     # ==================== TASK GROUP OPERATIONS ====================
 
@@ -1668,7 +2320,7 @@ class BazingaDB:
 
             conn = self._get_connection()
             # Serialize specializations to JSON (preserve [] vs None distinction)
-            specs_json = json.dumps(specializations) if specializations is not None else None
+            specs_json = _json_dumps(specializations) if specializations is not None else None
             # Use ON CONFLICT for true upsert - preserves existing metadata
             # COALESCE for status: INSERT uses 'pending' default, UPDATE preserves existing if None passed
             conn.execute("""
@@ -1688,20 +2340,56 @@ class BazingaDB:
             conn.commit()
 
             # Fetch and return the saved record
-            row = conn.execute("""
-                SELECT * FROM task_groups WHERE id = ? AND session_id = ?
-            """, (group_id, session_id)).fetchone()
+            row = conn.execute(_SQL_TASK_GROUP, (group_id, session_id)).fetchone()
 
             result = dict(row) if row else None
             self._print_success(f"✓ Task group saved: {group_id} (session: {session_id[:20]}...)")
             return {"success": True, "task_group": result}
 
         except Exception as e:
+            if conn:
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass  # Best-effort cleanup, ignore rollback failures
             print(f"! Failed to save task group {group_id}: {e}", file=sys.stderr)
             return {"success": False, "error": str(e)}
         finally:
             if conn:
-                conn.close()
+                self._release_connection(conn)
+
+    # Updatable task_groups columns in canonical SET-clause order
+    TASK_GROUP_UPDATE_COLUMNS = (
+        'status', 'assigned_to', 'revision_count', 'last_review_status', 'name',
+        'specializations', 'item_count', 'security_sensitive', 'qa_attempts',
+        'tl_review_attempts', 'component_path', 'initial_tier', 'complexity',
+        'review_iteration', 'no_progress_count', 'blocking_issues_count',
+        'speckit_task_ids',
+    )
+
+    # frozenset(columns) -> (UPDATE statement, ordered columns), filled on first use.
+    # Identical SQL text per field combination keeps sqlite3's statement cache warm.
+    _TASK_GROUP_UPDATE_SQL: Dict[frozenset, Tuple[str, Tuple[str, ...]]] = {}
+
+    @classmethod
+    def _task_group_update_sql(cls, keys: frozenset) -> Tuple[str, Tuple[str, ...]]:
+        """Return the cached UPDATE statement and parameter order for a field set."""
+        cached = cls._TASK_GROUP_UPDATE_SQL.get(keys)
+        if cached is None:
+            columns = tuple(c for c in cls.TASK_GROUP_UPDATE_COLUMNS if c in keys)
+            clauses = [
+                # Monotonic via SQL MAX() - atomic, avoids read-check-update races
+                "review_iteration = MAX(COALESCE(review_iteration, 0), ?)"
+                if c == 'review_iteration' else f"{c} = ?"
+                for c in columns
+            ]
+            clauses.append("updated_at = CURRENT_TIMESTAMP")
+            cached = (
+                f"UPDATE task_groups SET {', '.join(clauses)} WHERE id = ? AND session_id = ?",
+                columns,
+            )
+            cls._TASK_GROUP_UPDATE_SQL[keys] = cached
+        return cached
 
     def update_task_group(self, group_id: str, session_id: str, status: Optional[str] = None,
                          assigned_to: Optional[str] = None, revision_count: Optional[int] = None,
@@ -1776,43 +2464,30 @@ class BazingaDB:
                     normalized_specs.append(result)
                 specializations = normalized_specs
 
-            conn = self._get_connection()
-            updates = []
-            params = []
-
+            # Collect provided fields; SQL text is derived from the key set only
+            fields = {}
             if status:
-                updates.append("status = ?")
-                params.append(status)
+                fields['status'] = status
             if assigned_to:
-                updates.append("assigned_to = ?")
-                params.append(assigned_to)
+                fields['assigned_to'] = assigned_to
             if revision_count is not None:
-                updates.append("revision_count = ?")
-                params.append(revision_count)
+                fields['revision_count'] = revision_count
             if last_review_status:
-                updates.append("last_review_status = ?")
-                params.append(last_review_status)
+                fields['last_review_status'] = last_review_status
             if name:
-                updates.append("name = ?")
-                params.append(name)
+                fields['name'] = name
             if specializations is not None:
-                updates.append("specializations = ?")
-                params.append(json.dumps(specializations))
+                fields['specializations'] = _json_dumps(specializations)
             if item_count is not None:
-                updates.append("item_count = ?")
-                params.append(item_count)
+                fields['item_count'] = item_count
             if security_sensitive is not None:
-                updates.append("security_sensitive = ?")
-                params.append(security_sensitive)
+                fields['security_sensitive'] = security_sensitive
             if qa_attempts is not None:
-                updates.append("qa_attempts = ?")
-                params.append(qa_attempts)
+                fields['qa_attempts'] = qa_attempts
             if tl_review_attempts is not None:
-                updates.append("tl_review_attempts = ?")
-                params.append(tl_review_attempts)
+                fields['tl_review_attempts'] = tl_review_attempts
             if component_path is not None:
-                updates.append("component_path = ?")
-                params.append(component_path)
+                fields['component_path'] = component_path
             if initial_tier is not None:
                 valid_tiers = ('Developer', 'Senior Software Engineer')
                 if initial_tier not in valid_tiers:
@@ -1820,61 +2495,32 @@ class BazingaDB:
                         "success": False,
                         "error": f"initial_tier must be one of {valid_tiers}, got '{initial_tier}'"
                     }
-                updates.append("initial_tier = ?")
-                params.append(initial_tier)
+                fields['initial_tier'] = initial_tier
             if complexity is not None:
                 complexity_error = validate_complexity(complexity)
                 if complexity_error:
                     return {"success": False, "error": complexity_error}
-                updates.append("complexity = ?")
-                params.append(complexity)
+                fields['complexity'] = complexity
             if review_iteration is not None:
-                updates.append("review_iteration = ?")
-                params.append(review_iteration)
+                if review_iteration < 1:
+                    return {"success": False, "error": f"review_iteration must be >= 1: {review_iteration}"}
+                fields['review_iteration'] = review_iteration
+            # Server-side clamping for counters (defense in depth)
+            # Clamp negative values to 0 rather than rejecting - handles race conditions gracefully
+            # Note: no_progress_count is NOT monotonic - it resets to 0 on progress
             if no_progress_count is not None:
-                updates.append("no_progress_count = ?")
-                params.append(no_progress_count)
+                fields['no_progress_count'] = max(no_progress_count, 0)
             if blocking_issues_count is not None:
-                updates.append("blocking_issues_count = ?")
-                params.append(blocking_issues_count)
+                fields['blocking_issues_count'] = max(blocking_issues_count, 0)
             if speckit_task_ids is not None:
                 # Store as JSON array of task IDs (e.g., ["T001", "T002"])
-                updates.append("speckit_task_ids = ?")
-                params.append(json.dumps(speckit_task_ids))
-
-            # Server-side validation and clamping for counters (defense in depth)
-            # Clamp negative values to 0 rather than rejecting - handles race conditions gracefully
-            if no_progress_count is not None and no_progress_count < 0:
-                no_progress_count = 0
-                # Find and update the param value
-                for i, (u, p) in enumerate(zip(updates, params)):
-                    if "no_progress_count" in u:
-                        params[i] = 0
-                        break
-            if blocking_issues_count is not None and blocking_issues_count < 0:
-                blocking_issues_count = 0
-                # Find and update the param value
-                for i, (u, p) in enumerate(zip(updates, params)):
-                    if "blocking_issues_count" in u:
-                        params[i] = 0
-                        break
-            if review_iteration is not None and review_iteration < 1:
-                return {"success": False, "error": f"review_iteration must be >= 1: {review_iteration}"}
+                fields['speckit_task_ids'] = _json_dumps(speckit_task_ids)
 
-            # Monotonicity enforcement for review_iteration only (use SQL MAX for idempotency)
-            # Note: no_progress_count is NOT monotonic - it resets to 0 on progress
-            # Use field-name search instead of string equality for robustness
-            if review_iteration is not None:
-                # Use SQL-level MAX() to enforce monotonicity atomically
-                # This avoids race conditions from read-check-update pattern
-                for i, clause in enumerate(updates):
-                    if "review_iteration" in clause and "MAX(" not in clause:
-                        updates[i] = "review_iteration = MAX(COALESCE(review_iteration, 0), ?)"
-                        break
+            conn = self._get_connection()
 
-            if updates:
-                updates.append("updated_at = CURRENT_TIMESTAMP")
-                query = f"UPDATE task_groups SET {', '.join(updates)} WHERE id = ? AND session_id = ?"
+            if fields:
+                query, columns = self._task_group_update_sql(frozenset(fields))
+                params = [fields[column] for column in columns]
                 params.extend([group_id, session_id])
                 cursor = conn.execute(query, params)
                 conn.commit()
@@ -1883,9 +2529,9 @@ class BazingaDB:
                 if cursor.rowcount == 0:
                     if auto_create:
                         # Auto-create the task group if it doesn't exist
-                        # Close connection before delegating to create_task_group
-                        conn.close()
-                        conn = None  # Prevent double-close in finally block
+                        # Release connection before delegating to create_task_group
+                        self._release_connection(conn)
+                        conn = None  # Prevent double-release in finally block
                         group_name = name or f"Task Group {group_id}"
                         self._print_success(f"Task group {group_id} not found, auto-creating...")
                         return self.create_task_group(
@@ -1900,34 +2546,31 @@ class BazingaDB:
                     self._print_success(f"✓ Task group updated: {group_id} (session: {session_id[:20]}...)")
 
             # Fetch and return the updated record
-            row = conn.execute("""
-                SELECT * FROM task_groups WHERE id = ? AND session_id = ?
-            """, (group_id, session_id)).fetchone()
+            row = conn.execute(_SQL_TASK_GROUP, (group_id, session_id)).fetchone()
 
             return {"success": True, "task_group": dict(row) if row else None}
 
         except Exception as e:
+            if conn:
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass  # Best-effort cleanup, ignore rollback failures
             print(f"! Failed to update task group {group_id}: {e}", file=sys.stderr)
             return {"success": False, "error": str(e)}
         finally:
             if conn:
-                conn.close()
+                self._release_connection(conn)
 
     def get_task_groups(self, session_id: str, status: Optional[str] = None) -> List[Dict]:
         """Get task groups for a session."""
         conn = self._get_connection()
         if status:
-            rows = conn.execute("""
-                SELECT * FROM task_groups WHERE session_id = ? AND status = ?
-                ORDER BY created_at
-            """, (session_id, status)).fetchall()
+            rows = _fetch_dicts(conn.execute(_SQL_TASK_GROUPS_BY_STATUS, (session_id, status)))
         else:
-            rows = conn.execute("""
-                SELECT * FROM task_groups WHERE session_id = ?
-                ORDER BY created_at
-            """, (session_id,)).fetchall()
-        conn.close()
-        return [dict(row) for row in rows]
+            rows = _fetch_dicts(conn.execute(_SQL_TASK_GROUPS, (session_id,)))
+        self._release_connection(conn)
+        return rows
 
     # ==================== TOKEN USAGE OPERATIONS ====================
 
@@ -1935,35 +2578,40 @@ class BazingaDB:
                    agent_id: Optional[str] = None) -> None:
         """Log token usage."""
         conn = self._get_connection()
-        conn.execute("""
-            INSERT INTO token_usage (session_id, agent_type, agent_id, tokens_estimated)
-            VALUES (?, ?, ?, ?)
-        """, (session_id, agent_type, agent_id, tokens))
-        conn.commit()
-        conn.close()
+        self._execute_write(conn, _SQL_INSERT_TOKENS, (session_id, agent_type, agent_id, tokens))
+        self._release_connection(conn)
+
+    def log_tokens_batch(self, session_id: str, entries: List[Dict[str, Any]]) -> int:
+        """Log several token usage records with one executemany() and commit.
+
+        Args:
+            session_id: Session identifier
+            entries: Dicts with 'agent_type' and 'tokens', optionally 'agent_id'
+
+        Returns:
+            Number of rows inserted.
+        """
+        rows = [
+            (session_id, entry['agent_type'], entry.get('agent_id'), int(entry['tokens']))
+            for entry in entries
+        ]
+        conn = self._get_connection()
+        try:
+            self._execute_write(conn, _SQL_INSERT_TOKENS, rows, many=True)
+        finally:
+            self._release_connection(conn)
+        return len(rows)
 
     def get_token_summary(self, session_id: str, by: str = 'agent_type') -> Dict:
         """Get token usage summary grouped by agent_type or agent_id."""
         conn = self._get_connection()
-        if by == 'agent_type':
-            rows = conn.execute("""
-                SELECT agent_type, SUM(tokens_estimated) as total
-                FROM token_usage
-                WHERE session_id = ?
-                GROUP BY agent_type
-            """, (session_id,)).fetchall()
-        else:
-            rows = conn.execute("""
-                SELECT agent_id, SUM(tokens_estimated) as total
-                FROM token_usage
-                WHERE session_id = ?
-                GROUP BY agent_id
-            """, (session_id,)).fetchall()
-        conn.close()
-
-        result = {row[0]: row[1] for row in rows}
-        result['total'] = sum(result.values())
-        return result
+        sql = _SQL_TOKEN_SUMMARY['agent_type' if by == 'agent_type' else 'agent_id']
+        cursor = conn.execute(sql, (session_id, session_id))
+        # Plain (key, total) tuples feed dict() directly - no Row objects or list
+        cursor.row_factory = None
+        summary = dict(cursor)
+        self._release_connection(conn)
+        return summary
 
     # ==================== SKILL OUTPUT OPERATIONS ====================
 
@@ -1987,16 +2635,16 @@ class BazingaDB:
                 # Build WHERE clause properly for NULL handling
                 if agent_type is None and group_id is None:
                     where_clause = "agent_type IS NULL AND group_id IS NULL"
-                    params = (session_id, skill_name, json.dumps(output_data), session_id, skill_name)
+                    params = (session_id, skill_name, _json_dumps(output_data), session_id, skill_name)
                 elif agent_type is None:
                     where_clause = "agent_type IS NULL AND group_id = ?"
-                    params = (session_id, skill_name, json.dumps(output_data), group_id, session_id, skill_name, group_id)
+                    params = (session_id, skill_name, _json_dumps(output_data), group_id, session_id, skill_name, group_id)
                 elif group_id is None:
                     where_clause = "agent_type = ? AND group_id IS NULL"
-                    params = (session_id, skill_name, json.dumps(output_data), agent_type, session_id, skill_name, agent_type)
+                    params = (session_id, skill_name, _json_dumps(output_data), agent_type, session_id, skill_name, agent_type)
                 else:
                     where_clause = "agent_type = ? AND group_id = ?"
-                    params = (session_id, skill_name, json.dumps(output_data), agent_type, group_id, session_id, skill_name, agent_type, group_id)
+                    params = (session_id, skill_name, _json_dumps(output_data), agent_type, group_id, session_id, skill_name, agent_type, group_id)
 
                 cursor = conn.execute(f"""
                     INSERT INTO skill_outputs (session_id, skill_name, output_data, agent_type, group_id, iteration)
@@ -2012,7 +2660,7 @@ class BazingaDB:
                 """, (cursor.lastrowid,)).fetchone()['iteration']
 
                 conn.commit()
-                conn.close()
+                self._release_connection(conn)
                 break  # Success, exit retry loop
 
             except sqlite3.IntegrityError as e:
@@ -2023,11 +2671,11 @@ class BazingaDB:
                     time.sleep(0.01 * (attempt + 1))  # Brief backoff
                     continue
                 else:
-                    conn.close()
+                    self._release_connection(conn)
                     raise
             except Exception as e:
                 conn.rollback()
-                conn.close()
+                self._release_connection(conn)
                 raise
 
         if agent_type:
@@ -2058,8 +2706,71 @@ class BazingaDB:
                 ORDER BY timestamp DESC LIMIT 1
             """, (session_id, skill_name)).fetchone()
 
-        conn.close()
-        return json.loads(row['output_data']) if row else None
+        self._release_connection(conn)
+        return _json_loads(row['output_data']) if row else None
+
+    def get_skill_output_field(self, session_id: str, skill_name: str, json_path: str,
+                               agent_type: Optional[str] = None) -> Any:
+        """Get a single field from the latest skill output.
+
+        Same json_extract() projection as get_state_field(), so callers that
+        only need e.g. '$.status' skip decoding the full output_data.
+
+        Returns:
+            The field value (objects/arrays decoded), or None if the output or path is missing
+
+        Raises:
+            ValueError: If json_path is invalid
+        """
+        if not isinstance(json_path, str) or not json_path.startswith('$'):
+            raise ValueError(f"json_path must start with '$', got: {json_path!r}")
+
+        sql = """
+            SELECT json_type(output_data, ?), json_extract(output_data, ?)
+            FROM skill_outputs
+            WHERE session_id = ? AND skill_name = ?"""
+        params = [json_path, json_path, session_id, skill_name]
+        if agent_type:
+            sql += " AND agent_type = ?"
+            params.append(agent_type)
+        sql += " ORDER BY timestamp DESC LIMIT 1"
+
+        conn = self._get_connection()
+        try:
+            row = conn.execute(sql, params).fetchone()
+        except sqlite3.OperationalError as e:
+            if "json path" in str(e).lower():
+                raise ValueError(f"Invalid json_path {json_path!r}: {e}")
+            raise
+        finally:
+            self._release_connection(conn)
+
+        if not row or row[0] is None:
+            return None
+        return _decode_json_extract(row[0], row[1])
+
+    def has_skill_output(self, session_id: str, skill_name: str,
+                         agent_type: Optional[str] = None) -> bool:
+        """Check whether a skill has any output for the session.
+
+        Answered from the skill_outputs indexes alone (covering index search),
+        without reading the output_data pages.
+        """
+        conn = self._get_connection()
+        try:
+            if agent_type:
+                row = conn.execute("""
+                    SELECT EXISTS(SELECT 1 FROM skill_outputs
+                                  WHERE session_id = ? AND skill_name = ? AND agent_type = ?)
+                """, (session_id, skill_name, agent_type)).fetchone()
+            else:
+                row = conn.execute("""
+                    SELECT EXISTS(SELECT 1 FROM skill_outputs
+                                  WHERE session_id = ? AND skill_name = ?)
+                """, (session_id, skill_name)).fetchone()
+        finally:
+            self._release_connection(conn)
+        return bool(row[0])
 
     def get_skill_output_all(self, session_id: str, skill_name: str,
                             agent_type: Optional[str] = None) -> List[Dict]:
@@ -2087,14 +2798,14 @@ class BazingaDB:
                 ORDER BY timestamp DESC
             """, (session_id, skill_name)).fetchall()
 
-        conn.close()
+        self._release_connection(conn)
 
         return [{
             'iteration': row['iteration'],
             'agent_type': row['agent_type'],
             'group_id': row['group_id'],
             'timestamp': row['timestamp'],
-            'output_data': json.loads(row['output_data'])
+            'output_data': _json_loads(row['output_data'])
         } for row in rows]
 
     def check_skill_evidence(self, session_id: str, mandatory_skills: List[str],
@@ -2165,7 +2876,7 @@ class BazingaDB:
             }
 
         finally:
-            conn.close()
+            self._release_connection(conn)
 
     # ==================== CONFIGURATION OPERATIONS ====================
     # REMOVED: Configuration table no longer exists (2025-11-21)
@@ -2181,16 +2892,36 @@ class BazingaDB:
 
     # ==================== DASHBOARD DATA ====================
 
+    def iter_dashboard_snapshot(self, session_id: str) -> Iterator[Tuple[str, Any]]:
+        """Yield dashboard snapshot sections as (kind, data) pairs.
+
+        Each section is queried only when requested, so a consumer can emit it
+        before the next query runs and hold one section in memory at a time.
+        All sections are read inside one transaction, so they stay consistent
+        with each other even while agents keep writing.
+        """
+        with self._read_snapshot():
+            yield 'session', self.get_session(session_id)
+            yield 'orchestrator_state', self.get_latest_state(session_id, 'orchestrator')
+            yield 'pm_state', self.get_latest_state(session_id, 'pm')
+            yield 'task_groups', self.get_task_groups(session_id)
+            yield 'token_summary', self.get_token_summary(session_id)
+            yield 'recent_logs', self.get_logs(session_id, limit=10)
+
     def get_dashboard_snapshot(self, session_id: str) -> Dict:
         """Get complete dashboard data snapshot."""
-        return {
-            'session': self.get_session(session_id),
-            'orchestrator_state': self.get_latest_state(session_id, 'orchestrator'),
-            'pm_state': self.get_latest_state(session_id, 'pm'),
-            'task_groups': self.get_task_groups(session_id),
-            'token_summary': self.get_token_summary(session_id),
-            'recent_logs': self.get_logs(session_id, limit=10)
-        }
+        return dict(self.iter_dashboard_snapshot(session_id))
+
+    def stream_dashboard_snapshot(self, session_id: str, out: TextIO) -> None:
+        """Write the dashboard snapshot to `out` as NDJSON, one section per line.
+
+        Lines look like {"kind": "session", "data": {...}} and are flushed as
+        soon as each section is serialized.
+        """
+        for kind, data in self.iter_dashboard_snapshot(session_id):
+            out.write(_ascii_json(_json_dumps({'kind': kind, 'data': data})))
+            out.write('\n')
+            out.flush()
 
     # ==================== DEVELOPMENT PLAN OPERATIONS ====================
 
@@ -2200,8 +2931,8 @@ class BazingaDB:
                              metadata: Optional[Dict] = None) -> None:
         """Save or update development plan for a session."""
         conn = self._get_connection()
-        metadata_json = json.dumps(metadata) if metadata else None
-        phases_json = json.dumps(phases)
+        metadata_json = _json_dumps(metadata) if metadata else None
+        phases_json = _json_dumps(phases)
 
         conn.execute("""
             INSERT OR REPLACE INTO development_plans
@@ -2209,7 +2940,7 @@ class BazingaDB:
             VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
         """, (session_id, original_prompt, plan_text, phases_json, current_phase, total_phases, metadata_json))
         conn.commit()
-        conn.close()
+        self._release_connection(conn)
         self._print_success(f"✓ Saved development plan for session {session_id}")
 
     def get_development_plan(self, session_id: str) -> Optional[Dict]:
@@ -2218,15 +2949,15 @@ class BazingaDB:
         row = conn.execute("""
             SELECT * FROM development_plans WHERE session_id = ?
         """, (session_id,)).fetchone()
-        conn.close()
+        self._release_connection(conn)
 
         if not row:
             return None
 
         plan = dict(row)
-        plan['phases'] = json.loads(plan['phases'])
+        plan['phases'] = _json_loads(plan['phases'])
         if plan['metadata']:
-            plan['metadata'] = json.loads(plan['metadata'])
+            plan['metadata'] = _json_loads(plan['metadata'])
         return plan
 
     def update_plan_progress(self, session_id: str, phase_id: Union[int, str], status: str,
@@ -2283,9 +3014,9 @@ class BazingaDB:
             UPDATE development_plans
             SET phases = ?, current_phase = ?, updated_at = CURRENT_TIMESTAMP
             WHERE session_id = ?
-        """, (json.dumps(phases), current_phase, session_id))
+        """, (_json_dumps(phases), current_phase, session_id))
         conn.commit()
-        conn.close()
+        self._release_connection(conn)
         self._print_success(f"✓ Updated phase '{phase_id}' status to: {status}")
 
     # ==================== SUCCESS CRITERIA OPERATIONS ====================
@@ -2338,7 +3069,7 @@ class BazingaDB:
             conn.rollback()
             raise RuntimeError(f"Failed to save success criteria: {str(e)}")
         finally:
-            conn.close()
+            self._release_connection(conn)
 
     def get_success_criteria(self, session_id: str) -> List[Dict]:
         """Get all success criteria for a session."""
@@ -2350,7 +3081,7 @@ class BazingaDB:
             WHERE session_id = ?
             ORDER BY id
         """, (session_id,)).fetchall()
-        conn.close()
+        self._release_connection(conn)
         return [dict(row) for row in rows]
 
     def update_success_criterion(self, session_id: str, criterion: str,
@@ -2390,7 +3121,7 @@ class BazingaDB:
             else:
                 self._print_success(f"✓ Updated criterion: {criterion[:50]}...")
 
-        conn.close()
+        self._release_connection(conn)
 
     # ==================== CONTEXT PACKAGE OPERATIONS ====================
 
@@ -2506,10 +3237,10 @@ class BazingaDB:
             conn.commit()
         except Exception as e:
             conn.rollback()
-            conn.close()
+            self._release_connection(conn)
             raise RuntimeError(f"Failed to save context package: {e}")
 
-        conn.close()
+        self._release_connection(conn)
 
         self._print_success(f"✓ Created context package {package_id} ({package_type}) with {len(consumers)} consumers")
         return {"package_id": package_id, "file_path": normalized_path, "consumers_created": len(consumers)}
@@ -2561,7 +3292,7 @@ class BazingaDB:
         """, (session_id, group_id, agent_type, limit))
 
         rows = cursor.fetchall()
-        conn.close()
+        self._release_connection(conn)
 
         return [dict(row) for row in rows]
 
@@ -2606,13 +3337,13 @@ class BazingaDB:
             """, (package_id, agent_type))
             if cursor.fetchone() is None:
                 # Agent was never designated as consumer - don't create implicit entry
-                conn.close()
+                self._release_connection(conn)
                 print(f"! Agent '{agent_type}' was not designated as consumer for package {package_id}", file=sys.stderr)
                 return False
             # Consumer exists but already consumed - that's fine
 
         conn.commit()
-        conn.close()
+        self._release_connection(conn)
         self._print_success(f"✓ Marked package {package_id} as consumed by {agent_type} (iteration {iteration})")
         return True
 
@@ -2630,15 +3361,15 @@ class BazingaDB:
             UPDATE task_groups
             SET context_references = ?, updated_at = CURRENT_TIMESTAMP
             WHERE id = ? AND session_id = ?
-        """, (json.dumps(package_ids), group_id, session_id))
+        """, (_json_dumps(package_ids), group_id, session_id))
 
         if cursor.rowcount == 0:
-            conn.close()
+            self._release_connection(conn)
             print(f"! Warning: No task group found with id='{group_id}' and session_id='{session_id}'", file=sys.stderr)
             return
 
         conn.commit()
-        conn.close()
+        self._release_connection(conn)
         self._print_success(f"✓ Updated context references for {group_id}: {package_ids}")
 
     # ==================== REASONING CAPTURE OPERATIONS ====================
@@ -2682,19 +3413,19 @@ class BazingaDB:
             Dict with success status and log details
         """
         # Validate inputs
-        if not session_id or not session_id.strip():
+        if not session_id or session_id.isspace():
             raise ValueError("session_id cannot be empty")
         # Phase 6: Session-level reasoning allowed (PM uses 'global')
         error = validate_scope_global_or_group(group_id)
         if error:
             raise ValueError(error)
-        if not agent_type or not agent_type.strip():
+        if not agent_type or agent_type.isspace():
             raise ValueError("agent_type cannot be empty")
-        if not reasoning_phase or not reasoning_phase.strip():
+        if not reasoning_phase or reasoning_phase.isspace():
             raise ValueError("reasoning_phase cannot be empty")
         if reasoning_phase not in self.VALID_REASONING_PHASES:
             raise ValueError(f"Invalid reasoning_phase: {reasoning_phase}. Must be one of: {sorted(self.VALID_REASONING_PHASES)}")
-        if not content or not content.strip():
+        if not content or content.isspace():
             raise ValueError("content cannot be empty")
         if confidence is not None and confidence not in self.VALID_CONFIDENCE_LEVELS:
             raise ValueError(f"Invalid confidence: {confidence}. Must be one of: {sorted(self.VALID_CONFIDENCE_LEVELS)}")
@@ -2713,7 +3444,7 @@ class BazingaDB:
             self._print_warning("Secrets detected and redacted from reasoning content")
 
         # Serialize references
-        references_json = json.dumps(references) if references else None
+        references_json = _json_dumps(references) if references else None
 
         conn = None
         try:
@@ -2762,7 +3493,7 @@ class BazingaDB:
                 time.sleep(wait_time)
                 if conn:
                     try:
-                        conn.close()
+                        self._release_connection(conn)
                     except Exception:
                         pass  # Best-effort cleanup, ignore close failures
                 return self.save_reasoning(
@@ -2771,6 +3502,11 @@ class BazingaDB:
                     _retry_count=_retry_count + 1
                 )
             # Retries exhausted or non-lock error - return structured error (don't raise)
+            if conn:
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass  # Best-effort cleanup, ignore rollback failures
             self._print_error(f"Database error saving {agent_type} reasoning: {str(e)}")
             return {"success": False, "error": str(e)}
         except Exception as e:
@@ -2783,7 +3519,7 @@ class BazingaDB:
             return {"success": False, "error": str(e)}
         finally:
             if conn:
-                conn.close()
+                self._release_connection(conn)
 
     def get_reasoning(self, session_id: str, group_id: Optional[str] = None,
                       agent_type: Optional[str] = None,
@@ -2839,7 +3575,7 @@ class BazingaDB:
         params.append(limit)
 
         rows = conn.execute(query, params).fetchall()
-        conn.close()
+        self._release_connection(conn)
 
         results = []
         for row in rows:
@@ -2847,7 +3583,7 @@ class BazingaDB:
             # Parse references_json back to list
             if entry.get('references_json'):
                 try:
-                    entry['references'] = json.loads(entry['references_json'])
+                    entry['references'] = _json_loads(entry['references_json'])
                 except json.JSONDecodeError:
                     entry['references'] = []
             else:
@@ -2938,12 +3674,12 @@ class BazingaDB:
         query += " ORDER BY timestamp ASC"
 
         rows = conn.execute(query, params).fetchall()
-        conn.close()
+        self._release_connection(conn)
 
         entries = [dict(row) for row in rows]
 
         if output_format == 'json':
-            return json.dumps(entries, indent=2)
+            return _json_dumps(entries, pretty=True)
 
         # Markdown format
         if not entries:
@@ -3021,7 +3757,7 @@ class BazingaDB:
             WHERE session_id = ? AND group_id = ? AND agent_type = ?
               AND log_type = 'reasoning' AND reasoning_phase IS NOT NULL
         """, (session_id, group_id, agent_type)).fetchall()
-        conn.close()
+        self._release_connection(conn)
 
         documented = {row['reasoning_phase'] for row in rows}
         missing = list(self.MANDATORY_PHASES - documented)
@@ -3122,12 +3858,12 @@ class BazingaDB:
         )
 
         # T025: Redact secrets from signature and solution
-        signature_json = json.dumps(signature)
+        signature_json = _json_dumps(signature)
         signature_json, sig_redacted = scan_and_redact(signature_json)
         solution, sol_redacted = scan_and_redact(solution)
 
         # T026: Generate pattern hash
-        pattern_hash = self._generate_pattern_hash(json.loads(signature_json))
+        pattern_hash = self._generate_pattern_hash(_json_loads(signature_json))
 
         conn = self._get_connection()
         try:
@@ -3180,7 +3916,7 @@ class BazingaDB:
             conn.rollback()
             raise RuntimeError(f"Failed to save error pattern: {str(e)}")
         finally:
-            conn.close()
+            self._release_connection(conn)
 
     def get_error_patterns(self, project_id: str, lang: str = None,
                           min_confidence: float = 0.7,
@@ -3219,14 +3955,14 @@ class BazingaDB:
                 LIMIT ?
             """, (project_id, min_confidence, limit)).fetchall()
 
-        conn.close()
+        self._release_connection(conn)
 
         result = []
         for row in rows:
             pattern = dict(row)
             # Parse signature JSON
             try:
-                pattern['signature'] = json.loads(pattern.pop('signature_json'))
+                pattern['signature'] = _json_loads(pattern.pop('signature_json'))
             except json.JSONDecodeError:
                 pattern['signature'] = {}
             result.append(pattern)
@@ -3289,7 +4025,7 @@ class BazingaDB:
             conn.rollback()
             raise RuntimeError(f"Failed to update confidence: {str(e)}")
         finally:
-            conn.close()
+            self._release_connection(conn)
 
     def cleanup_expired_patterns(self, project_id: str = None) -> Dict[str, Any]:
         """T031: Remove patterns that have exceeded their TTL.
@@ -3330,7 +4066,7 @@ class BazingaDB:
             conn.rollback()
             raise RuntimeError(f"Failed to cleanup patterns: {str(e)}")
         finally:
-            conn.close()
+            self._release_connection(conn)
 
     # ==================== CONSUMPTION SCOPE OPERATIONS ====================
 
@@ -3389,7 +4125,7 @@ class BazingaDB:
             conn.rollback()
             raise RuntimeError(f"Failed to save consumption: {str(e)}")
         finally:
-            conn.close()
+            self._release_connection(conn)
 
     def get_consumption(self, session_id: str, group_id: Optional[str] = None,
                         agent_type: Optional[str] = None, limit: int = 50) -> List[Dict]:
@@ -3431,7 +4167,7 @@ class BazingaDB:
             rows = conn.execute(sql, params).fetchall()
             return [dict(row) for row in rows]
         finally:
-            conn.close()
+            self._release_connection(conn)
 
     # ==================== STRATEGIES OPERATIONS ====================
 
@@ -3489,7 +4225,7 @@ class BazingaDB:
             conn.rollback()
             raise RuntimeError(f"Failed to save strategy: {str(e)}")
         finally:
-            conn.close()
+            self._release_connection(conn)
 
     def get_strategies(self, project_id: str, lang: Optional[str] = None,
                        framework: Optional[str] = None, topic: Optional[str] = None,
@@ -3535,7 +4271,7 @@ class BazingaDB:
             rows = conn.execute(sql, params).fetchall()
             return [dict(row) for row in rows]
         finally:
-            conn.close()
+            self._release_connection(conn)
 
     def update_strategy_helpfulness(self, strategy_id: str, increment: int = 1) -> Dict[str, Any]:
         """Increment strategy helpfulness counter (T038).
@@ -3583,7 +4319,7 @@ class BazingaDB:
             conn.rollback()
             raise RuntimeError(f"Failed to update helpfulness: {str(e)}")
         finally:
-            conn.close()
+            self._release_connection(conn)
 
     def extract_strategies(self, session_id: str, group_id: str, project_id: str,
                            lang: Optional[str] = None, framework: Optional[str] = None) -> Dict[str, Any]:
@@ -3654,7 +4390,7 @@ class BazingaDB:
             conn.rollback()
             raise RuntimeError(f"Failed to extract strategies: {str(e)}")
         finally:
-            conn.close()
+            self._release_connection(conn)
 
     # ==================== DIAGNOSTIC OPERATIONS ====================
 
@@ -3771,20 +4507,38 @@ class BazingaDB:
                 conn.rollback()
             raise RuntimeError(f"Failed to diagnose group_ids: {str(e)}")
         finally:
-            conn.close()
+            self._release_connection(conn)
 
     # ==================== QUERY OPERATIONS ====================
 
     def query(self, sql: str, params: tuple = ()) -> List[Dict]:
-        """Execute custom SQL query (read-only)."""
-        if not sql.strip().upper().startswith('SELECT'):
-            print("Error: Only SELECT queries allowed", file=sys.stderr)
-            sys.exit(1)
+        """Execute custom SQL query (read-only).
 
-        conn = self._get_connection()
-        rows = conn.execute(sql, params).fetchall()
-        conn.close()
-        return [dict(row) for row in rows]
+        Raises:
+            PermissionError: If the statement is not a SELECT (or WITH ... SELECT).
+        """
+        if not READ_ONLY_QUERY_PATTERN.match(sql):
+            raise PermissionError("Only SELECT queries allowed")
+
+        if self.db_path == ':memory:':
+            # A second connection would open a different, empty database
+            conn = self._get_connection()
+            try:
+                conn.execute("PRAGMA query_only = ON")
+                rows = _fetch_dicts(conn.execute(sql, params))
+            finally:
+                # Connection is reused - never leak read-only mode to later writes
+                conn.execute("PRAGMA query_only = OFF")
+                self._release_connection(conn)
+            return rows
+
+        conn = self._get_read_only_connection()
+        try:
+            rows = _fetch_dicts(conn.execute(sql, params))
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+        return rows
 
 
 def print_help():
@@ -3803,11 +4557,16 @@ SESSION OPERATIONS:
 LOG OPERATIONS:
   log-interaction <session> <agent> <content> [iteration] [agent_id]
                                               Log agent interaction
+  log-interactions-batch <session> <json_array|--file path>
+                                              Log many interactions in one transaction
   stream-logs <session> [limit] [offset]      Stream logs in markdown (default: limit=50, offset=0)
+  batch <json_array|--file path>              Run write commands in one transaction
+                                              (items: ["log-interaction", "<session>", ...])
 
 STATE OPERATIONS:
   save-state <session> <type> <json_data>     Save state snapshot
   get-state <session> <type>                  Get latest state snapshot
+  get-state-field <session> <type> <json_path> Get one field of latest state (e.g. '$.phase')
 
 TASK GROUP OPERATIONS:
   create-task-group <group_id> <session> <name> [status] [assigned_to]
@@ -3824,6 +4583,8 @@ TASK GROUP OPERATIONS:
 TOKEN OPERATIONS:
   log-tokens <session> <agent> <tokens> [agent_id]
                                               Log token usage
+  log-tokens-batch <session> <json_array|--file path>
+                                              Log many token records in one transaction
   token-summary <session> [by]                Get token summary (default: by=agent_type)
 
 SKILL OUTPUT OPERATIONS:
@@ -3831,6 +4592,10 @@ SKILL OUTPUT OPERATIONS:
                                               Save skill output (iteration auto-computed)
   get-skill-output <session> <skill> [--agent X]
                                               Get latest skill output
+  get-skill-output-field <session> <skill> <json_path> [--agent X]
+                                              Get one field of latest skill output
+  has-skill-output <session> <skill> [--agent X]
+                                              Check if a skill has any output (true/false)
   get-skill-output-all <session> <skill> [--agent X]
                                               Get all skill outputs (multi-invocation)
   check-skill-evidence <session> <skill1,skill2,...> [--agent X] [--since N]
@@ -3905,10 +4670,12 @@ STRATEGIES OPERATIONS (Context Engineering):
 QUERY OPERATIONS:
   query <sql>                                 Execute custom SELECT query
   dashboard-snapshot <session>                Get complete dashboard data
+  dashboard-stream <session>                  Same data as NDJSON, one section per line
 
 DATABASE MAINTENANCE:
   integrity-check                             Check database integrity
   recover-db                                  Attempt to recover corrupted database
+  rebuild-indexes                             Recreate missing indexes + ANALYZE (after bulk import)
   diagnose-group-ids [--fix]                  Scan for invalid group_ids (--fix to auto-repair)
   detect-paths                                Show auto-detected paths (debugging)
 
@@ -3967,1229 +4734,1621 @@ def _resolve_db_path(args) -> str:
         sys.exit(1)
 
 
-def main():
-    # Ensure we're in project root for relative path resolution
-    _ensure_cwd_at_project_root()
+# Global CLI options; everything after the command is passed to its handler
+_CLI_USAGE = "usage: bazinga_db.py [-h] [--db DB] [--project-root PROJECT_ROOT] [--quiet] command ..."
 
-    parser = argparse.ArgumentParser(
-        description='BAZINGA Database Client',
-        epilog='Run with "help" command to see all available commands'
-    )
-    parser.add_argument('--db', required=False, help='Database path (auto-detected if not provided)')
-    parser.add_argument('--project-root', required=False, help='Project root directory (for auto-detection)')
-    parser.add_argument('--quiet', action='store_true', help='Suppress success messages, only show errors')
-    parser.add_argument('command', help='Command to execute')
-    parser.add_argument('args', nargs=argparse.REMAINDER, help='Command arguments')
 
-    args = parser.parse_args()
+def _cli_usage_error(message: str) -> None:
+    """Print an argparse-style usage error and exit with status 2."""
+    print(_CLI_USAGE, file=sys.stderr)
+    print(f"bazinga_db.py: error: {message}", file=sys.stderr)
+    sys.exit(2)
 
-    # Handle detect-paths command before resolving db
-    if args.command == 'detect-paths':
-        if _HAS_BAZINGA_PATHS:
-            info = get_detection_info()
-            print(json.dumps(info, indent=2))
+
+def _parse_cli_args(argv: List[str]) -> SimpleNamespace:
+    """Parse global options and split off the command and its arguments.
+
+    The CLI shape is fixed (`[--db PATH] [--project-root DIR] [--quiet] command args...`),
+    so a direct scan replaces argparse and its import cost on every invocation.
+    Arguments after the command are passed through untouched (like nargs=REMAINDER).
+    """
+    args = SimpleNamespace(db=None, project_root=None, quiet=False, command=None, args=[])
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ('-h', '--help'):
+            print(_CLI_USAGE)
+            print('\nRun with "help" command to see all available commands')
+            sys.exit(0)
+        elif arg == '--quiet':
+            args.quiet = True
+        elif arg in ('--db', '--project-root') or arg.startswith(('--db=', '--project-root=')):
+            name, has_value, value = arg.partition('=')
+            if not has_value:
+                if i + 1 >= len(argv):
+                    _cli_usage_error(f"argument {name}: expected one argument")
+                i += 1
+                value = argv[i]
+            setattr(args, name[2:].replace('-', '_'), value)
+        elif arg.startswith('-'):
+            _cli_usage_error(f"unrecognized arguments: {arg}")
         else:
-            print(json.dumps({"error": "bazinga_paths module not available"}, indent=2))
-        sys.exit(0)
+            args.command = arg
+            args.args = argv[i + 1:]
+            return args
+        i += 1
+    _cli_usage_error("the following arguments are required: command")
 
-    # Resolve database path
-    db_path = _resolve_db_path(args)
-    db = BazingaDB(db_path, quiet=args.quiet)
 
-    # Parse command and execute
-    cmd = args.command
-    cmd_args = args.args
+def _cmd_create_session(db: BazingaDB, cmd_args: List[str]) -> None:
+    # create-session <session_id> <mode> <requirements> [--initial_branch X] [--metadata JSON]
+    if len(cmd_args) < 3:
+        print("Error: create-session requires at least 3 args: <session_id> <mode> <requirements>", file=sys.stderr)
+        sys.exit(1)
+    session_id = cmd_args[0]
+    mode = cmd_args[1]
+    requirements = cmd_args[2]
+    initial_branch = None
+    metadata = None
+    # Parse optional flags
+    i = 3
+    while i < len(cmd_args):
+        if cmd_args[i] == '--initial_branch' and i + 1 < len(cmd_args):
+            initial_branch = cmd_args[i + 1]
+            i += 2
+        elif cmd_args[i] == '--metadata' and i + 1 < len(cmd_args):
+            metadata = cmd_args[i + 1]
+            i += 2
+        else:
+            print(f"Error: Unknown flag or missing value: {cmd_args[i]}", file=sys.stderr)
+            sys.exit(1)
+    result = db.create_session(session_id, mode, requirements, initial_branch, metadata)
+    # Output verification data as JSON
+    print(_json_dumps(result, pretty=True))
+
+
+def _cmd_get_session(db: BazingaDB, cmd_args: List[str]) -> None:
+    if len(cmd_args) < 1:
+        print(_json_dumps({"success": False, "error": "get-session requires <session_id>"}, pretty=True), file=sys.stderr)
+        sys.exit(1)
+    session = db.get_session(cmd_args[0])
+    if session:
+        print(_json_dumps(session, pretty=True))
+    else:
+        print(_json_dumps({"success": False, "error": f"Session not found: {cmd_args[0]}"}, pretty=True), file=sys.stderr)
+        sys.exit(1)
+
+
+def _cmd_list_sessions(db: BazingaDB, cmd_args: List[str]) -> None:
+    limit = int(cmd_args[0]) if len(cmd_args) > 0 else 10
+    sessions = db.list_sessions(limit)
+    print(_json_dumps(sessions, pretty=True))
 
+
+def _cmd_log_interaction(db: BazingaDB, cmd_args: List[str]) -> None:
+    result = db.log_interaction(cmd_args[0], cmd_args[1], cmd_args[2],
+                     int(cmd_args[3]) if len(cmd_args) > 3 else None,
+                     cmd_args[4] if len(cmd_args) > 4 else None)
+    # Output verification data as JSON
+    print(_json_dumps(result, pretty=True))
+
+
+def _load_batch_entries(cmd: str, cmd_args: List[str]) -> List[Dict[str, Any]]:
+    """Read a batch command's JSON array from cmd_args[1] or --file <path>."""
+    if len(cmd_args) < 2:
+        print(f"Error: {cmd} requires <session_id> <json_array|--file path>", file=sys.stderr)
+        sys.exit(1)
+    if cmd_args[1] == '--file':
+        if len(cmd_args) < 3:
+            print("Error: --file requires a path argument", file=sys.stderr)
+            sys.exit(1)
+        with open(cmd_args[2], 'r', encoding='utf-8') as f:
+            entries = _json_loads(f.read())
+    else:
+        entries = _json_loads(cmd_args[1])
+    if not isinstance(entries, list) or not all(isinstance(e, dict) for e in entries):
+        print(f"Error: {cmd} expects a JSON array of objects", file=sys.stderr)
+        sys.exit(1)
+    return entries
+
+
+# Commands that write through _execute_write and so can join a batch transaction
+_BATCH_COMMANDS = frozenset({
+    'create-session', 'update-session-status', 'log-interaction', 'log-interactions-batch',
+    'save-state', 'log-tokens', 'log-tokens-batch',
+})
+
+
+def _batch_output(text: str) -> Any:
+    """A batch member's captured stdout: parsed JSON, plain text, or None if empty."""
+    text = text.strip()
+    if not text:
+        return None
     try:
-        if cmd == 'create-session':
-            # create-session <session_id> <mode> <requirements> [--initial_branch X] [--metadata JSON]
-            if len(cmd_args) < 3:
-                print("Error: create-session requires at least 3 args: <session_id> <mode> <requirements>", file=sys.stderr)
-                sys.exit(1)
-            session_id = cmd_args[0]
-            mode = cmd_args[1]
-            requirements = cmd_args[2]
-            initial_branch = None
-            metadata = None
-            # Parse optional flags
-            i = 3
-            while i < len(cmd_args):
-                if cmd_args[i] == '--initial_branch' and i + 1 < len(cmd_args):
-                    initial_branch = cmd_args[i + 1]
-                    i += 2
-                elif cmd_args[i] == '--metadata' and i + 1 < len(cmd_args):
-                    metadata = cmd_args[i + 1]
-                    i += 2
-                else:
-                    print(f"Error: Unknown flag or missing value: {cmd_args[i]}", file=sys.stderr)
-                    sys.exit(1)
-            result = db.create_session(session_id, mode, requirements, initial_branch, metadata)
-            # Output verification data as JSON
-            print(json.dumps(result, indent=2))
-        elif cmd == 'get-session':
-            if len(cmd_args) < 1:
-                print(json.dumps({"success": False, "error": "get-session requires <session_id>"}, indent=2), file=sys.stderr)
-                sys.exit(1)
-            session = db.get_session(cmd_args[0])
-            if session:
-                print(json.dumps(session, indent=2))
-            else:
-                print(json.dumps({"success": False, "error": f"Session not found: {cmd_args[0]}"}, indent=2), file=sys.stderr)
-                sys.exit(1)
-        elif cmd == 'list-sessions':
-            limit = int(cmd_args[0]) if len(cmd_args) > 0 else 10
-            sessions = db.list_sessions(limit)
-            print(json.dumps(sessions, indent=2))
-        elif cmd == 'log-interaction':
-            result = db.log_interaction(cmd_args[0], cmd_args[1], cmd_args[2],
-                             int(cmd_args[3]) if len(cmd_args) > 3 else None,
-                             cmd_args[4] if len(cmd_args) > 4 else None)
-            # Output verification data as JSON
-            print(json.dumps(result, indent=2))
-        elif cmd == 'save-state':
-            # save-state <session_id> <state_type> <json_data|--state-file path> [--group-id <id>]
-            # Support --state-file for reading state from file (avoids shell escaping issues)
-            if '--state-file' in cmd_args:
-                idx = cmd_args.index('--state-file')
-                if idx + 1 < len(cmd_args):
-                    state_file = cmd_args[idx + 1]
-                    with open(state_file, 'r') as f:
-                        state_data = json.load(f)
-                else:
-                    print("Error: --state-file requires a path argument", file=sys.stderr)
-                    sys.exit(1)
-            else:
-                state_data = json.loads(cmd_args[2])
-            group_id = 'global'
-            if '--group-id' in cmd_args:
-                idx = cmd_args.index('--group-id')
-                if idx + 1 < len(cmd_args):
-                    group_id = cmd_args[idx + 1]
-            result = db.save_state(cmd_args[0], cmd_args[1], state_data, group_id=group_id)
-            print(json.dumps(result, indent=2))
-        elif cmd == 'get-state':
-            # get-state <session_id> <state_type> [--group-id <id>]
-            group_id = 'global'
-            if '--group-id' in cmd_args:
-                idx = cmd_args.index('--group-id')
-                if idx + 1 < len(cmd_args):
-                    group_id = cmd_args[idx + 1]
-            result = db.get_latest_state(cmd_args[0], cmd_args[1], group_id=group_id)
-            print(json.dumps(result, indent=2))
-        elif cmd == 'stream-logs':
-            limit = int(cmd_args[1]) if len(cmd_args) > 1 else 50
-            offset = int(cmd_args[2]) if len(cmd_args) > 2 else 0
-            print(db.stream_logs(cmd_args[0], limit, offset))
-        elif cmd == 'dashboard-snapshot':
-            result = db.get_dashboard_snapshot(cmd_args[0])
-            print(json.dumps(result, indent=2))
-        elif cmd == 'log-tokens':
-            session_id = cmd_args[0]
-            agent_type = cmd_args[1]
-            tokens = int(cmd_args[2])
-            agent_id = cmd_args[3] if len(cmd_args) > 3 else None
-            db.log_tokens(session_id, agent_type, tokens, agent_id)
-            db._print_success(f"✓ Logged {tokens} tokens for {agent_type}")
-        elif cmd == 'token-summary':
-            by = cmd_args[1] if len(cmd_args) > 1 else 'agent_type'
-            result = db.get_token_summary(cmd_args[0], by)
-            print(json.dumps(result, indent=2))
-        elif cmd == 'save-skill-output':
-            # Parse --agent and --group flags
-            agent_type = None
-            group_id = None
-            positional_args = []
-            i = 0
-            while i < len(cmd_args):
-                if cmd_args[i] == '--agent' and i + 1 < len(cmd_args):
-                    agent_type = cmd_args[i + 1]
-                    i += 2
-                elif cmd_args[i] == '--group' and i + 1 < len(cmd_args):
-                    group_id = cmd_args[i + 1]
-                    i += 2
-                else:
-                    positional_args.append(cmd_args[i])
-                    i += 1
-            # Validate required arguments
-            if len(positional_args) < 3:
-                print(json.dumps({
-                    "success": False,
-                    "error": "save-skill-output requires <session_id> <skill_name> <output_json> [--agent <type>] [--group <id>]"
-                }, indent=2), file=sys.stderr)
-                sys.exit(1)
-            session_id = positional_args[0]
-            skill_name = positional_args[1]
+        return _json_loads(text)
+    except ValueError:
+        return text
+
+
+def _cmd_batch(db: BazingaDB, cmd_args: List[str]) -> None:
+    # batch <json_array|--file path>
+    # Each item: ["command", "arg1", ...], run in order inside one transaction
+    if not cmd_args:
+        print("Error: batch requires <json_array|--file path>", file=sys.stderr)
+        sys.exit(1)
+    if cmd_args[0] == '--file':
+        if len(cmd_args) < 2:
+            print("Error: --file requires a path argument", file=sys.stderr)
+            sys.exit(1)
+        with open(cmd_args[1], 'r', encoding='utf-8') as f:
+            commands = _json_loads(f.read())
+    else:
+        commands = _json_loads(cmd_args[0])
+    if not isinstance(commands, list) or not all(
+        isinstance(c, list) and c and all(isinstance(a, str) for a in c) for c in commands
+    ):
+        print("Error: batch expects a JSON array of [command, args...] string arrays", file=sys.stderr)
+        sys.exit(1)
+    unsupported = sorted({c[0] for c in commands} - _BATCH_COMMANDS)
+    if unsupported:
+        print(f"Error: not allowed in batch: {', '.join(unsupported)} "
+              f"(allowed: {', '.join(sorted(_BATCH_COMMANDS))})", file=sys.stderr)
+        sys.exit(1)
+
+    # Each command's output is held back until the batch has committed, so
+    # nothing reports success for writes that end up rolled back
+    results = []
+    index, command, output = None, None, io.StringIO()
+    try:
+        with db.transaction():
+            for index, (command, *args) in enumerate(commands):
+                output = io.StringIO()
+                with contextlib.redirect_stdout(output):
+                    _COMMANDS[command](db, args)
+                # A writer that hit an error marks the block failed; stop at the first one
+                if db._get_connection().block_failed:
+                    raise RuntimeError(f"{command} failed")
+                results.append(_batch_output(output.getvalue()))
+            index, command = None, None
+    except (Exception, SystemExit) as e:
+        detail = _batch_output(output.getvalue()) if command else None
+        if detail is None and not isinstance(e, SystemExit):
+            detail = str(e)
+        failed = f"batch[{index}] {command}" if command else "batch commit"
+        print(_json_dumps({
+            "success": False,
+            "error": f"{failed} failed; batch rolled back",
+            "failed_index": index,
+            "detail": detail,
+        }, pretty=True))
+        sys.exit(1)
+    print(_json_dumps({"success": True, "commands": len(commands), "results": results}, pretty=True))
+
+
+def _cmd_log_interactions_batch(db: BazingaDB, cmd_args: List[str]) -> None:
+    # log-interactions-batch <session_id> <json_array|--file path>
+    # Each item: {"agent_type": ..., "content": ..., "iteration"?: N, "agent_id"?: ...}
+    entries = _load_batch_entries('log-interactions-batch', cmd_args)
+    result = db.log_interactions_batch(cmd_args[0], entries)
+    print(_json_dumps(result, pretty=True))
+    if not result['success']:
+        sys.exit(1)
+
+
+def _cmd_save_state(db: BazingaDB, cmd_args: List[str]) -> None:
+    # save-state <session_id> <state_type> <json_data|--state-file path> [--group-id <id>]
+    # Support --state-file for reading state from file (avoids shell escaping issues)
+    if '--state-file' in cmd_args:
+        idx = cmd_args.index('--state-file')
+        if idx + 1 < len(cmd_args):
+            state_file = cmd_args[idx + 1]
+            with open(state_file, 'r') as f:
+                state_data = _json_loads(f.read())
+        else:
+            print("Error: --state-file requires a path argument", file=sys.stderr)
+            sys.exit(1)
+    else:
+        state_data = _json_loads(cmd_args[2])
+    group_id = 'global'
+    if '--group-id' in cmd_args:
+        idx = cmd_args.index('--group-id')
+        if idx + 1 < len(cmd_args):
+            group_id = cmd_args[idx + 1]
+    result = db.save_state(cmd_args[0], cmd_args[1], state_data, group_id=group_id)
+    print(_json_dumps(result, pretty=True))
+
+
+def _cmd_get_state(db: BazingaDB, cmd_args: List[str]) -> None:
+    # get-state <session_id> <state_type> [--group-id <id>]
+    group_id = 'global'
+    if '--group-id' in cmd_args:
+        idx = cmd_args.index('--group-id')
+        if idx + 1 < len(cmd_args):
+            group_id = cmd_args[idx + 1]
+    result = db.get_latest_state(cmd_args[0], cmd_args[1], group_id=group_id)
+    print(_json_dumps(result, pretty=True))
+
+
+def _cmd_get_state_field(db: BazingaDB, cmd_args: List[str]) -> None:
+    # get-state-field <session_id> <state_type> <json_path> [--group-id <id>]
+    if len(cmd_args) < 3:
+        print(_json_dumps({"success": False, "error": "get-state-field requires <session_id> <state_type> <json_path>"}, pretty=True), file=sys.stderr)
+        sys.exit(1)
+    group_id = 'global'
+    if '--group-id' in cmd_args:
+        idx = cmd_args.index('--group-id')
+        if idx + 1 < len(cmd_args):
+            group_id = cmd_args[idx + 1]
+    result = db.get_state_field(cmd_args[0], cmd_args[1], cmd_args[2], group_id=group_id)
+    print(_json_dumps(result, pretty=True))
+
+
+def _cmd_stream_logs(db: BazingaDB, cmd_args: List[str]) -> None:
+    limit = int(cmd_args[1]) if len(cmd_args) > 1 else 50
+    offset = int(cmd_args[2]) if len(cmd_args) > 2 else 0
+    db.stream_logs(cmd_args[0], limit, offset, out=sys.stdout)
+
+
+def _cmd_dashboard_snapshot(db: BazingaDB, cmd_args: List[str]) -> None:
+    result = db.get_dashboard_snapshot(cmd_args[0])
+    print(_json_dumps(result, pretty=True))
+
+
+def _cmd_dashboard_stream(db: BazingaDB, cmd_args: List[str]) -> None:
+    # dashboard-stream <session_id>  (NDJSON: one {"kind", "data"} record per line)
+    if len(cmd_args) < 1:
+        print("Error: dashboard-stream requires <session_id>", file=sys.stderr)
+        sys.exit(1)
+    db.stream_dashboard_snapshot(cmd_args[0], sys.stdout)
+
+
+def _cmd_log_tokens(db: BazingaDB, cmd_args: List[str]) -> None:
+    session_id = cmd_args[0]
+    agent_type = cmd_args[1]
+    tokens = int(cmd_args[2])
+    agent_id = cmd_args[3] if len(cmd_args) > 3 else None
+    db.log_tokens(session_id, agent_type, tokens, agent_id)
+    db._print_success(f"✓ Logged {tokens} tokens for {agent_type}")
+
+
+def _cmd_log_tokens_batch(db: BazingaDB, cmd_args: List[str]) -> None:
+    # log-tokens-batch <session_id> <json_array|--file path>
+    # Each item: {"agent_type": ..., "tokens": N, "agent_id"?: ...}
+    entries = _load_batch_entries('log-tokens-batch', cmd_args)
+    count = db.log_tokens_batch(cmd_args[0], entries)
+    db._print_success(f"✓ Logged {count} token records")
+
+
+def _cmd_token_summary(db: BazingaDB, cmd_args: List[str]) -> None:
+    by = cmd_args[1] if len(cmd_args) > 1 else 'agent_type'
+    result = db.get_token_summary(cmd_args[0], by)
+    print(_json_dumps(result, pretty=True))
+
+
+def _cmd_save_skill_output(db: BazingaDB, cmd_args: List[str]) -> None:
+    # Parse --agent and --group flags
+    agent_type = None
+    group_id = None
+    positional_args = []
+    i = 0
+    while i < len(cmd_args):
+        if cmd_args[i] == '--agent' and i + 1 < len(cmd_args):
+            agent_type = cmd_args[i + 1]
+            i += 2
+        elif cmd_args[i] == '--group' and i + 1 < len(cmd_args):
+            group_id = cmd_args[i + 1]
+            i += 2
+        else:
+            positional_args.append(cmd_args[i])
+            i += 1
+    # Validate required arguments
+    if len(positional_args) < 3:
+        print(_json_dumps({
+            "success": False,
+            "error": "save-skill-output requires <session_id> <skill_name> <output_json> [--agent <type>] [--group <id>]"
+        }, pretty=True), file=sys.stderr)
+        sys.exit(1)
+    session_id = positional_args[0]
+    skill_name = positional_args[1]
+    try:
+        output_data = _json_loads(positional_args[2])
+    except json.JSONDecodeError as e:
+        print(_json_dumps({"success": False, "error": f"Invalid JSON in output_data: {e}"}, pretty=True), file=sys.stderr)
+        sys.exit(1)
+    iteration = db.save_skill_output(session_id, skill_name, output_data, agent_type, group_id)
+    if not db.quiet:
+        print(json.dumps({"iteration": iteration}))
+
+
+def _cmd_get_skill_output(db: BazingaDB, cmd_args: List[str]) -> None:
+    # Parse --agent flag
+    agent_type = None
+    positional_args = []
+    i = 0
+    while i < len(cmd_args):
+        if cmd_args[i] == '--agent' and i + 1 < len(cmd_args):
+            agent_type = cmd_args[i + 1]
+            i += 2
+        else:
+            positional_args.append(cmd_args[i])
+            i += 1
+    # Validate required arguments
+    if len(positional_args) < 2:
+        print(_json_dumps({
+            "success": False,
+            "error": "get-skill-output requires <session_id> <skill_name> [--agent <type>]"
+        }, pretty=True), file=sys.stderr)
+        sys.exit(1)
+    session_id = positional_args[0]
+    skill_name = positional_args[1]
+    result = db.get_skill_output(session_id, skill_name, agent_type)
+    print(_json_dumps(result, pretty=True))
+
+
+def _cmd_get_skill_output_field(db: BazingaDB, cmd_args: List[str]) -> None:
+    # get-skill-output-field <session_id> <skill_name> <json_path> [--agent <type>]
+    agent_type = None
+    positional_args = []
+    i = 0
+    while i < len(cmd_args):
+        if cmd_args[i] == '--agent' and i + 1 < len(cmd_args):
+            agent_type = cmd_args[i + 1]
+            i += 2
+        else:
+            positional_args.append(cmd_args[i])
+            i += 1
+    if len(positional_args) < 3:
+        print(_json_dumps({
+            "success": False,
+            "error": "get-skill-output-field requires <session_id> <skill_name> <json_path> [--agent <type>]"
+        }, pretty=True), file=sys.stderr)
+        sys.exit(1)
+    result = db.get_skill_output_field(positional_args[0], positional_args[1],
+                                       positional_args[2], agent_type)
+    print(_json_dumps(result, pretty=True))
+
+
+def _cmd_has_skill_output(db: BazingaDB, cmd_args: List[str]) -> None:
+    # has-skill-output <session_id> <skill_name> [--agent <type>]
+    agent_type = None
+    positional_args = []
+    i = 0
+    while i < len(cmd_args):
+        if cmd_args[i] == '--agent' and i + 1 < len(cmd_args):
+            agent_type = cmd_args[i + 1]
+            i += 2
+        else:
+            positional_args.append(cmd_args[i])
+            i += 1
+    if len(positional_args) < 2:
+        print(_json_dumps({
+            "success": False,
+            "error": "has-skill-output requires <session_id> <skill_name> [--agent <type>]"
+        }, pretty=True), file=sys.stderr)
+        sys.exit(1)
+    result = db.has_skill_output(positional_args[0], positional_args[1], agent_type)
+    print(_json_dumps(result, pretty=True))
+
+
+def _cmd_get_skill_output_all(db: BazingaDB, cmd_args: List[str]) -> None:
+    # Parse --agent flag
+    agent_type = None
+    positional_args = []
+    i = 0
+    while i < len(cmd_args):
+        if cmd_args[i] == '--agent' and i + 1 < len(cmd_args):
+            agent_type = cmd_args[i + 1]
+            i += 2
+        else:
+            positional_args.append(cmd_args[i])
+            i += 1
+    # Validate required arguments
+    if len(positional_args) < 2:
+        print(_json_dumps({
+            "success": False,
+            "error": "get-skill-output-all requires <session_id> <skill_name> [--agent <type>]"
+        }, pretty=True), file=sys.stderr)
+        sys.exit(1)
+    session_id = positional_args[0]
+    skill_name = positional_args[1]
+    result = db.get_skill_output_all(session_id, skill_name, agent_type)
+    print(_json_dumps(result, pretty=True))
+
+
+def _cmd_check_skill_evidence(db: BazingaDB, cmd_args: List[str]) -> None:
+    # Check if mandatory skills have recent evidence in skill_outputs
+    # Usage: check-skill-evidence <session_id> <skill1,skill2,...> [--agent TYPE] [--since N]
+    # See: research/skills-configuration-enforcement-plan.md
+    agent_type = None
+    since_minutes = 30
+    positional_args = []
+    i = 0
+    while i < len(cmd_args):
+        if cmd_args[i] == '--agent' and i + 1 < len(cmd_args):
+            agent_type = cmd_args[i + 1]
+            i += 2
+        elif cmd_args[i] == '--since' and i + 1 < len(cmd_args):
+            # Validate --since input is a positive integer
             try:
-                output_data = json.loads(positional_args[2])
-            except json.JSONDecodeError as e:
-                print(json.dumps({"success": False, "error": f"Invalid JSON in output_data: {e}"}, indent=2), file=sys.stderr)
-                sys.exit(1)
-            iteration = db.save_skill_output(session_id, skill_name, output_data, agent_type, group_id)
-            if not args.quiet:
-                print(json.dumps({"iteration": iteration}))
-        elif cmd == 'get-skill-output':
-            # Parse --agent flag
-            agent_type = None
-            positional_args = []
-            i = 0
-            while i < len(cmd_args):
-                if cmd_args[i] == '--agent' and i + 1 < len(cmd_args):
-                    agent_type = cmd_args[i + 1]
-                    i += 2
-                else:
-                    positional_args.append(cmd_args[i])
-                    i += 1
-            # Validate required arguments
-            if len(positional_args) < 2:
-                print(json.dumps({
-                    "success": False,
-                    "error": "get-skill-output requires <session_id> <skill_name> [--agent <type>]"
-                }, indent=2), file=sys.stderr)
-                sys.exit(1)
-            session_id = positional_args[0]
-            skill_name = positional_args[1]
-            result = db.get_skill_output(session_id, skill_name, agent_type)
-            print(json.dumps(result, indent=2))
-        elif cmd == 'get-skill-output-all':
-            # Parse --agent flag
-            agent_type = None
-            positional_args = []
-            i = 0
-            while i < len(cmd_args):
-                if cmd_args[i] == '--agent' and i + 1 < len(cmd_args):
-                    agent_type = cmd_args[i + 1]
-                    i += 2
-                else:
-                    positional_args.append(cmd_args[i])
-                    i += 1
-            # Validate required arguments
-            if len(positional_args) < 2:
-                print(json.dumps({
-                    "success": False,
-                    "error": "get-skill-output-all requires <session_id> <skill_name> [--agent <type>]"
-                }, indent=2), file=sys.stderr)
-                sys.exit(1)
-            session_id = positional_args[0]
-            skill_name = positional_args[1]
-            result = db.get_skill_output_all(session_id, skill_name, agent_type)
-            print(json.dumps(result, indent=2))
-        elif cmd == 'check-skill-evidence':
-            # Check if mandatory skills have recent evidence in skill_outputs
-            # Usage: check-skill-evidence <session_id> <skill1,skill2,...> [--agent TYPE] [--since N]
-            # See: research/skills-configuration-enforcement-plan.md
-            agent_type = None
-            since_minutes = 30
-            positional_args = []
-            i = 0
-            while i < len(cmd_args):
-                if cmd_args[i] == '--agent' and i + 1 < len(cmd_args):
-                    agent_type = cmd_args[i + 1]
-                    i += 2
-                elif cmd_args[i] == '--since' and i + 1 < len(cmd_args):
-                    # Validate --since input is a positive integer
-                    try:
-                        since_val = int(cmd_args[i + 1])
-                        if since_val < 1:
-                            raise ValueError("must be >= 1")
-                        since_minutes = since_val
-                    except ValueError as e:
-                        print(json.dumps({
-                            "success": False,
-                            "error": f"--since must be a positive integer (got: '{cmd_args[i + 1]}')"
-                        }, indent=2), file=sys.stderr)
-                        sys.exit(1)
-                    i += 2
-                else:
-                    positional_args.append(cmd_args[i])
-                    i += 1
-            if len(positional_args) < 2:
-                print(json.dumps({
+                since_val = int(cmd_args[i + 1])
+                if since_val < 1:
+                    raise ValueError("must be >= 1")
+                since_minutes = since_val
+            except ValueError as e:
+                print(_json_dumps({
                     "success": False,
-                    "error": "check-skill-evidence requires <session_id> <skill1,skill2,...> [--agent TYPE] [--since N]"
-                }, indent=2), file=sys.stderr)
-                sys.exit(1)
-            session_id = positional_args[0]
-            # Parse comma-separated skill names
-            mandatory_skills = [s.strip() for s in positional_args[1].split(',') if s.strip()]
-            result = db.check_skill_evidence(session_id, mandatory_skills, agent_type, since_minutes)
-            print(json.dumps(result, indent=2))
-        elif cmd == 'get-task-groups':
-            session_id = cmd_args[0]
-            status = cmd_args[1] if len(cmd_args) > 1 else None
-            result = db.get_task_groups(session_id, status)
-            print(json.dumps(result, indent=2))
-        elif cmd == 'update-session-status':
-            # Usage: update-session-status <session_id> <status>
-            if len(cmd_args) < 2:
-                print(json.dumps({"success": False, "error": "update-session-status requires <session_id> <status>",
-                                  "valid_statuses": list(VALID_SESSION_STATUSES)}, indent=2), file=sys.stderr)
-                sys.exit(1)
-            session_id = cmd_args[0]
-            status = cmd_args[1]
-            if status not in VALID_SESSION_STATUSES:
-                print(json.dumps({"success": False, "error": f"Invalid status '{status}'",
-                                  "valid_statuses": list(VALID_SESSION_STATUSES)}, indent=2), file=sys.stderr)
-                sys.exit(1)
-            db.update_session_status(session_id, status)
-        elif cmd == 'update-session':
-            # Alias for update-session-status with --status/-s flag support
-            # Usage: update-session <session_id> --status <status>
-            #        update-session <session_id> -s <status>
-            if len(cmd_args) < 1:
-                print(json.dumps({"success": False, "error": "update-session requires <session_id>",
-                                  "usage": "update-session <session_id> --status <status>",
-                                  "valid_statuses": list(VALID_SESSION_STATUSES)}, indent=2), file=sys.stderr)
-                sys.exit(1)
-            session_id = cmd_args[0]
-            status = None
-            unknown_args = []
-            i = 1
-            while i < len(cmd_args):
-                arg = cmd_args[i]
-                if arg in ('--status', '-s'):
-                    if i + 1 >= len(cmd_args):
-                        print(json.dumps({"success": False, "error": f"{arg} requires a value",
-                                          "usage": "update-session <session_id> --status <status>"}, indent=2), file=sys.stderr)
-                        sys.exit(1)
-                    next_val = cmd_args[i + 1]
-                    if next_val.startswith('-'):
-                        print(json.dumps({"success": False, "error": f"Invalid status value '{next_val}' (cannot start with '-')",
-                                          "valid_statuses": list(VALID_SESSION_STATUSES)}, indent=2), file=sys.stderr)
-                        sys.exit(1)
-                    status = next_val
-                    i += 2
-                else:
-                    unknown_args.append(arg)
-                    i += 1
-            if unknown_args:
-                print(json.dumps({"success": False, "error": f"Unknown arguments: {unknown_args}",
-                                  "usage": "update-session <session_id> --status <status>"}, indent=2), file=sys.stderr)
-                sys.exit(1)
-            if not status:
-                print(json.dumps({"success": False, "error": "update-session requires --status <status>",
-                                  "usage": "update-session <session_id> --status <status>",
-                                  "valid_statuses": list(VALID_SESSION_STATUSES)}, indent=2), file=sys.stderr)
+                    "error": f"--since must be a positive integer (got: '{cmd_args[i + 1]}')"
+                }, pretty=True), file=sys.stderr)
                 sys.exit(1)
-            if status not in VALID_SESSION_STATUSES:
-                print(json.dumps({"success": False, "error": f"Invalid status '{status}'",
-                                  "valid_statuses": list(VALID_SESSION_STATUSES)}, indent=2), file=sys.stderr)
+            i += 2
+        else:
+            positional_args.append(cmd_args[i])
+            i += 1
+    if len(positional_args) < 2:
+        print(_json_dumps({
+            "success": False,
+            "error": "check-skill-evidence requires <session_id> <skill1,skill2,...> [--agent TYPE] [--since N]"
+        }, pretty=True), file=sys.stderr)
+        sys.exit(1)
+    session_id = positional_args[0]
+    # Parse comma-separated skill names
+    mandatory_skills = [s.strip() for s in positional_args[1].split(',') if s.strip()]
+    result = db.check_skill_evidence(session_id, mandatory_skills, agent_type, since_minutes)
+    print(_json_dumps(result, pretty=True))
+
+
+def _cmd_get_task_groups(db: BazingaDB, cmd_args: List[str]) -> None:
+    session_id = cmd_args[0]
+    status = cmd_args[1] if len(cmd_args) > 1 else None
+    result = db.get_task_groups(session_id, status)
+    print(_json_dumps(result, pretty=True))
+
+
+def _cmd_update_session_status(db: BazingaDB, cmd_args: List[str]) -> None:
+    # Usage: update-session-status <session_id> <status>
+    if len(cmd_args) < 2:
+        print(_json_dumps({"success": False, "error": "update-session-status requires <session_id> <status>",
+                          "valid_statuses": list(VALID_SESSION_STATUSES)}, pretty=True), file=sys.stderr)
+        sys.exit(1)
+    session_id = cmd_args[0]
+    status = cmd_args[1]
+    if status not in VALID_SESSION_STATUSES:
+        print(_json_dumps({"success": False, "error": f"Invalid status '{status}'",
+                          "valid_statuses": list(VALID_SESSION_STATUSES)}, pretty=True), file=sys.stderr)
+        sys.exit(1)
+    db.update_session_status(session_id, status)
+
+
+def _cmd_update_session(db: BazingaDB, cmd_args: List[str]) -> None:
+    # Alias for update-session-status with --status/-s flag support
+    # Usage: update-session <session_id> --status <status>
+    #        update-session <session_id> -s <status>
+    if len(cmd_args) < 1:
+        print(_json_dumps({"success": False, "error": "update-session requires <session_id>",
+                          "usage": "update-session <session_id> --status <status>",
+                          "valid_statuses": list(VALID_SESSION_STATUSES)}, pretty=True), file=sys.stderr)
+        sys.exit(1)
+    session_id = cmd_args[0]
+    status = None
+    unknown_args = []
+    i = 1
+    while i < len(cmd_args):
+        arg = cmd_args[i]
+        if arg in ('--status', '-s'):
+            if i + 1 >= len(cmd_args):
+                print(_json_dumps({"success": False, "error": f"{arg} requires a value",
+                                  "usage": "update-session <session_id> --status <status>"}, pretty=True), file=sys.stderr)
                 sys.exit(1)
-            db.update_session_status(session_id, status)
-        elif cmd == 'complete-session':
-            # Convenience command to mark session as completed
-            # Usage: complete-session <session_id>
-            if len(cmd_args) < 1:
-                print(json.dumps({"success": False, "error": "complete-session requires <session_id>",
-                                  "usage": "complete-session <session_id>"}, indent=2), file=sys.stderr)
+            next_val = cmd_args[i + 1]
+            if next_val.startswith('-'):
+                print(_json_dumps({"success": False, "error": f"Invalid status value '{next_val}' (cannot start with '-')",
+                                  "valid_statuses": list(VALID_SESSION_STATUSES)}, pretty=True), file=sys.stderr)
                 sys.exit(1)
-            if len(cmd_args) > 1:
-                print(json.dumps({"success": False, "error": f"Unexpected arguments: {cmd_args[1:]}",
-                                  "usage": "complete-session <session_id>"}, indent=2), file=sys.stderr)
+            status = next_val
+            i += 2
+        else:
+            unknown_args.append(arg)
+            i += 1
+    if unknown_args:
+        print(_json_dumps({"success": False, "error": f"Unknown arguments: {unknown_args}",
+                          "usage": "update-session <session_id> --status <status>"}, pretty=True), file=sys.stderr)
+        sys.exit(1)
+    if not status:
+        print(_json_dumps({"success": False, "error": "update-session requires --status <status>",
+                          "usage": "update-session <session_id> --status <status>",
+                          "valid_statuses": list(VALID_SESSION_STATUSES)}, pretty=True), file=sys.stderr)
+        sys.exit(1)
+    if status not in VALID_SESSION_STATUSES:
+        print(_json_dumps({"success": False, "error": f"Invalid status '{status}'",
+                          "valid_statuses": list(VALID_SESSION_STATUSES)}, pretty=True), file=sys.stderr)
+        sys.exit(1)
+    db.update_session_status(session_id, status)
+
+
+def _cmd_complete_session(db: BazingaDB, cmd_args: List[str]) -> None:
+    # Convenience command to mark session as completed
+    # Usage: complete-session <session_id>
+    if len(cmd_args) < 1:
+        print(_json_dumps({"success": False, "error": "complete-session requires <session_id>",
+                          "usage": "complete-session <session_id>"}, pretty=True), file=sys.stderr)
+        sys.exit(1)
+    if len(cmd_args) > 1:
+        print(_json_dumps({"success": False, "error": f"Unexpected arguments: {cmd_args[1:]}",
+                          "usage": "complete-session <session_id>"}, pretty=True), file=sys.stderr)
+        sys.exit(1)
+    session_id = cmd_args[0]
+    db.update_session_status(session_id, 'completed')
+
+
+def _cmd_create_task_group(db: BazingaDB, cmd_args: List[str]) -> None:
+    # Parse --specializations, --item_count, --component-path, --initial_tier, --complexity flags first, then extract positional args
+    specializations = None
+    item_count = None
+    component_path = None
+    initial_tier = None
+    complexity = None
+    positional_args = []
+    i = 0
+    while i < len(cmd_args):
+        arg = cmd_args[i]
+        # Normalize dashes to underscores in flag NAME only (preserve leading --)
+        # e.g., '--item-count' -> '--item_count', '--component-path' -> '--component_path'
+        if arg.startswith('--'):
+            arg_normalized = '--' + arg[2:].replace('-', '_')
+        else:
+            arg_normalized = arg
+        if arg_normalized == '--specializations' and i + 1 < len(cmd_args):
+            try:
+                specializations = _json_loads(cmd_args[i + 1])
+                if not isinstance(specializations, list):
+                    print(_json_dumps({"success": False, "error": "--specializations must be a JSON array"}, pretty=True), file=sys.stderr)
+                    sys.exit(1)
+                if not all(isinstance(s, str) for s in specializations):
+                    print(_json_dumps({"success": False, "error": "--specializations array must contain only strings"}, pretty=True), file=sys.stderr)
+                    sys.exit(1)
+            except json.JSONDecodeError as e:
+                print(_json_dumps({"success": False, "error": f"Invalid JSON for --specializations: {e}"}, pretty=True), file=sys.stderr)
                 sys.exit(1)
-            session_id = cmd_args[0]
-            db.update_session_status(session_id, 'completed')
-        elif cmd == 'create-task-group':
-            # Parse --specializations, --item_count, --component-path, --initial_tier, --complexity flags first, then extract positional args
-            specializations = None
-            item_count = None
-            component_path = None
-            initial_tier = None
-            complexity = None
-            positional_args = []
-            i = 0
-            while i < len(cmd_args):
-                arg = cmd_args[i]
-                # Normalize dashes to underscores in flag NAME only (preserve leading --)
-                # e.g., '--item-count' -> '--item_count', '--component-path' -> '--component_path'
-                if arg.startswith('--'):
-                    arg_normalized = '--' + arg[2:].replace('-', '_')
-                else:
-                    arg_normalized = arg
-                if arg_normalized == '--specializations' and i + 1 < len(cmd_args):
-                    try:
-                        specializations = json.loads(cmd_args[i + 1])
-                        if not isinstance(specializations, list):
-                            print(json.dumps({"success": False, "error": "--specializations must be a JSON array"}, indent=2), file=sys.stderr)
-                            sys.exit(1)
-                        if not all(isinstance(s, str) for s in specializations):
-                            print(json.dumps({"success": False, "error": "--specializations array must contain only strings"}, indent=2), file=sys.stderr)
-                            sys.exit(1)
-                    except json.JSONDecodeError as e:
-                        print(json.dumps({"success": False, "error": f"Invalid JSON for --specializations: {e}"}, indent=2), file=sys.stderr)
-                        sys.exit(1)
-                    i += 2  # Skip flag and value
-                elif arg_normalized == '--item_count' and i + 1 < len(cmd_args):
-                    try:
-                        item_count = int(cmd_args[i + 1])
-                        if item_count < 1:
-                            print(json.dumps({"success": False, "error": "--item_count must be a positive integer"}, indent=2), file=sys.stderr)
-                            sys.exit(1)
-                    except ValueError:
-                        print(json.dumps({"success": False, "error": "--item_count must be a valid integer"}, indent=2), file=sys.stderr)
-                        sys.exit(1)
-                    i += 2  # Skip flag and value
-                elif arg_normalized == '--component_path' and i + 1 < len(cmd_args):
-                    component_path = cmd_args[i + 1]
-                    i += 2  # Skip flag and value
-                elif arg_normalized == '--initial_tier' and i + 1 < len(cmd_args):
-                    initial_tier = cmd_args[i + 1]
-                    valid_tiers = ('Developer', 'Senior Software Engineer')
-                    if initial_tier not in valid_tiers:
-                        print(json.dumps({"success": False, "error": f"--initial_tier must be one of {valid_tiers}, got '{initial_tier}'"}, indent=2), file=sys.stderr)
-                        sys.exit(1)
-                    i += 2  # Skip flag and value
-                elif arg_normalized == '--complexity' and i + 1 < len(cmd_args):
-                    try:
-                        complexity = int(cmd_args[i + 1])
-                        if not 1 <= complexity <= 10:
-                            print(json.dumps({"success": False, "error": "--complexity must be between 1 and 10"}, indent=2), file=sys.stderr)
-                            sys.exit(1)
-                    except ValueError:
-                        print(json.dumps({"success": False, "error": "--complexity must be a valid integer"}, indent=2), file=sys.stderr)
-                        sys.exit(1)
-                    i += 2  # Skip flag and value
-                else:
-                    positional_args.append(cmd_args[i])
-                    i += 1
-            # Validate positional args count (required: group_id, session_id, name)
-            if len(positional_args) < 3:
-                print(json.dumps({"success": False, "error": "create-task-group requires at least 3 args: <group_id> <session_id> <name>"}, indent=2), file=sys.stderr)
+            i += 2  # Skip flag and value
+        elif arg_normalized == '--item_count' and i + 1 < len(cmd_args):
+            try:
+                item_count = int(cmd_args[i + 1])
+                if item_count < 1:
+                    print(_json_dumps({"success": False, "error": "--item_count must be a positive integer"}, pretty=True), file=sys.stderr)
+                    sys.exit(1)
+            except ValueError:
+                print(_json_dumps({"success": False, "error": "--item_count must be a valid integer"}, pretty=True), file=sys.stderr)
                 sys.exit(1)
-            if len(positional_args) > 5:
-                print(json.dumps({"success": False, "error": "create-task-group accepts at most 5 positional args: <group_id> <session_id> <name> [status] [assigned_to]"}, indent=2), file=sys.stderr)
+            i += 2  # Skip flag and value
+        elif arg_normalized == '--component_path' and i + 1 < len(cmd_args):
+            component_path = cmd_args[i + 1]
+            i += 2  # Skip flag and value
+        elif arg_normalized == '--initial_tier' and i + 1 < len(cmd_args):
+            initial_tier = cmd_args[i + 1]
+            valid_tiers = ('Developer', 'Senior Software Engineer')
+            if initial_tier not in valid_tiers:
+                print(_json_dumps({"success": False, "error": f"--initial_tier must be one of {valid_tiers}, got '{initial_tier}'"}, pretty=True), file=sys.stderr)
                 sys.exit(1)
-            # Now assign positional args correctly
-            group_id = positional_args[0]
-            session_id = positional_args[1]
-            name = positional_args[2]
-            # Default to None so upsert preserves existing status; INSERT defaults to 'pending'
-            status = positional_args[3] if len(positional_args) > 3 else None
-            assigned_to = positional_args[4] if len(positional_args) > 4 else None
-            result = db.create_task_group(group_id, session_id, name, status, assigned_to, specializations, item_count, component_path, initial_tier, complexity)
-            print(json.dumps(result, indent=2))
-        elif cmd == 'update-task-group':
-            # Validate minimum args
-            if len(cmd_args) < 2:
-                print(json.dumps({"success": False, "error": "update-task-group requires at least 2 args: <group_id> <session_id>"}, indent=2), file=sys.stderr)
+            i += 2  # Skip flag and value
+        elif arg_normalized == '--complexity' and i + 1 < len(cmd_args):
+            try:
+                complexity = int(cmd_args[i + 1])
+                if not 1 <= complexity <= 10:
+                    print(_json_dumps({"success": False, "error": "--complexity must be between 1 and 10"}, pretty=True), file=sys.stderr)
+                    sys.exit(1)
+            except ValueError:
+                print(_json_dumps({"success": False, "error": "--complexity must be a valid integer"}, pretty=True), file=sys.stderr)
                 sys.exit(1)
-            group_id = cmd_args[0]
-            session_id = cmd_args[1]
-            kwargs = {}
-            # Allowlist of valid flags
-            # v14: Added security_sensitive, qa_attempts, tl_review_attempts for escalation tracking
-            # v15: Added component_path for version-specific prompt building
-            # v16: Added initial_tier for PM-assigned starting tier
-            # v17: Added complexity for PM-assigned task complexity scoring (1-10)
-            # v16 (schema): Added review_iteration, no_progress_count, blocking_issues_count for feedback loop tracking
-            valid_flags = {"status", "assigned_to", "revision_count", "last_review_status", "auto_create", "name", "specializations", "item_count", "security_sensitive", "qa_attempts", "tl_review_attempts", "component_path", "initial_tier", "complexity", "review_iteration", "no_progress_count", "blocking_issues_count", "speckit_task_ids"}
-            for i in range(2, len(cmd_args), 2):
-                key = cmd_args[i].lstrip('--')
-                key = key.replace('-', '_')  # Normalize dashes to underscores (--assigned-to → assigned_to)
-                # Validate flag is in allowlist
-                if key not in valid_flags:
-                    print(json.dumps({"success": False, "error": f"Unknown flag --{key}. Valid flags: {', '.join(sorted(valid_flags))}"}, indent=2), file=sys.stderr)
+            i += 2  # Skip flag and value
+        else:
+            positional_args.append(cmd_args[i])
+            i += 1
+    # Validate positional args count (required: group_id, session_id, name)
+    if len(positional_args) < 3:
+        print(_json_dumps({"success": False, "error": "create-task-group requires at least 3 args: <group_id> <session_id> <name>"}, pretty=True), file=sys.stderr)
+        sys.exit(1)
+    if len(positional_args) > 5:
+        print(_json_dumps({"success": False, "error": "create-task-group accepts at most 5 positional args: <group_id> <session_id> <name> [status] [assigned_to]"}, pretty=True), file=sys.stderr)
+        sys.exit(1)
+    # Now assign positional args correctly
+    group_id = positional_args[0]
+    session_id = positional_args[1]
+    name = positional_args[2]
+    # Default to None so upsert preserves existing status; INSERT defaults to 'pending'
+    status = positional_args[3] if len(positional_args) > 3 else None
+    assigned_to = positional_args[4] if len(positional_args) > 4 else None
+    result = db.create_task_group(group_id, session_id, name, status, assigned_to, specializations, item_count, component_path, initial_tier, complexity)
+    print(_json_dumps(result, pretty=True))
+
+
+def _cmd_update_task_group(db: BazingaDB, cmd_args: List[str]) -> None:
+    # Validate minimum args
+    if len(cmd_args) < 2:
+        print(_json_dumps({"success": False, "error": "update-task-group requires at least 2 args: <group_id> <session_id>"}, pretty=True), file=sys.stderr)
+        sys.exit(1)
+    group_id = cmd_args[0]
+    session_id = cmd_args[1]
+    kwargs = {}
+    # Allowlist of valid flags
+    # v14: Added security_sensitive, qa_attempts, tl_review_attempts for escalation tracking
+    # v15: Added component_path for version-specific prompt building
+    # v16: Added initial_tier for PM-assigned starting tier
+    # v17: Added complexity for PM-assigned task complexity scoring (1-10)
+    # v16 (schema): Added review_iteration, no_progress_count, blocking_issues_count for feedback loop tracking
+    valid_flags = {"status", "assigned_to", "revision_count", "last_review_status", "auto_create", "name", "specializations", "item_count", "security_sensitive", "qa_attempts", "tl_review_attempts", "component_path", "initial_tier", "complexity", "review_iteration", "no_progress_count", "blocking_issues_count", "speckit_task_ids"}
+    for i in range(2, len(cmd_args), 2):
+        key = cmd_args[i].lstrip('--')
+        key = key.replace('-', '_')  # Normalize dashes to underscores (--assigned-to → assigned_to)
+        # Validate flag is in allowlist
+        if key not in valid_flags:
+            print(_json_dumps({"success": False, "error": f"Unknown flag --{key}. Valid flags: {', '.join(sorted(valid_flags))}"}, pretty=True), file=sys.stderr)
+            sys.exit(1)
+        if i + 1 >= len(cmd_args):
+            print(_json_dumps({"success": False, "error": f"Missing value for --{key}"}, pretty=True), file=sys.stderr)
+            sys.exit(1)
+        value = cmd_args[i + 1]
+        # Convert integer flags
+        if key in ('revision_count', 'item_count', 'qa_attempts', 'tl_review_attempts', 'complexity', 'review_iteration', 'no_progress_count', 'blocking_issues_count'):
+            try:
+                value = int(value)
+                # Validate complexity range
+                if key == 'complexity' and not 1 <= value <= 10:
+                    print(_json_dumps({"success": False, "error": "--complexity must be between 1 and 10"}, pretty=True), file=sys.stderr)
                     sys.exit(1)
-                if i + 1 >= len(cmd_args):
-                    print(json.dumps({"success": False, "error": f"Missing value for --{key}"}, indent=2), file=sys.stderr)
+                # Validate non-negative for counter fields
+                non_negative_fields = ('revision_count', 'item_count', 'qa_attempts', 'tl_review_attempts', 'no_progress_count', 'blocking_issues_count')
+                if key in non_negative_fields and value < 0:
+                    print(_json_dumps({"success": False, "error": f"--{key} must be non-negative, got: {value}"}, pretty=True), file=sys.stderr)
                     sys.exit(1)
-                value = cmd_args[i + 1]
-                # Convert integer flags
-                if key in ('revision_count', 'item_count', 'qa_attempts', 'tl_review_attempts', 'complexity', 'review_iteration', 'no_progress_count', 'blocking_issues_count'):
-                    try:
-                        value = int(value)
-                        # Validate complexity range
-                        if key == 'complexity' and not 1 <= value <= 10:
-                            print(json.dumps({"success": False, "error": "--complexity must be between 1 and 10"}, indent=2), file=sys.stderr)
-                            sys.exit(1)
-                        # Validate non-negative for counter fields
-                        non_negative_fields = ('revision_count', 'item_count', 'qa_attempts', 'tl_review_attempts', 'no_progress_count', 'blocking_issues_count')
-                        if key in non_negative_fields and value < 0:
-                            print(json.dumps({"success": False, "error": f"--{key} must be non-negative, got: {value}"}, indent=2), file=sys.stderr)
-                            sys.exit(1)
-                        # Validate review_iteration >= 1 (iterations start at 1, not 0)
-                        if key == 'review_iteration' and value < 1:
-                            print(json.dumps({"success": False, "error": "--review_iteration must be >= 1 (iterations start at 1)"}, indent=2), file=sys.stderr)
-                            sys.exit(1)
-                        # Monotonicity enforcement for review_iteration/no_progress_count
-                        # is handled server-side in update_task_group() method
-                    except ValueError:
-                        print(json.dumps({"success": False, "error": f"--{key} must be an integer, got: {value}"}, indent=2), file=sys.stderr)
-                        sys.exit(1)
-                # Convert security_sensitive to int (0 or 1)
-                elif key == 'security_sensitive':
-                    value = 1 if value.lower() in ('true', '1', 'yes') else 0
-                # Convert auto_create to bool
-                elif key == 'auto_create':
-                    value = value.lower() in ('true', '1', 'yes')
-                # Parse and validate specializations JSON
-                elif key == 'specializations':
-                    try:
-                        value = json.loads(value)
-                        # Validate it's a list of strings
-                        if not isinstance(value, list):
-                            print(json.dumps({"success": False, "error": "--specializations must be a JSON array"}, indent=2), file=sys.stderr)
-                            sys.exit(1)
-                        if not all(isinstance(s, str) for s in value):
-                            print(json.dumps({"success": False, "error": "--specializations array must contain only strings"}, indent=2), file=sys.stderr)
-                            sys.exit(1)
-                    except json.JSONDecodeError as e:
-                        print(json.dumps({"success": False, "error": f"Invalid JSON for --specializations: {e}"}, indent=2), file=sys.stderr)
-                        sys.exit(1)
-                # Validate initial_tier
-                elif key == 'initial_tier':
-                    valid_tiers = ('Developer', 'Senior Software Engineer')
-                    if value not in valid_tiers:
-                        print(json.dumps({"success": False, "error": f"--initial_tier must be one of {valid_tiers}, got '{value}'"}, indent=2), file=sys.stderr)
-                        sys.exit(1)
-                # Parse and validate speckit_task_ids JSON (v19: SpecKit integration)
-                elif key == 'speckit_task_ids':
-                    try:
-                        value = json.loads(value)
-                        # Validate it's a list of strings
-                        if not isinstance(value, list):
-                            print(json.dumps({"success": False, "error": "--speckit_task_ids must be a JSON array"}, indent=2), file=sys.stderr)
-                            sys.exit(1)
-                        if not all(isinstance(s, str) for s in value):
-                            print(json.dumps({"success": False, "error": "--speckit_task_ids array must contain only strings"}, indent=2), file=sys.stderr)
-                            sys.exit(1)
-                    except json.JSONDecodeError as e:
-                        print(json.dumps({"success": False, "error": f"Invalid JSON for --speckit_task_ids: {e}"}, indent=2), file=sys.stderr)
-                        sys.exit(1)
-                kwargs[key] = value
-            result = db.update_task_group(group_id, session_id, **kwargs)
-            print(json.dumps(result, indent=2))
-        elif cmd == 'save-development-plan':
-            session_id = cmd_args[0]
-            original_prompt = cmd_args[1]
-            plan_text = cmd_args[2]
-            phases = json.loads(cmd_args[3])
-            current_phase = int(cmd_args[4])
-            total_phases = int(cmd_args[5])
-            metadata = json.loads(cmd_args[6]) if len(cmd_args) > 6 else None
-            db.save_development_plan(session_id, original_prompt, plan_text, phases, current_phase, total_phases, metadata)
-        elif cmd == 'get-development-plan':
-            session_id = cmd_args[0]
-            result = db.get_development_plan(session_id)
-            print(json.dumps(result, indent=2))
-        elif cmd == 'update-plan-progress':
-            session_id = cmd_args[0]
-            phase_id_str = cmd_args[1]
-            status = cmd_args[2]
-            progress_percent = int(cmd_args[3]) if len(cmd_args) > 3 else None
-            # Try to parse as int, fall back to string for phase name lookup
-            try:
-                phase_id: Union[int, str] = int(phase_id_str)
+                # Validate review_iteration >= 1 (iterations start at 1, not 0)
+                if key == 'review_iteration' and value < 1:
+                    print(_json_dumps({"success": False, "error": "--review_iteration must be >= 1 (iterations start at 1)"}, pretty=True), file=sys.stderr)
+                    sys.exit(1)
+                # Monotonicity enforcement for review_iteration/no_progress_count
+                # is handled server-side in update_task_group() method
             except ValueError:
-                phase_id = phase_id_str
-            db.update_plan_progress(session_id, phase_id, status, progress_percent)
-        elif cmd == 'save-success-criteria':
-            session_id = cmd_args[0]
-            criteria = json.loads(cmd_args[1])
-            db.save_success_criteria(session_id, criteria)
-        elif cmd == 'get-success-criteria':
-            session_id = cmd_args[0]
-            result = db.get_success_criteria(session_id)
-            print(json.dumps(result, indent=2))
-        elif cmd == 'update-success-criterion':
-            session_id = cmd_args[0]
-            criterion = cmd_args[1]
-            kwargs = {}
-            for i in range(2, len(cmd_args), 2):
-                key = cmd_args[i].lstrip('--')
-                value = cmd_args[i + 1]
-                kwargs[key] = value
-            db.update_success_criterion(session_id, criterion, **kwargs)
-        elif cmd == 'save-context-package':
-            session_id = cmd_args[0]
-            group_id = cmd_args[1]
-            package_type = cmd_args[2]
-            file_path = cmd_args[3]
-            producer = cmd_args[4]
+                print(_json_dumps({"success": False, "error": f"--{key} must be an integer, got: {value}"}, pretty=True), file=sys.stderr)
+                sys.exit(1)
+        # Convert security_sensitive to int (0 or 1)
+        elif key == 'security_sensitive':
+            value = 1 if value.lower() in ('true', '1', 'yes') else 0
+        # Convert auto_create to bool
+        elif key == 'auto_create':
+            value = value.lower() in ('true', '1', 'yes')
+        # Parse and validate specializations JSON
+        elif key == 'specializations':
             try:
-                consumers = json.loads(cmd_args[5])
-                if not isinstance(consumers, list):
-                    raise ValueError("consumers_json must be a JSON array of strings")
-                if not all(x and isinstance(x, str) for x in consumers):
-                    raise ValueError("All consumer elements must be non-empty strings")
-            except (json.JSONDecodeError, ValueError) as e:
-                print(f"ERROR: Invalid consumers_json argument: {e}", file=sys.stderr)
-                print("Expected: JSON array of agent types, e.g., [\"developer\", \"qa_expert\"]", file=sys.stderr)
+                value = _json_loads(value)
+                # Validate it's a list of strings
+                if not isinstance(value, list):
+                    print(_json_dumps({"success": False, "error": "--specializations must be a JSON array"}, pretty=True), file=sys.stderr)
+                    sys.exit(1)
+                if not all(isinstance(s, str) for s in value):
+                    print(_json_dumps({"success": False, "error": "--specializations array must contain only strings"}, pretty=True), file=sys.stderr)
+                    sys.exit(1)
+            except json.JSONDecodeError as e:
+                print(_json_dumps({"success": False, "error": f"Invalid JSON for --specializations: {e}"}, pretty=True), file=sys.stderr)
                 sys.exit(1)
-            priority = cmd_args[6]
-            summary = cmd_args[7]
-            result = db.save_context_package(session_id, group_id, package_type, file_path, producer, consumers, priority, summary)
-            print(json.dumps(result, indent=2))
-        elif cmd == 'get-context-packages':
-            session_id = cmd_args[0]
-            group_id = cmd_args[1]
-            agent_type = cmd_args[2]
-            limit = int(cmd_args[3]) if len(cmd_args) > 3 else 3
-            # Validate limit is within acceptable range
-            if limit < 1 or limit > 50:
-                print(f"ERROR: limit must be between 1 and 50 (got {limit})", file=sys.stderr)
+        # Validate initial_tier
+        elif key == 'initial_tier':
+            valid_tiers = ('Developer', 'Senior Software Engineer')
+            if value not in valid_tiers:
+                print(_json_dumps({"success": False, "error": f"--initial_tier must be one of {valid_tiers}, got '{value}'"}, pretty=True), file=sys.stderr)
                 sys.exit(1)
-            result = db.get_context_packages(session_id, group_id, agent_type, limit)
-            print(json.dumps(result, indent=2))
-        elif cmd == 'mark-context-consumed':
-            package_id = int(cmd_args[0])
-            agent_type = cmd_args[1]
-            iteration = int(cmd_args[2]) if len(cmd_args) > 2 else 1
-            db.mark_context_consumed(package_id, agent_type, iteration)
-        elif cmd == 'update-context-references':
-            group_id = cmd_args[0]
-            session_id = cmd_args[1]
+        # Parse and validate speckit_task_ids JSON (v19: SpecKit integration)
+        elif key == 'speckit_task_ids':
             try:
-                package_ids = json.loads(cmd_args[2])
-                if not isinstance(package_ids, list) or not all(isinstance(x, int) for x in package_ids):
-                    raise ValueError("package_ids must be a JSON array of integers")
-            except (json.JSONDecodeError, ValueError) as e:
-                print(f"ERROR: Invalid package_ids argument: {e}", file=sys.stderr)
-                print("Expected: JSON array of integers, e.g., [1, 3, 5]", file=sys.stderr)
-                sys.exit(1)
-            db.update_context_references(group_id, session_id, package_ids)
-        elif cmd == 'save-reasoning':
-            # Parse positional and optional args
-            # Required: session_id, group_id, agent_type, phase, content (or --content-file)
-            # Optional: --agent_id, --iteration, --confidence, --references, --content-file
-            valid_flags = {'--agent_id', '--iteration', '--confidence', '--references', '--content-file'}
-
-            if len(cmd_args) < 4:
-                print("Error: save-reasoning requires: <session_id> <group_id> <agent_type> <phase> <content>", file=sys.stderr)
-                print("       Or use --content-file to read content from a file", file=sys.stderr)
+                value = _json_loads(value)
+                # Validate it's a list of strings
+                if not isinstance(value, list):
+                    print(_json_dumps({"success": False, "error": "--speckit_task_ids must be a JSON array"}, pretty=True), file=sys.stderr)
+                    sys.exit(1)
+                if not all(isinstance(s, str) for s in value):
+                    print(_json_dumps({"success": False, "error": "--speckit_task_ids array must contain only strings"}, pretty=True), file=sys.stderr)
+                    sys.exit(1)
+            except json.JSONDecodeError as e:
+                print(_json_dumps({"success": False, "error": f"Invalid JSON for --speckit_task_ids: {e}"}, pretty=True), file=sys.stderr)
                 sys.exit(1)
+        kwargs[key] = value
+    result = db.update_task_group(group_id, session_id, **kwargs)
+    print(_json_dumps(result, pretty=True))
+
+
+def _cmd_save_development_plan(db: BazingaDB, cmd_args: List[str]) -> None:
+    session_id = cmd_args[0]
+    original_prompt = cmd_args[1]
+    plan_text = cmd_args[2]
+    phases = _json_loads(cmd_args[3])
+    current_phase = int(cmd_args[4])
+    total_phases = int(cmd_args[5])
+    metadata = _json_loads(cmd_args[6]) if len(cmd_args) > 6 else None
+    db.save_development_plan(session_id, original_prompt, plan_text, phases, current_phase, total_phases, metadata)
+
+
+def _cmd_get_development_plan(db: BazingaDB, cmd_args: List[str]) -> None:
+    session_id = cmd_args[0]
+    result = db.get_development_plan(session_id)
+    print(_json_dumps(result, pretty=True))
+
+
+def _cmd_update_plan_progress(db: BazingaDB, cmd_args: List[str]) -> None:
+    session_id = cmd_args[0]
+    phase_id_str = cmd_args[1]
+    status = cmd_args[2]
+    progress_percent = int(cmd_args[3]) if len(cmd_args) > 3 else None
+    # Try to parse as int, fall back to string for phase name lookup
+    try:
+        phase_id: Union[int, str] = int(phase_id_str)
+    except ValueError:
+        phase_id = phase_id_str
+    db.update_plan_progress(session_id, phase_id, status, progress_percent)
 
-            session_id = cmd_args[0]
-            group_id = cmd_args[1]
-            agent_type = cmd_args[2]
-            phase = cmd_args[3]
-
-            # Check if content is provided positionally or via --content-file
-            content = None
-            kwargs = {}
-            i = 4
-
-            # If 5th arg exists and doesn't start with --, it's the content
-            if len(cmd_args) > 4 and not cmd_args[4].startswith('--'):
-                content = cmd_args[4]
-                i = 5
-
-            # Parse optional flags
-            while i < len(cmd_args):
-                arg = cmd_args[i]
-                if arg.startswith('--'):
-                    if arg not in valid_flags:
-                        print(f"Error: Unknown flag '{arg}'. Valid flags: {sorted(valid_flags)}", file=sys.stderr)
-                        sys.exit(1)
-                    if i + 1 >= len(cmd_args):
-                        print(f"Error: Flag '{arg}' requires a value", file=sys.stderr)
-                        sys.exit(1)
-                    key = arg.lstrip('--')
-                    value = cmd_args[i + 1]
-                    if key == 'iteration':
-                        try:
-                            value = int(value)
-                        except ValueError:
-                            print(f"Error: --iteration must be an integer, got '{value}'", file=sys.stderr)
-                            sys.exit(1)
-                    elif key == 'references':
-                        try:
-                            value = json.loads(value)
-                            if not isinstance(value, list):
-                                raise ValueError("references must be a JSON array")
-                        except json.JSONDecodeError as e:
-                            print(f"Error: Invalid JSON for --references: {e}", file=sys.stderr)
-                            sys.exit(1)
-                    elif key == 'content-file':
-                        # Read content from file (avoids shell escaping and process table exposure)
-                        try:
-                            content = Path(value).read_text()
-                        except Exception as e:
-                            print(f"Error: Could not read content file '{value}': {e}", file=sys.stderr)
-                            sys.exit(1)
-                        i += 2
-                        continue  # Don't add to kwargs
-                    kwargs[key] = value
-                    i += 2
-                else:
-                    # Unexpected positional argument - fail fast
-                    print(f"Error: Unexpected argument '{arg}' after positional args.", file=sys.stderr)
-                    print("Usage: save-reasoning <session_id> <group_id> <agent_type> <phase> [<content>] [--content-file FILE] [--agent_id X] [--iteration N] [--confidence X] [--references JSON]", file=sys.stderr)
-                    sys.exit(1)
 
-            # Validate content was provided
-            if content is None:
-                print("Error: Content is required. Provide as 5th argument or use --content-file FILE", file=sys.stderr)
-                sys.exit(1)
+def _cmd_save_success_criteria(db: BazingaDB, cmd_args: List[str]) -> None:
+    session_id = cmd_args[0]
+    criteria = _json_loads(cmd_args[1])
+    db.save_success_criteria(session_id, criteria)
 
-            try:
-                result = db.save_reasoning(session_id, group_id, agent_type, phase, content, **kwargs)
-                print(json.dumps(result, indent=2))
-            except ValueError as e:
-                print(f"Error: {e}", file=sys.stderr)
-                sys.exit(1)
-        elif cmd == 'get-reasoning':
-            # Required: session_id
-            # Optional: --group_id, --agent_type, --phase, --limit, --format
-            if len(cmd_args) < 1:
-                print("Error: get-reasoning requires at least 1 arg: <session_id>", file=sys.stderr)
-                sys.exit(1)
 
-            session_id = cmd_args[0]
-            kwargs = {}
-            output_format = 'json'
-            valid_flags = {'--group_id', '--agent_type', '--phase', '--limit', '--format'}
-            i = 1
-            while i < len(cmd_args):
-                arg = cmd_args[i]
-                if arg.startswith('--'):
-                    if arg not in valid_flags:
-                        print(f"Error: Unknown flag '{arg}'. Valid flags: {sorted(valid_flags)}", file=sys.stderr)
-                        sys.exit(1)
-                    if i + 1 >= len(cmd_args):
-                        print(f"Error: Flag '{arg}' requires a value", file=sys.stderr)
-                        sys.exit(1)
-                    key = arg.lstrip('--')
-                    value = cmd_args[i + 1]
-                    if key == 'limit':
-                        try:
-                            value = int(value)
-                        except ValueError:
-                            print(f"Error: --limit must be an integer, got '{value}'", file=sys.stderr)
-                            sys.exit(1)
-                    elif key == 'format':
-                        if value not in ('json', 'prompt-summary'):
-                            print(f"Error: --format must be 'json' or 'prompt-summary', got '{value}'", file=sys.stderr)
-                            sys.exit(1)
-                        output_format = value
-                        i += 2
-                        continue  # Don't add to kwargs
-                    kwargs[key] = value
-                    i += 2
-                else:
-                    # Unexpected positional argument - fail fast
-                    print(f"Error: Unexpected argument '{arg}'. Use --flag syntax for options.", file=sys.stderr)
-                    print(f"Usage: get-reasoning <session_id> [--group_id X] [--agent_type X] [--phase X] [--limit N] [--format json|prompt-summary]", file=sys.stderr)
-                    sys.exit(1)
+def _cmd_get_success_criteria(db: BazingaDB, cmd_args: List[str]) -> None:
+    session_id = cmd_args[0]
+    result = db.get_success_criteria(session_id)
+    print(_json_dumps(result, pretty=True))
 
-            try:
-                result = db.get_reasoning(session_id, output_format=output_format, **kwargs)
-                if output_format == 'prompt-summary':
-                    print(result)  # Already formatted string
-                else:
-                    print(json.dumps(result, indent=2))
-            except ValueError as e:
-                print(f"Error: {e}", file=sys.stderr)
-                sys.exit(1)
-        elif cmd == 'reasoning-timeline':
-            # Required: session_id
-            # Optional: --group_id, --format
-            if len(cmd_args) < 1:
-                print("Error: reasoning-timeline requires at least 1 arg: <session_id>", file=sys.stderr)
-                sys.exit(1)
 
-            session_id = cmd_args[0]
-            group_id = None
-            fmt = 'json'
-            valid_flags = {'--group_id', '--format'}
-
-            i = 1
-            while i < len(cmd_args):
-                arg = cmd_args[i]
-                if arg == '--group_id':
-                    if i + 1 >= len(cmd_args):
-                        print("Error: --group_id requires a value", file=sys.stderr)
-                        sys.exit(1)
-                    group_id = cmd_args[i + 1]
-                    i += 2
-                elif arg == '--format':
-                    if i + 1 >= len(cmd_args):
-                        print("Error: --format requires a value", file=sys.stderr)
-                        sys.exit(1)
-                    fmt = cmd_args[i + 1]
-                    if fmt not in ('json', 'markdown'):
-                        print(f"Error: --format must be 'json' or 'markdown', got '{fmt}'", file=sys.stderr)
-                        sys.exit(1)
-                    i += 2
-                elif arg.startswith('--'):
-                    print(f"Error: Unknown flag '{arg}'. Valid flags: {sorted(valid_flags)}", file=sys.stderr)
-                    sys.exit(1)
-                else:
-                    # Unexpected positional argument - fail fast
-                    print(f"Error: Unexpected argument '{arg}'. Use --flag syntax for options.", file=sys.stderr)
-                    print(f"Usage: reasoning-timeline <session_id> [--group_id X] [--format json|markdown]", file=sys.stderr)
-                    sys.exit(1)
+def _cmd_update_success_criterion(db: BazingaDB, cmd_args: List[str]) -> None:
+    session_id = cmd_args[0]
+    criterion = cmd_args[1]
+    kwargs = {}
+    for i in range(2, len(cmd_args), 2):
+        key = cmd_args[i].lstrip('--')
+        value = cmd_args[i + 1]
+        kwargs[key] = value
+    db.update_success_criterion(session_id, criterion, **kwargs)
 
-            result = db.reasoning_timeline(session_id, group_id=group_id, output_format=fmt)
-            print(result)
-        elif cmd == 'check-mandatory-phases':
-            # Required: session_id, group_id, agent_type
-            if len(cmd_args) < 3:
-                print("Error: check-mandatory-phases requires 3 args: <session_id> <group_id> <agent_type>", file=sys.stderr)
-                sys.exit(1)
 
-            session_id = cmd_args[0]
-            group_id = cmd_args[1]
-            agent_type = cmd_args[2]
+def _cmd_save_context_package(db: BazingaDB, cmd_args: List[str]) -> None:
+    session_id = cmd_args[0]
+    group_id = cmd_args[1]
+    package_type = cmd_args[2]
+    file_path = cmd_args[3]
+    producer = cmd_args[4]
+    try:
+        consumers = _json_loads(cmd_args[5])
+        if not isinstance(consumers, list):
+            raise ValueError("consumers_json must be a JSON array of strings")
+        if not all(x and isinstance(x, str) for x in consumers):
+            raise ValueError("All consumer elements must be non-empty strings")
+    except (json.JSONDecodeError, ValueError) as e:
+        print(f"ERROR: Invalid consumers_json argument: {e}", file=sys.stderr)
+        print("Expected: JSON array of agent types, e.g., [\"developer\", \"qa_expert\"]", file=sys.stderr)
+        sys.exit(1)
+    priority = cmd_args[6]
+    summary = cmd_args[7]
+    result = db.save_context_package(session_id, group_id, package_type, file_path, producer, consumers, priority, summary)
+    print(_json_dumps(result, pretty=True))
+
+
+def _cmd_get_context_packages(db: BazingaDB, cmd_args: List[str]) -> None:
+    session_id = cmd_args[0]
+    group_id = cmd_args[1]
+    agent_type = cmd_args[2]
+    limit = int(cmd_args[3]) if len(cmd_args) > 3 else 3
+    # Validate limit is within acceptable range
+    if limit < 1 or limit > 50:
+        print(f"ERROR: limit must be between 1 and 50 (got {limit})", file=sys.stderr)
+        sys.exit(1)
+    result = db.get_context_packages(session_id, group_id, agent_type, limit)
+    print(_json_dumps(result, pretty=True))
+
+
+def _cmd_mark_context_consumed(db: BazingaDB, cmd_args: List[str]) -> None:
+    package_id = int(cmd_args[0])
+    agent_type = cmd_args[1]
+    iteration = int(cmd_args[2]) if len(cmd_args) > 2 else 1
+    db.mark_context_consumed(package_id, agent_type, iteration)
+
+
+def _cmd_update_context_references(db: BazingaDB, cmd_args: List[str]) -> None:
+    group_id = cmd_args[0]
+    session_id = cmd_args[1]
+    try:
+        package_ids = _json_loads(cmd_args[2])
+        if not isinstance(package_ids, list) or not all(isinstance(x, int) for x in package_ids):
+            raise ValueError("package_ids must be a JSON array of integers")
+    except (json.JSONDecodeError, ValueError) as e:
+        print(f"ERROR: Invalid package_ids argument: {e}", file=sys.stderr)
+        print("Expected: JSON array of integers, e.g., [1, 3, 5]", file=sys.stderr)
+        sys.exit(1)
+    db.update_context_references(group_id, session_id, package_ids)
 
-            result = db.check_mandatory_phases(session_id, group_id, agent_type)
-            print(json.dumps(result, indent=2))
 
-            # Exit with error code if mandatory phases are missing
-            if not result['complete']:
+def _cmd_save_reasoning(db: BazingaDB, cmd_args: List[str]) -> None:
+    # Parse positional and optional args
+    # Required: session_id, group_id, agent_type, phase, content (or --content-file)
+    # Optional: --agent_id, --iteration, --confidence, --references, --content-file
+    valid_flags = {'--agent_id', '--iteration', '--confidence', '--references', '--content-file'}
+
+    if len(cmd_args) < 4:
+        print("Error: save-reasoning requires: <session_id> <group_id> <agent_type> <phase> <content>", file=sys.stderr)
+        print("       Or use --content-file to read content from a file", file=sys.stderr)
+        sys.exit(1)
+
+    session_id = cmd_args[0]
+    group_id = cmd_args[1]
+    agent_type = cmd_args[2]
+    phase = cmd_args[3]
+
+    # Check if content is provided positionally or via --content-file
+    content = None
+    kwargs = {}
+    i = 4
+
+    # If 5th arg exists and doesn't start with --, it's the content
+    if len(cmd_args) > 4 and not cmd_args[4].startswith('--'):
+        content = cmd_args[4]
+        i = 5
+
+    # Parse optional flags
+    while i < len(cmd_args):
+        arg = cmd_args[i]
+        if arg.startswith('--'):
+            if arg not in valid_flags:
+                print(f"Error: Unknown flag '{arg}'. Valid flags: {sorted(valid_flags)}", file=sys.stderr)
                 sys.exit(1)
-        # ==================== ERROR PATTERN COMMANDS ====================
-        elif cmd == 'save-error-pattern':
-            # save-error-pattern <project_id> <error_type> <error_message> <solution> [--lang X] [--context_hints JSON] [--stack_pattern JSON]
-            if len(cmd_args) < 4:
-                print("Error: save-error-pattern requires 4 args: <project_id> <error_type> <error_message> <solution>", file=sys.stderr)
+            if i + 1 >= len(cmd_args):
+                print(f"Error: Flag '{arg}' requires a value", file=sys.stderr)
                 sys.exit(1)
-
-            project_id = cmd_args[0]
-            error_type = cmd_args[1]
-            error_message = cmd_args[2]
-            solution = cmd_args[3]
-
-            # Parse optional flags
-            lang = None
-            context_hints = None
-            stack_pattern = None
-            valid_flags = {'--lang', '--context_hints', '--stack_pattern'}
-            i = 4
-            while i < len(cmd_args):
-                arg = cmd_args[i]
-                if arg == '--lang' and i + 1 < len(cmd_args):
-                    lang = cmd_args[i + 1]
-                    i += 2
-                elif arg == '--context_hints' and i + 1 < len(cmd_args):
-                    try:
-                        context_hints = json.loads(cmd_args[i + 1])
-                        if not isinstance(context_hints, list):
-                            raise ValueError("context_hints must be a JSON array")
-                    except (json.JSONDecodeError, ValueError) as e:
-                        print(f"Error: Invalid JSON for --context_hints: {e}", file=sys.stderr)
-                        sys.exit(1)
-                    i += 2
-                elif arg == '--stack_pattern' and i + 1 < len(cmd_args):
-                    try:
-                        stack_pattern = json.loads(cmd_args[i + 1])
-                        if not isinstance(stack_pattern, list):
-                            raise ValueError("stack_pattern must be a JSON array")
-                    except (json.JSONDecodeError, ValueError) as e:
-                        print(f"Error: Invalid JSON for --stack_pattern: {e}", file=sys.stderr)
-                        sys.exit(1)
-                    i += 2
-                elif arg.startswith('--'):
-                    print(f"Error: Unknown flag '{arg}'. Valid flags: {sorted(valid_flags)}", file=sys.stderr)
+            key = arg.lstrip('--')
+            value = cmd_args[i + 1]
+            if key == 'iteration':
+                try:
+                    value = int(value)
+                except ValueError:
+                    print(f"Error: --iteration must be an integer, got '{value}'", file=sys.stderr)
                     sys.exit(1)
-                else:
-                    print(f"Error: Unexpected argument '{arg}'", file=sys.stderr)
+            elif key == 'references':
+                try:
+                    value = _json_loads(value)
+                    if not isinstance(value, list):
+                        raise ValueError("references must be a JSON array")
+                except json.JSONDecodeError as e:
+                    print(f"Error: Invalid JSON for --references: {e}", file=sys.stderr)
+                    sys.exit(1)
+            elif key == 'content-file':
+                # Read content from file (avoids shell escaping and process table exposure)
+                try:
+                    content = Path(value).read_text()
+                except Exception as e:
+                    print(f"Error: Could not read content file '{value}': {e}", file=sys.stderr)
                     sys.exit(1)
+                i += 2
+                continue  # Don't add to kwargs
+            kwargs[key] = value
+            i += 2
+        else:
+            # Unexpected positional argument - fail fast
+            print(f"Error: Unexpected argument '{arg}' after positional args.", file=sys.stderr)
+            print("Usage: save-reasoning <session_id> <group_id> <agent_type> <phase> [<content>] [--content-file FILE] [--agent_id X] [--iteration N] [--confidence X] [--references JSON]", file=sys.stderr)
+            sys.exit(1)
 
-            result = db.save_error_pattern(project_id, error_type, error_message, solution,
-                                          lang=lang, context_hints=context_hints,
-                                          stack_pattern=stack_pattern)
-            print(json.dumps(result, indent=2))
-        elif cmd == 'get-error-patterns':
-            # get-error-patterns <project_id> [--lang X] [--min_confidence N] [--limit N]
-            if len(cmd_args) < 1:
-                print("Error: get-error-patterns requires at least 1 arg: <project_id>", file=sys.stderr)
-                sys.exit(1)
+    # Validate content was provided
+    if content is None:
+        print("Error: Content is required. Provide as 5th argument or use --content-file FILE", file=sys.stderr)
+        sys.exit(1)
 
-            project_id = cmd_args[0]
-            lang = None
-            min_confidence = 0.7
-            limit = 5
-            valid_flags = {'--lang', '--min_confidence', '--limit'}
-            i = 1
-            while i < len(cmd_args):
-                arg = cmd_args[i]
-                if arg == '--lang' and i + 1 < len(cmd_args):
-                    lang = cmd_args[i + 1]
-                    i += 2
-                elif arg == '--min_confidence' and i + 1 < len(cmd_args):
-                    try:
-                        min_confidence = float(cmd_args[i + 1])
-                    except ValueError:
-                        print(f"Error: --min_confidence must be a number", file=sys.stderr)
-                        sys.exit(1)
-                    i += 2
-                elif arg == '--limit' and i + 1 < len(cmd_args):
-                    try:
-                        limit = int(cmd_args[i + 1])
-                    except ValueError:
-                        print(f"Error: --limit must be an integer", file=sys.stderr)
-                        sys.exit(1)
-                    i += 2
-                elif arg.startswith('--'):
-                    print(f"Error: Unknown flag '{arg}'. Valid flags: {sorted(valid_flags)}", file=sys.stderr)
-                    sys.exit(1)
-                else:
-                    print(f"Error: Unexpected argument '{arg}'", file=sys.stderr)
-                    sys.exit(1)
+    try:
+        result = db.save_reasoning(session_id, group_id, agent_type, phase, content, **kwargs)
+        print(_json_dumps(result, pretty=True))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
 
-            result = db.get_error_patterns(project_id, lang=lang, min_confidence=min_confidence, limit=limit)
-            print(json.dumps(result, indent=2))
-        elif cmd == 'update-error-confidence':
-            # update-error-confidence <pattern_hash> <project_id> <success|failure>
-            if len(cmd_args) < 3:
-                print("Error: update-error-confidence requires 3 args: <pattern_hash> <project_id> <success|failure>", file=sys.stderr)
-                sys.exit(1)
 
-            pattern_hash = cmd_args[0]
-            project_id = cmd_args[1]
-            outcome = cmd_args[2].lower()
-            if outcome not in ('success', 'failure'):
-                print(f"Error: Outcome must be 'success' or 'failure', got '{outcome}'", file=sys.stderr)
-                sys.exit(1)
+def _cmd_get_reasoning(db: BazingaDB, cmd_args: List[str]) -> None:
+    # Required: session_id
+    # Optional: --group_id, --agent_type, --phase, --limit, --format
+    if len(cmd_args) < 1:
+        print("Error: get-reasoning requires at least 1 arg: <session_id>", file=sys.stderr)
+        sys.exit(1)
 
-            result = db.update_error_pattern_confidence(pattern_hash, project_id, success=(outcome == 'success'))
-            print(json.dumps(result, indent=2))
-        elif cmd == 'cleanup-error-patterns':
-            # cleanup-error-patterns [project_id]
-            project_id = cmd_args[0] if len(cmd_args) > 0 else None
-            result = db.cleanup_expired_patterns(project_id)
-            print(json.dumps(result, indent=2))
-
-        # ==================== CONSUMPTION SCOPE COMMANDS ====================
-        elif cmd == 'save-consumption':
-            # save-consumption <session> <group_id> <agent_type> <iteration> <package_id>
-            if len(cmd_args) < 5:
-                print("Error: save-consumption requires: <session> <group_id> <agent_type> <iteration> <package_id>", file=sys.stderr)
-                sys.exit(1)
-            session_id = cmd_args[0]
-            group_id = cmd_args[1]
-            agent_type = cmd_args[2]
-            iteration = int(cmd_args[3])
-            package_id = int(cmd_args[4])
-            result = db.save_consumption(session_id, group_id, agent_type, iteration, package_id)
-            print(json.dumps(result, indent=2))
-        elif cmd == 'get-consumption':
-            # get-consumption <session> [--group_id X] [--agent_type Y] [--limit N]
-            if len(cmd_args) < 1:
-                print("Error: get-consumption requires: <session>", file=sys.stderr)
+    session_id = cmd_args[0]
+    kwargs = {}
+    output_format = 'json'
+    valid_flags = {'--group_id', '--agent_type', '--phase', '--limit', '--format'}
+    i = 1
+    while i < len(cmd_args):
+        arg = cmd_args[i]
+        if arg.startswith('--'):
+            if arg not in valid_flags:
+                print(f"Error: Unknown flag '{arg}'. Valid flags: {sorted(valid_flags)}", file=sys.stderr)
                 sys.exit(1)
-            session_id = cmd_args[0]
-            group_id = None
-            agent_type = None
-            limit = 50
-            i = 1
-            while i < len(cmd_args):
-                if cmd_args[i] == '--group_id' and i + 1 < len(cmd_args):
-                    group_id = cmd_args[i + 1]
-                    i += 2
-                elif cmd_args[i] == '--agent_type' and i + 1 < len(cmd_args):
-                    agent_type = cmd_args[i + 1]
-                    i += 2
-                elif cmd_args[i] == '--limit' and i + 1 < len(cmd_args):
-                    limit = int(cmd_args[i + 1])
-                    i += 2
-                else:
-                    i += 1
-            result = db.get_consumption(session_id, group_id, agent_type, limit)
-            print(json.dumps(result, indent=2))
-
-        # ==================== STRATEGIES COMMANDS ====================
-        elif cmd == 'save-strategy':
-            # save-strategy <project_id> <topic> <insight> [--lang X] [--framework Y] [--strategy_id Z]
-            if len(cmd_args) < 3:
-                print("Error: save-strategy requires: <project_id> <topic> <insight>", file=sys.stderr)
+            if i + 1 >= len(cmd_args):
+                print(f"Error: Flag '{arg}' requires a value", file=sys.stderr)
                 sys.exit(1)
-            project_id = cmd_args[0]
-            topic = cmd_args[1]
-            insight = cmd_args[2]
-            lang = None
-            framework = None
-            strategy_id = None
-            i = 3
-            while i < len(cmd_args):
-                if cmd_args[i] == '--lang' and i + 1 < len(cmd_args):
-                    lang = cmd_args[i + 1]
-                    i += 2
-                elif cmd_args[i] == '--framework' and i + 1 < len(cmd_args):
-                    framework = cmd_args[i + 1]
-                    i += 2
-                elif cmd_args[i] == '--strategy_id' and i + 1 < len(cmd_args):
-                    strategy_id = cmd_args[i + 1]
-                    i += 2
-                else:
-                    i += 1
-            result = db.save_strategy(project_id, topic, insight, lang, framework, strategy_id)
-            print(json.dumps(result, indent=2))
-        elif cmd == 'get-strategies':
-            # get-strategies <project_id> [--lang X] [--framework Y] [--topic Z] [--limit N]
-            if len(cmd_args) < 1:
-                print("Error: get-strategies requires: <project_id>", file=sys.stderr)
+            key = arg.lstrip('--')
+            value = cmd_args[i + 1]
+            if key == 'limit':
+                try:
+                    value = int(value)
+                except ValueError:
+                    print(f"Error: --limit must be an integer, got '{value}'", file=sys.stderr)
+                    sys.exit(1)
+            elif key == 'format':
+                if value not in ('json', 'prompt-summary'):
+                    print(f"Error: --format must be 'json' or 'prompt-summary', got '{value}'", file=sys.stderr)
+                    sys.exit(1)
+                output_format = value
+                i += 2
+                continue  # Don't add to kwargs
+            kwargs[key] = value
+            i += 2
+        else:
+            # Unexpected positional argument - fail fast
+            print(f"Error: Unexpected argument '{arg}'. Use --flag syntax for options.", file=sys.stderr)
+            print(f"Usage: get-reasoning <session_id> [--group_id X] [--agent_type X] [--phase X] [--limit N] [--format json|prompt-summary]", file=sys.stderr)
+            sys.exit(1)
+
+    try:
+        result = db.get_reasoning(session_id, output_format=output_format, **kwargs)
+        if output_format == 'prompt-summary':
+            print(result)  # Already formatted string
+        else:
+            print(_json_dumps(result, pretty=True))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def _cmd_reasoning_timeline(db: BazingaDB, cmd_args: List[str]) -> None:
+    # Required: session_id
+    # Optional: --group_id, --format
+    if len(cmd_args) < 1:
+        print("Error: reasoning-timeline requires at least 1 arg: <session_id>", file=sys.stderr)
+        sys.exit(1)
+
+    session_id = cmd_args[0]
+    group_id = None
+    fmt = 'json'
+    valid_flags = {'--group_id', '--format'}
+
+    i = 1
+    while i < len(cmd_args):
+        arg = cmd_args[i]
+        if arg == '--group_id':
+            if i + 1 >= len(cmd_args):
+                print("Error: --group_id requires a value", file=sys.stderr)
                 sys.exit(1)
-            project_id = cmd_args[0]
-            lang = None
-            framework = None
-            topic = None
-            limit = 5
-            i = 1
-            while i < len(cmd_args):
-                if cmd_args[i] == '--lang' and i + 1 < len(cmd_args):
-                    lang = cmd_args[i + 1]
-                    i += 2
-                elif cmd_args[i] == '--framework' and i + 1 < len(cmd_args):
-                    framework = cmd_args[i + 1]
-                    i += 2
-                elif cmd_args[i] == '--topic' and i + 1 < len(cmd_args):
-                    topic = cmd_args[i + 1]
-                    i += 2
-                elif cmd_args[i] == '--limit' and i + 1 < len(cmd_args):
-                    limit = int(cmd_args[i + 1])
-                    i += 2
-                else:
-                    i += 1
-            result = db.get_strategies(project_id, lang, framework, topic, limit)
-            print(json.dumps(result, indent=2))
-        elif cmd == 'update-strategy-helpfulness':
-            # update-strategy-helpfulness <strategy_id> [increment]
-            if len(cmd_args) < 1:
-                print("Error: update-strategy-helpfulness requires: <strategy_id>", file=sys.stderr)
+            group_id = cmd_args[i + 1]
+            i += 2
+        elif arg == '--format':
+            if i + 1 >= len(cmd_args):
+                print("Error: --format requires a value", file=sys.stderr)
                 sys.exit(1)
-            strategy_id = cmd_args[0]
-            increment = int(cmd_args[1]) if len(cmd_args) > 1 else 1
-            result = db.update_strategy_helpfulness(strategy_id, increment)
-            print(json.dumps(result, indent=2))
-        elif cmd == 'extract-strategies':
-            # extract-strategies <session> <group_id> <project_id> [--lang X] [--framework Y]
-            if len(cmd_args) < 3:
-                print("Error: extract-strategies requires: <session> <group_id> <project_id>", file=sys.stderr)
+            fmt = cmd_args[i + 1]
+            if fmt not in ('json', 'markdown'):
+                print(f"Error: --format must be 'json' or 'markdown', got '{fmt}'", file=sys.stderr)
                 sys.exit(1)
-            session_id = cmd_args[0]
-            group_id = cmd_args[1]
-            project_id = cmd_args[2]
-            lang = None
-            framework = None
-            i = 3
-            while i < len(cmd_args):
-                if cmd_args[i] == '--lang' and i + 1 < len(cmd_args):
-                    lang = cmd_args[i + 1]
-                    i += 2
-                elif cmd_args[i] == '--framework' and i + 1 < len(cmd_args):
-                    framework = cmd_args[i + 1]
-                    i += 2
-                else:
-                    i += 1
-            result = db.extract_strategies(session_id, group_id, project_id, lang, framework)
-            print(json.dumps(result, indent=2))
+            i += 2
+        elif arg.startswith('--'):
+            print(f"Error: Unknown flag '{arg}'. Valid flags: {sorted(valid_flags)}", file=sys.stderr)
+            sys.exit(1)
+        else:
+            # Unexpected positional argument - fail fast
+            print(f"Error: Unexpected argument '{arg}'. Use --flag syntax for options.", file=sys.stderr)
+            print(f"Usage: reasoning-timeline <session_id> [--group_id X] [--format json|markdown]", file=sys.stderr)
+            sys.exit(1)
 
-        elif cmd == 'query':
-            if not cmd_args:
-                print("Error: query command requires SQL statement", file=sys.stderr)
-                sys.exit(1)
-            # Join args to allow unquoted SQL: query SELECT * FROM table
-            sql = " ".join(cmd_args)
-            result = db.query(sql)
-            print(json.dumps(result, indent=2))
-        elif cmd == 'integrity-check':
-            result = db.check_integrity()
-            print(json.dumps(result, indent=2))
-            if not result['ok']:
-                sys.exit(1)
-        elif cmd == 'recover-db':
-            if db._recover_from_corruption():
-                print(json.dumps({"success": True, "message": "Database recovered successfully"}, indent=2))
-            else:
-                print(json.dumps({"success": False, "error": "Recovery failed"}, indent=2))
+    result = db.reasoning_timeline(session_id, group_id=group_id, output_format=fmt)
+    print(result)
+
+
+def _cmd_check_mandatory_phases(db: BazingaDB, cmd_args: List[str]) -> None:
+    # Required: session_id, group_id, agent_type
+    if len(cmd_args) < 3:
+        print("Error: check-mandatory-phases requires 3 args: <session_id> <group_id> <agent_type>", file=sys.stderr)
+        sys.exit(1)
+
+    session_id = cmd_args[0]
+    group_id = cmd_args[1]
+    agent_type = cmd_args[2]
+
+    result = db.check_mandatory_phases(session_id, group_id, agent_type)
+    print(_json_dumps(result, pretty=True))
+
+    # Exit with error code if mandatory phases are missing
+    if not result['complete']:
+        sys.exit(1)
+
+
+# ==================== ERROR PATTERN COMMANDS ====================
+
+def _cmd_save_error_pattern(db: BazingaDB, cmd_args: List[str]) -> None:
+    # save-error-pattern <project_id> <error_type> <error_message> <solution> [--lang X] [--context_hints JSON] [--stack_pattern JSON]
+    if len(cmd_args) < 4:
+        print("Error: save-error-pattern requires 4 args: <project_id> <error_type> <error_message> <solution>", file=sys.stderr)
+        sys.exit(1)
+
+    project_id = cmd_args[0]
+    error_type = cmd_args[1]
+    error_message = cmd_args[2]
+    solution = cmd_args[3]
+
+    # Parse optional flags
+    lang = None
+    context_hints = None
+    stack_pattern = None
+    valid_flags = {'--lang', '--context_hints', '--stack_pattern'}
+    i = 4
+    while i < len(cmd_args):
+        arg = cmd_args[i]
+        if arg == '--lang' and i + 1 < len(cmd_args):
+            lang = cmd_args[i + 1]
+            i += 2
+        elif arg == '--context_hints' and i + 1 < len(cmd_args):
+            try:
+                context_hints = _json_loads(cmd_args[i + 1])
+                if not isinstance(context_hints, list):
+                    raise ValueError("context_hints must be a JSON array")
+            except (json.JSONDecodeError, ValueError) as e:
+                print(f"Error: Invalid JSON for --context_hints: {e}", file=sys.stderr)
                 sys.exit(1)
-        elif cmd == 'diagnose-group-ids':
-            # diagnose-group-ids [--fix]
-            fix = '--fix' in cmd_args
-            result = db.diagnose_group_ids(fix=fix)
-            print(json.dumps(result, indent=2))
-            if result['issues_found'] > 0 and not fix:
-                sys.exit(1)  # Non-zero exit if issues found (for CI/CD)
-        elif cmd == 'save-event':
-            # save-event <session_id> <event_subtype> [<payload>|--payload-file <path>] [--idempotency-key <key>] [--group-id <id>]
-            if len(cmd_args) < 2:
-                print("Error: save-event requires at least 2 args: <session_id> <event_subtype> [payload|--payload-file <path>]", file=sys.stderr)
-                print("  event_subtype: pm_bazinga, scope_change, validator_verdict, tl_issues, etc.", file=sys.stderr)
-                print("  payload: JSON string (or use --payload-file)", file=sys.stderr)
-                print("  --payload-file: Read payload from file (avoids exposing in ps)", file=sys.stderr)
-                print("  --idempotency-key: Prevent duplicate events with same key", file=sys.stderr)
-                print("  --group-id: Group isolation key (default 'global')", file=sys.stderr)
+            i += 2
+        elif arg == '--stack_pattern' and i + 1 < len(cmd_args):
+            try:
+                stack_pattern = _json_loads(cmd_args[i + 1])
+                if not isinstance(stack_pattern, list):
+                    raise ValueError("stack_pattern must be a JSON array")
+            except (json.JSONDecodeError, ValueError) as e:
+                print(f"Error: Invalid JSON for --stack_pattern: {e}", file=sys.stderr)
                 sys.exit(1)
+            i += 2
+        elif arg.startswith('--'):
+            print(f"Error: Unknown flag '{arg}'. Valid flags: {sorted(valid_flags)}", file=sys.stderr)
+            sys.exit(1)
+        else:
+            print(f"Error: Unexpected argument '{arg}'", file=sys.stderr)
+            sys.exit(1)
 
-            session_id = cmd_args[0]
-            event_subtype = cmd_args[1]
-            payload = None
-            idempotency_key = None
-            group_id = 'global'
-
-            # Parse remaining args
-            i = 2
-            while i < len(cmd_args):
-                if cmd_args[i] == '--payload-file':
-                    if i + 1 >= len(cmd_args):
-                        print("Error: --payload-file requires a path", file=sys.stderr)
-                        sys.exit(1)
-                    payload_path = cmd_args[i + 1]
-                    try:
-                        with open(payload_path, 'r') as f:
-                            payload = f.read().strip()
-                        # Validate JSON before accepting
-                        json.loads(payload)
-                    except json.JSONDecodeError as e:
-                        print(f"Error: Invalid JSON in payload file '{payload_path}': {e}", file=sys.stderr)
-                        sys.exit(1)
-                    except Exception as e:
-                        print(f"Error reading payload file: {e}", file=sys.stderr)
-                        sys.exit(1)
-                    i += 2
-                elif cmd_args[i] == '--idempotency-key':
-                    if i + 1 >= len(cmd_args):
-                        print("Error: --idempotency-key requires a value", file=sys.stderr)
-                        sys.exit(1)
-                    idempotency_key = cmd_args[i + 1]
-                    i += 2
-                elif cmd_args[i] == '--group-id':
-                    if i + 1 >= len(cmd_args):
-                        print("Error: --group-id requires a value", file=sys.stderr)
-                        sys.exit(1)
-                    group_id = cmd_args[i + 1]
-                    i += 2
-                elif cmd_args[i].startswith('--'):
-                    print(f"Error: Unknown flag '{cmd_args[i]}'", file=sys.stderr)
-                    sys.exit(1)
-                elif payload is None:
-                    payload = cmd_args[i]
-                    i += 1
-                else:
-                    print(f"Error: Unexpected argument '{cmd_args[i]}'", file=sys.stderr)
-                    sys.exit(1)
+    result = db.save_error_pattern(project_id, error_type, error_message, solution,
+                                  lang=lang, context_hints=context_hints,
+                                  stack_pattern=stack_pattern)
+    print(_json_dumps(result, pretty=True))
 
-            if payload is None:
-                print("Error: No payload provided (use positional arg or --payload-file)", file=sys.stderr)
-                sys.exit(1)
 
-            result = db.save_event(session_id, event_subtype, payload, idempotency_key=idempotency_key, group_id=group_id)
-            print(json.dumps(result, indent=2))
-        elif cmd == 'save-investigation-iteration':
-            # save-investigation-iteration <session_id> <group_id> <iteration> <status> --state-file <path> --event-file <path>
-            if len(cmd_args) < 4:
-                print("Error: save-investigation-iteration requires: <session_id> <group_id> <iteration> <status> --state-file <path> --event-file <path>", file=sys.stderr)
-                print("  iteration: Integer iteration number", file=sys.stderr)
-                print("  status: under_investigation, root_cause_found, hypothesis_eliminated, etc.", file=sys.stderr)
-                print("  --state-file: Path to JSON file with state data", file=sys.stderr)
-                print("  --event-file: Path to JSON file with event payload", file=sys.stderr)
-                sys.exit(1)
+def _cmd_get_error_patterns(db: BazingaDB, cmd_args: List[str]) -> None:
+    # get-error-patterns <project_id> [--lang X] [--min_confidence N] [--limit N]
+    if len(cmd_args) < 1:
+        print("Error: get-error-patterns requires at least 1 arg: <project_id>", file=sys.stderr)
+        sys.exit(1)
 
-            session_id = cmd_args[0]
-            group_id = cmd_args[1]
+    project_id = cmd_args[0]
+    lang = None
+    min_confidence = 0.7
+    limit = 5
+    valid_flags = {'--lang', '--min_confidence', '--limit'}
+    i = 1
+    while i < len(cmd_args):
+        arg = cmd_args[i]
+        if arg == '--lang' and i + 1 < len(cmd_args):
+            lang = cmd_args[i + 1]
+            i += 2
+        elif arg == '--min_confidence' and i + 1 < len(cmd_args):
             try:
-                iteration = int(cmd_args[2])
+                min_confidence = float(cmd_args[i + 1])
             except ValueError:
-                print(f"Error: iteration must be integer, got '{cmd_args[2]}'", file=sys.stderr)
+                print(f"Error: --min_confidence must be a number", file=sys.stderr)
                 sys.exit(1)
-            status = cmd_args[3]
-            state_file = None
-            event_file = None
-
-            # Parse remaining args
-            i = 4
-            while i < len(cmd_args):
-                if cmd_args[i] == '--state-file':
-                    if i + 1 >= len(cmd_args):
-                        print("Error: --state-file requires a path", file=sys.stderr)
-                        sys.exit(1)
-                    state_file = cmd_args[i + 1]
-                    i += 2
-                elif cmd_args[i] == '--event-file':
-                    if i + 1 >= len(cmd_args):
-                        print("Error: --event-file requires a path", file=sys.stderr)
-                        sys.exit(1)
-                    event_file = cmd_args[i + 1]
-                    i += 2
-                else:
-                    print(f"Error: Unknown argument '{cmd_args[i]}'", file=sys.stderr)
-                    sys.exit(1)
-
-            if not state_file or not event_file:
-                print("Error: Both --state-file and --event-file are required", file=sys.stderr)
+            i += 2
+        elif arg == '--limit' and i + 1 < len(cmd_args):
+            try:
+                limit = int(cmd_args[i + 1])
+            except ValueError:
+                print(f"Error: --limit must be an integer", file=sys.stderr)
                 sys.exit(1)
+            i += 2
+        elif arg.startswith('--'):
+            print(f"Error: Unknown flag '{arg}'. Valid flags: {sorted(valid_flags)}", file=sys.stderr)
+            sys.exit(1)
+        else:
+            print(f"Error: Unexpected argument '{arg}'", file=sys.stderr)
+            sys.exit(1)
 
-            # Read files with JSON validation
+    result = db.get_error_patterns(project_id, lang=lang, min_confidence=min_confidence, limit=limit)
+    print(_json_dumps(result, pretty=True))
+
+
+def _cmd_update_error_confidence(db: BazingaDB, cmd_args: List[str]) -> None:
+    # update-error-confidence <pattern_hash> <project_id> <success|failure>
+    if len(cmd_args) < 3:
+        print("Error: update-error-confidence requires 3 args: <pattern_hash> <project_id> <success|failure>", file=sys.stderr)
+        sys.exit(1)
+
+    pattern_hash = cmd_args[0]
+    project_id = cmd_args[1]
+    outcome = cmd_args[2].lower()
+    if outcome not in ('success', 'failure'):
+        print(f"Error: Outcome must be 'success' or 'failure', got '{outcome}'", file=sys.stderr)
+        sys.exit(1)
+
+    result = db.update_error_pattern_confidence(pattern_hash, project_id, success=(outcome == 'success'))
+    print(_json_dumps(result, pretty=True))
+
+
+def _cmd_cleanup_error_patterns(db: BazingaDB, cmd_args: List[str]) -> None:
+    # cleanup-error-patterns [project_id]
+    project_id = cmd_args[0] if len(cmd_args) > 0 else None
+    result = db.cleanup_expired_patterns(project_id)
+    print(_json_dumps(result, pretty=True))
+
+
+# ==================== CONSUMPTION SCOPE COMMANDS ====================
+
+def _cmd_save_consumption(db: BazingaDB, cmd_args: List[str]) -> None:
+    # save-consumption <session> <group_id> <agent_type> <iteration> <package_id>
+    if len(cmd_args) < 5:
+        print("Error: save-consumption requires: <session> <group_id> <agent_type> <iteration> <package_id>", file=sys.stderr)
+        sys.exit(1)
+    session_id = cmd_args[0]
+    group_id = cmd_args[1]
+    agent_type = cmd_args[2]
+    iteration = int(cmd_args[3])
+    package_id = int(cmd_args[4])
+    result = db.save_consumption(session_id, group_id, agent_type, iteration, package_id)
+    print(_json_dumps(result, pretty=True))
+
+
+def _cmd_get_consumption(db: BazingaDB, cmd_args: List[str]) -> None:
+    # get-consumption <session> [--group_id X] [--agent_type Y] [--limit N]
+    if len(cmd_args) < 1:
+        print("Error: get-consumption requires: <session>", file=sys.stderr)
+        sys.exit(1)
+    session_id = cmd_args[0]
+    group_id = None
+    agent_type = None
+    limit = 50
+    i = 1
+    while i < len(cmd_args):
+        if cmd_args[i] == '--group_id' and i + 1 < len(cmd_args):
+            group_id = cmd_args[i + 1]
+            i += 2
+        elif cmd_args[i] == '--agent_type' and i + 1 < len(cmd_args):
+            agent_type = cmd_args[i + 1]
+            i += 2
+        elif cmd_args[i] == '--limit' and i + 1 < len(cmd_args):
+            limit = int(cmd_args[i + 1])
+            i += 2
+        else:
+            i += 1
+    result = db.get_consumption(session_id, group_id, agent_type, limit)
+    print(_json_dumps(result, pretty=True))
+
+
+# ==================== STRATEGIES COMMANDS ====================
+
+def _cmd_save_strategy(db: BazingaDB, cmd_args: List[str]) -> None:
+    # save-strategy <project_id> <topic> <insight> [--lang X] [--framework Y] [--strategy_id Z]
+    if len(cmd_args) < 3:
+        print("Error: save-strategy requires: <project_id> <topic> <insight>", file=sys.stderr)
+        sys.exit(1)
+    project_id = cmd_args[0]
+    topic = cmd_args[1]
+    insight = cmd_args[2]
+    lang = None
+    framework = None
+    strategy_id = None
+    i = 3
+    while i < len(cmd_args):
+        if cmd_args[i] == '--lang' and i + 1 < len(cmd_args):
+            lang = cmd_args[i + 1]
+            i += 2
+        elif cmd_args[i] == '--framework' and i + 1 < len(cmd_args):
+            framework = cmd_args[i + 1]
+            i += 2
+        elif cmd_args[i] == '--strategy_id' and i + 1 < len(cmd_args):
+            strategy_id = cmd_args[i + 1]
+            i += 2
+        else:
+            i += 1
+    result = db.save_strategy(project_id, topic, insight, lang, framework, strategy_id)
+    print(_json_dumps(result, pretty=True))
+
+
+def _cmd_get_strategies(db: BazingaDB, cmd_args: List[str]) -> None:
+    # get-strategies <project_id> [--lang X] [--framework Y] [--topic Z] [--limit N]
+    if len(cmd_args) < 1:
+        print("Error: get-strategies requires: <project_id>", file=sys.stderr)
+        sys.exit(1)
+    project_id = cmd_args[0]
+    lang = None
+    framework = None
+    topic = None
+    limit = 5
+    i = 1
+    while i < len(cmd_args):
+        if cmd_args[i] == '--lang' and i + 1 < len(cmd_args):
+            lang = cmd_args[i + 1]
+            i += 2
+        elif cmd_args[i] == '--framework' and i + 1 < len(cmd_args):
+            framework = cmd_args[i + 1]
+            i += 2
+        elif cmd_args[i] == '--topic' and i + 1 < len(cmd_args):
+            topic = cmd_args[i + 1]
+            i += 2
+        elif cmd_args[i] == '--limit' and i + 1 < len(cmd_args):
+            limit = int(cmd_args[i + 1])
+            i += 2
+        else:
+            i += 1
+    result = db.get_strategies(project_id, lang, framework, topic, limit)
+    print(_json_dumps(result, pretty=True))
+
+
+def _cmd_update_strategy_helpfulness(db: BazingaDB, cmd_args: List[str]) -> None:
+    # update-strategy-helpfulness <strategy_id> [increment]
+    if len(cmd_args) < 1:
+        print("Error: update-strategy-helpfulness requires: <strategy_id>", file=sys.stderr)
+        sys.exit(1)
+    strategy_id = cmd_args[0]
+    increment = int(cmd_args[1]) if len(cmd_args) > 1 else 1
+    result = db.update_strategy_helpfulness(strategy_id, increment)
+    print(_json_dumps(result, pretty=True))
+
+
+def _cmd_extract_strategies(db: BazingaDB, cmd_args: List[str]) -> None:
+    # extract-strategies <session> <group_id> <project_id> [--lang X] [--framework Y]
+    if len(cmd_args) < 3:
+        print("Error: extract-strategies requires: <session> <group_id> <project_id>", file=sys.stderr)
+        sys.exit(1)
+    session_id = cmd_args[0]
+    group_id = cmd_args[1]
+    project_id = cmd_args[2]
+    lang = None
+    framework = None
+    i = 3
+    while i < len(cmd_args):
+        if cmd_args[i] == '--lang' and i + 1 < len(cmd_args):
+            lang = cmd_args[i + 1]
+            i += 2
+        elif cmd_args[i] == '--framework' and i + 1 < len(cmd_args):
+            framework = cmd_args[i + 1]
+            i += 2
+        else:
+            i += 1
+    result = db.extract_strategies(session_id, group_id, project_id, lang, framework)
+    print(_json_dumps(result, pretty=True))
+
+
+def _cmd_query(db: BazingaDB, cmd_args: List[str]) -> None:
+    if not cmd_args:
+        print("Error: query command requires SQL statement", file=sys.stderr)
+        sys.exit(1)
+    # Join args to allow unquoted SQL: query SELECT * FROM table
+    sql = " ".join(cmd_args)
+    try:
+        result = db.query(sql)
+    except PermissionError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(_json_dumps(result, pretty=True))
+
+
+def _cmd_integrity_check(db: BazingaDB, cmd_args: List[str]) -> None:
+    result = db.check_integrity()
+    print(_json_dumps(result, pretty=True))
+    if not result['ok']:
+        sys.exit(1)
+
+
+def _cmd_recover_db(db: BazingaDB, cmd_args: List[str]) -> None:
+    if db._recover_from_corruption():
+        print(_json_dumps({"success": True, "message": "Database recovered successfully"}, pretty=True))
+    else:
+        print(_json_dumps({"success": False, "error": "Recovery failed"}, pretty=True))
+        sys.exit(1)
+
+
+def _cmd_rebuild_indexes(db: BazingaDB, cmd_args: List[str]) -> None:
+    result = db.rebuild_indexes()
+    print(_json_dumps(result, pretty=True))
+    if not result['success']:
+        sys.exit(1)
+
+
+def _cmd_diagnose_group_ids(db: BazingaDB, cmd_args: List[str]) -> None:
+    # diagnose-group-ids [--fix]
+    fix = '--fix' in cmd_args
+    result = db.diagnose_group_ids(fix=fix)
+    print(_json_dumps(result, pretty=True))
+    if result['issues_found'] > 0 and not fix:
+        sys.exit(1)  # Non-zero exit if issues found (for CI/CD)
+
+
+def _cmd_save_event(db: BazingaDB, cmd_args: List[str]) -> None:
+    # save-event <session_id> <event_subtype> [<payload>|--payload-file <path>] [--idempotency-key <key>] [--group-id <id>]
+    if len(cmd_args) < 2:
+        print("Error: save-event requires at least 2 args: <session_id> <event_subtype> [payload|--payload-file <path>]", file=sys.stderr)
+        print("  event_subtype: pm_bazinga, scope_change, validator_verdict, tl_issues, etc.", file=sys.stderr)
+        print("  payload: JSON string (or use --payload-file)", file=sys.stderr)
+        print("  --payload-file: Read payload from file (avoids exposing in ps)", file=sys.stderr)
+        print("  --idempotency-key: Prevent duplicate events with same key", file=sys.stderr)
+        print("  --group-id: Group isolation key (default 'global')", file=sys.stderr)
+        sys.exit(1)
+
+    session_id = cmd_args[0]
+    event_subtype = cmd_args[1]
+    payload = None
+    idempotency_key = None
+    group_id = 'global'
+
+    # Parse remaining args
+    i = 2
+    while i < len(cmd_args):
+        if cmd_args[i] == '--payload-file':
+            if i + 1 >= len(cmd_args):
+                print("Error: --payload-file requires a path", file=sys.stderr)
+                sys.exit(1)
+            payload_path = cmd_args[i + 1]
             try:
-                with open(state_file, 'r') as f:
-                    state_data = f.read().strip()
+                with open(payload_path, 'r') as f:
+                    payload = f.read().strip()
                 # Validate JSON before accepting
-                json.loads(state_data)
+                _json_loads(payload)
             except json.JSONDecodeError as e:
-                print(f"Error: Invalid JSON in state file '{state_file}': {e}", file=sys.stderr)
+                print(f"Error: Invalid JSON in payload file '{payload_path}': {e}", file=sys.stderr)
                 sys.exit(1)
             except Exception as e:
-                print(f"Error reading state file: {e}", file=sys.stderr)
+                print(f"Error reading payload file: {e}", file=sys.stderr)
                 sys.exit(1)
-
-            try:
-                with open(event_file, 'r') as f:
-                    event_payload = f.read().strip()
-                # Validate JSON before accepting
-                json.loads(event_payload)
-            except json.JSONDecodeError as e:
-                print(f"Error: Invalid JSON in event file '{event_file}': {e}", file=sys.stderr)
+            i += 2
+        elif cmd_args[i] == '--idempotency-key':
+            if i + 1 >= len(cmd_args):
+                print("Error: --idempotency-key requires a value", file=sys.stderr)
                 sys.exit(1)
-            except Exception as e:
-                print(f"Error reading event file: {e}", file=sys.stderr)
+            idempotency_key = cmd_args[i + 1]
+            i += 2
+        elif cmd_args[i] == '--group-id':
+            if i + 1 >= len(cmd_args):
+                print("Error: --group-id requires a value", file=sys.stderr)
                 sys.exit(1)
+            group_id = cmd_args[i + 1]
+            i += 2
+        elif cmd_args[i].startswith('--'):
+            print(f"Error: Unknown flag '{cmd_args[i]}'", file=sys.stderr)
+            sys.exit(1)
+        elif payload is None:
+            payload = cmd_args[i]
+            i += 1
+        else:
+            print(f"Error: Unexpected argument '{cmd_args[i]}'", file=sys.stderr)
+            sys.exit(1)
 
-            result = db.save_investigation_iteration(session_id, group_id, iteration, status, state_data, event_payload)
-            print(json.dumps(result, indent=2))
-        elif cmd == 'get-events':
-            # get-events <session_id> [event_subtype] [limit]
-            # Also supports: get-events <session_id> [event_subtype] --limit N
-            if len(cmd_args) < 1:
-                print("Error: get-events requires at least 1 arg: <session_id> [event_subtype] [limit]", file=sys.stderr)
-                print("  Examples:", file=sys.stderr)
-                print("    get-events sess_123                    # all events, limit 50", file=sys.stderr)
-                print("    get-events sess_123 pm_bazinga         # filter by subtype", file=sys.stderr)
-                print("    get-events sess_123 pm_bazinga 1       # with limit", file=sys.stderr)
+    if payload is None:
+        print("Error: No payload provided (use positional arg or --payload-file)", file=sys.stderr)
+        sys.exit(1)
+
+    result = db.save_event(session_id, event_subtype, payload, idempotency_key=idempotency_key, group_id=group_id)
+    print(_json_dumps(result, pretty=True))
+
+
+def _cmd_save_investigation_iteration(db: BazingaDB, cmd_args: List[str]) -> None:
+    # save-investigation-iteration <session_id> <group_id> <iteration> <status> --state-file <path> --event-file <path>
+    if len(cmd_args) < 4:
+        print("Error: save-investigation-iteration requires: <session_id> <group_id> <iteration> <status> --state-file <path> --event-file <path>", file=sys.stderr)
+        print("  iteration: Integer iteration number", file=sys.stderr)
+        print("  status: under_investigation, root_cause_found, hypothesis_eliminated, etc.", file=sys.stderr)
+        print("  --state-file: Path to JSON file with state data", file=sys.stderr)
+        print("  --event-file: Path to JSON file with event payload", file=sys.stderr)
+        sys.exit(1)
+
+    session_id = cmd_args[0]
+    group_id = cmd_args[1]
+    try:
+        iteration = int(cmd_args[2])
+    except ValueError:
+        print(f"Error: iteration must be integer, got '{cmd_args[2]}'", file=sys.stderr)
+        sys.exit(1)
+    status = cmd_args[3]
+    state_file = None
+    event_file = None
+
+    # Parse remaining args
+    i = 4
+    while i < len(cmd_args):
+        if cmd_args[i] == '--state-file':
+            if i + 1 >= len(cmd_args):
+                print("Error: --state-file requires a path", file=sys.stderr)
                 sys.exit(1)
-            session_id = cmd_args[0]
-            event_subtype = None
-            limit = 50
-
-            # Parse remaining args, handling --limit flag
-            i = 1
-            while i < len(cmd_args):
-                arg = cmd_args[i]
-                if arg == '--limit' and i + 1 < len(cmd_args):
-                    try:
-                        limit = int(cmd_args[i + 1])
-                    except ValueError:
-                        print(f"Error: --limit requires integer, got '{cmd_args[i + 1]}'", file=sys.stderr)
-                        sys.exit(1)
-                    i += 2
-                elif arg.startswith('--'):
-                    print(f"Error: Unknown flag '{arg}'", file=sys.stderr)
-                    sys.exit(1)
-                elif event_subtype is None:
-                    event_subtype = arg
-                    i += 1
-                else:
-                    # Positional limit
-                    try:
-                        limit = int(arg)
-                    except ValueError:
-                        print(f"Error: Invalid limit '{arg}' - must be integer", file=sys.stderr)
-                        sys.exit(1)
-                    i += 1
-
-            result = db.get_events(session_id, event_subtype, limit)
-            print(json.dumps(result, indent=2))
-        elif cmd == 'help':
-            print_help()
-            sys.exit(0)
+            state_file = cmd_args[i + 1]
+            i += 2
+        elif cmd_args[i] == '--event-file':
+            if i + 1 >= len(cmd_args):
+                print("Error: --event-file requires a path", file=sys.stderr)
+                sys.exit(1)
+            event_file = cmd_args[i + 1]
+            i += 2
         else:
-            print(f"Unknown command: {cmd}", file=sys.stderr)
-            print("\nRun with 'help' command to see available commands.", file=sys.stderr)
+            print(f"Error: Unknown argument '{cmd_args[i]}'", file=sys.stderr)
             sys.exit(1)
 
+    if not state_file or not event_file:
+        print("Error: Both --state-file and --event-file are required", file=sys.stderr)
+        sys.exit(1)
+
+    # Read files with JSON validation
+    try:
+        with open(state_file, 'r') as f:
+            state_data = f.read().strip()
+        # Validate JSON before accepting
+        _json_loads(state_data)
+    except json.JSONDecodeError as e:
+        print(f"Error: Invalid JSON in state file '{state_file}': {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error reading state file: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        with open(event_file, 'r') as f:
+            event_payload = f.read().strip()
+        # Validate JSON before accepting
+        _json_loads(event_payload)
+    except json.JSONDecodeError as e:
+        print(f"Error: Invalid JSON in event file '{event_file}': {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error reading event file: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    result = db.save_investigation_iteration(session_id, group_id, iteration, status, state_data, event_payload)
+    print(_json_dumps(result, pretty=True))
+
+
+def _cmd_get_events(db: BazingaDB, cmd_args: List[str]) -> None:
+    # get-events <session_id> [event_subtype] [limit]
+    # Also supports: get-events <session_id> [event_subtype] --limit N
+    if len(cmd_args) < 1:
+        print("Error: get-events requires at least 1 arg: <session_id> [event_subtype] [limit]", file=sys.stderr)
+        print("  Examples:", file=sys.stderr)
+        print("    get-events sess_123                    # all events, limit 50", file=sys.stderr)
+        print("    get-events sess_123 pm_bazinga         # filter by subtype", file=sys.stderr)
+        print("    get-events sess_123 pm_bazinga 1       # with limit", file=sys.stderr)
+        sys.exit(1)
+    session_id = cmd_args[0]
+    event_subtype = None
+    limit = 50
+
+    # Parse remaining args, handling --limit flag
+    i = 1
+    while i < len(cmd_args):
+        arg = cmd_args[i]
+        if arg == '--limit' and i + 1 < len(cmd_args):
+            try:
+                limit = int(cmd_args[i + 1])
+            except ValueError:
+                print(f"Error: --limit requires integer, got '{cmd_args[i + 1]}'", file=sys.stderr)
+                sys.exit(1)
+            i += 2
+        elif arg.startswith('--'):
+            print(f"Error: Unknown flag '{arg}'", file=sys.stderr)
+            sys.exit(1)
+        elif event_subtype is None:
+            event_subtype = arg
+            i += 1
+        else:
+            # Positional limit
+            try:
+                limit = int(arg)
+            except ValueError:
+                print(f"Error: Invalid limit '{arg}' - must be integer", file=sys.stderr)
+                sys.exit(1)
+            i += 1
+
+    result = db.get_events(session_id, event_subtype, limit)
+    print(_json_dumps(result, pretty=True))
+
+# Command name -> handler; O(1) dispatch instead of a long if/elif chain
+_COMMANDS = {
+    'create-session': _cmd_create_session,
+    'get-session': _cmd_get_session,
+    'list-sessions': _cmd_list_sessions,
+    'log-interaction': _cmd_log_interaction,
+    'log-interactions-batch': _cmd_log_interactions_batch,
+    'batch': _cmd_batch,
+    'save-state': _cmd_save_state,
+    'get-state': _cmd_get_state,
+    'get-state-field': _cmd_get_state_field,
+    'stream-logs': _cmd_stream_logs,
+    'dashboard-snapshot': _cmd_dashboard_snapshot,
+    'dashboard-stream': _cmd_dashboard_stream,
+    'log-tokens': _cmd_log_tokens,
+    'log-tokens-batch': _cmd_log_tokens_batch,
+    'token-summary': _cmd_token_summary,
+    'save-skill-output': _cmd_save_skill_output,
+    'get-skill-output': _cmd_get_skill_output,
+    'get-skill-output-field': _cmd_get_skill_output_field,
+    'has-skill-output': _cmd_has_skill_output,
+    'get-skill-output-all': _cmd_get_skill_output_all,
+    'check-skill-evidence': _cmd_check_skill_evidence,
+    'get-task-groups': _cmd_get_task_groups,
+    'update-session-status': _cmd_update_session_status,
+    'update-session': _cmd_update_session,
+    'complete-session': _cmd_complete_session,
+    'create-task-group': _cmd_create_task_group,
+    'update-task-group': _cmd_update_task_group,
+    'save-development-plan': _cmd_save_development_plan,
+    'get-development-plan': _cmd_get_development_plan,
+    'update-plan-progress': _cmd_update_plan_progress,
+    'save-success-criteria': _cmd_save_success_criteria,
+    'get-success-criteria': _cmd_get_success_criteria,
+    'update-success-criterion': _cmd_update_success_criterion,
+    'save-context-package': _cmd_save_context_package,
+    'get-context-packages': _cmd_get_context_packages,
+    'mark-context-consumed': _cmd_mark_context_consumed,
+    'update-context-references': _cmd_update_context_references,
+    'save-reasoning': _cmd_save_reasoning,
+    'get-reasoning': _cmd_get_reasoning,
+    'reasoning-timeline': _cmd_reasoning_timeline,
+    'check-mandatory-phases': _cmd_check_mandatory_phases,
+    'save-error-pattern': _cmd_save_error_pattern,
+    'get-error-patterns': _cmd_get_error_patterns,
+    'update-error-confidence': _cmd_update_error_confidence,
+    'cleanup-error-patterns': _cmd_cleanup_error_patterns,
+    'save-consumption': _cmd_save_consumption,
+    'get-consumption': _cmd_get_consumption,
+    'save-strategy': _cmd_save_strategy,
+    'get-strategies': _cmd_get_strategies,
+    'update-strategy-helpfulness': _cmd_update_strategy_helpfulness,
+    'extract-strategies': _cmd_extract_strategies,
+    'query': _cmd_query,
+    'integrity-check': _cmd_integrity_check,
+    'recover-db': _cmd_recover_db,
+    'rebuild-indexes': _cmd_rebuild_indexes,
+    'diagnose-group-ids': _cmd_diagnose_group_ids,
+    'save-event': _cmd_save_event,
+    'save-investigation-iteration': _cmd_save_investigation_iteration,
+    'get-events': _cmd_get_events,
+}
+
+
+def main():
+    # Ensure we're in project root for relative path resolution
+    _ensure_cwd_at_project_root()
+
+    args = _parse_cli_args(sys.argv[1:])
+
+    # Handle detect-paths command before resolving db
+    if args.command == 'detect-paths':
+        if _HAS_BAZINGA_PATHS:
+            info = get_detection_info()
+            print(_json_dumps(info, pretty=True))
+        else:
+            print(_json_dumps({"error": "bazinga_paths module not available"}, pretty=True))
+        sys.exit(0)
+
+    # help and unknown commands need no database
+    if args.command == 'help':
+        print_help()
+        sys.exit(0)
+    handler = _COMMANDS.get(args.command)
+    if handler is None:
+        print(f"Unknown command: {args.command}", file=sys.stderr)
+        print("\nRun with 'help' command to see available commands.", file=sys.stderr)
+        sys.exit(1)
+
+    # Resolve database path
+    db_path = _resolve_db_path(args)
+    db = BazingaDB(db_path, quiet=args.quiet)
+
+    try:
+        handler(db, args.args)
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        # Every write has already committed; closing here makes the WAL
+        # checkpoint/cleanup happen at a fixed point rather than at GC
+        db.close()
 
 
 if __name__ == '__main__':
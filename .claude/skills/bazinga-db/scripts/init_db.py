@@ -8,13 +8,11 @@ Path Resolution:
     PROJECT_ROOT/bazinga/bazinga.db
 """
 
+import os
 import sqlite3
 import sys
 import time
 from pathlib import Path
-import tempfile
-import shutil
-import subprocess
 
 # Add _shared directory to path for bazinga_paths import
 _script_dir = Path(__file__).parent.resolve()
@@ -28,11 +26,44 @@ try:
 except ImportError:
     _HAS_BAZINGA_PATHS = False
 
+# fcntl is Unix/Linux/macOS only (init is serialized on a lock file where available)
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
 # Current schema version
-SCHEMA_VERSION = 19
+SCHEMA_VERSION = 26
+
+# PRAGMA synchronous levels accepted from BAZINGA_DB_SYNCHRONOUS
+SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+
+def get_synchronous_mode() -> str:
+    """PRAGMA synchronous level for WAL connections.
+
+    NORMAL by default (fsync at checkpoints only, still crash-safe in WAL);
+    set BAZINGA_DB_SYNCHRONOUS=FULL to fsync on every commit instead.
+    """
+    mode = (os.environ.get('BAZINGA_DB_SYNCHRONOUS') or 'NORMAL').strip().upper()
+    if mode not in SYNCHRONOUS_MODES:
+        print(f"Warning: ignoring invalid BAZINGA_DB_SYNCHRONOUS={mode!r} "
+              f"(expected one of {', '.join(SYNCHRONOUS_MODES)})", file=sys.stderr)
+        return 'NORMAL'
+    return mode
+
 
 def get_schema_version(cursor) -> int:
-    """Get current schema version from database."""
+    """Get current schema version from database.
+
+    Since v24 the version is mirrored into PRAGMA user_version (a field in
+    the file header, no table read). Older databases only have it in the
+    schema_version table.
+    """
+    version = cursor.execute("PRAGMA user_version").fetchone()[0]
+    if version:
+        return version
     try:
         cursor.execute("SELECT version FROM schema_version ORDER BY version DESC LIMIT 1")
         result = cursor.fetchone()
@@ -41,80 +72,527 @@ def get_schema_version(cursor) -> int:
         # Table doesn't exist, this is version 0 (pre-versioning)
         return 0
 
+def _create_schema(conn, is_new_db: bool) -> None:
+    """Run SCHEMA_DDL (plus the version backstop) as one transaction."""
+    # executescript() commits any pending transaction before it runs, so the
+    # BEGIN/COMMIT have to be part of the script itself.
+    # New databases get their version row (and user_version) here; upgraded
+    # ones already recorded it, so for them the insert is only a backstop
+    # that needs no extra version lookup
+    conn.executescript(
+        f"BEGIN IMMEDIATE;\n{SCHEMA_DDL}\n"
+        "INSERT INTO schema_version (version, description) "
+        f"VALUES ({SCHEMA_VERSION}, 'Initial schema v{SCHEMA_VERSION}') "
+        "ON CONFLICT(version) DO NOTHING;\n"
+        + (f"PRAGMA user_version = {SCHEMA_VERSION};\n" if is_new_db else "")
+        + "COMMIT;"
+    )
+    print(f"✓ Created/verified {SCHEMA_DDL.count('TABLE IF NOT EXISTS')} tables, "
+          f"{SCHEMA_DDL.count('INDEX IF NOT EXISTS')} indexes")
+
+def get_table_columns(cursor, table: str) -> set:
+    """Return the set of column names currently defined on a table."""
+    cursor.execute(f"PRAGMA table_info({table})")
+    return {row[1] for row in cursor.fetchall()}
+
 def migrate_v1_to_v2(conn, cursor) -> None:
     """Migrate from v1 (CHECK constraint) to v2 (no constraint)."""
     print("🔄 Migrating schema from v1 to v2...")
 
-    # Export existing data
-    cursor.execute("SELECT * FROM orchestration_logs")
-    logs_data = cursor.fetchall()
-    print(f"   - Backing up {len(logs_data)} orchestration log entries")
-
-    # Drop old table
-    cursor.execute("DROP TABLE IF EXISTS orchestration_logs")
-
-    # Recreate with new schema (no CHECK constraint)
-    cursor.execute("""
-        CREATE TABLE orchestration_logs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            session_id TEXT NOT NULL,
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            iteration INTEGER,
-            agent_type TEXT NOT NULL,
-            agent_id TEXT,
-            content TEXT NOT NULL,
-            FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
-        )
-    """)
-
-    # Recreate indexes
-    cursor.execute("""
-        CREATE INDEX idx_logs_session
-        ON orchestration_logs(session_id, timestamp DESC)
-    """)
-    cursor.execute("""
-        CREATE INDEX idx_logs_agent_type
-        ON orchestration_logs(session_id, agent_type)
-    """)
-
-    # Restore data
-    if logs_data:
-        cursor.executemany("""
+    # Copy rows table-to-table inside SQLite instead of round-tripping them
+    # through Python; one transaction so a failure leaves v1 untouched
+    conn.commit()  # Close any implicit transaction
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+
+        # Keep the old table (and its rows) aside under a new name
+        cursor.execute("ALTER TABLE orchestration_logs RENAME TO orchestration_logs_v1")
+
+        # Recreate with new schema (no CHECK constraint)
+        cursor.execute("""
+            CREATE TABLE orchestration_logs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                iteration INTEGER,
+                agent_type TEXT NOT NULL,
+                agent_id TEXT,
+                content TEXT NOT NULL,
+                FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
+            )
+        """)
+
+        cursor.execute("""
             INSERT INTO orchestration_logs
             (id, session_id, timestamp, iteration, agent_type, agent_id, content)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, logs_data)
-        print(f"   - Restored {len(logs_data)} orchestration log entries")
+            SELECT id, session_id, timestamp, iteration, agent_type, agent_id, content
+            FROM orchestration_logs_v1
+        """)
+        copied = cursor.rowcount
+
+        # Dropping the old table also drops its indexes, freeing the names
+        cursor.execute("DROP TABLE orchestration_logs_v1")
+
+        # Recreate indexes
+        cursor.execute("""
+            CREATE INDEX idx_logs_session
+            ON orchestration_logs(session_id, timestamp DESC)
+        """)
+        cursor.execute("""
+            CREATE INDEX idx_logs_agent_type
+            ON orchestration_logs(session_id, agent_type)
+        """)
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    print(f"   - Copied {copied} orchestration log entries")
 
     print("✓ Migration to v2 complete")
 
+
+# Complete schema for fresh databases (CREATE ... IF NOT EXISTS, so it also
+# fills in anything missing after a migration). Executed as a single script.
+SCHEMA_DDL = """
+-- Sessions table
+-- Extended in v9 to support metadata (JSON) for original_scope tracking
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    end_time TIMESTAMP,
+    mode TEXT CHECK(mode IN ('simple', 'parallel')),
+    original_requirements TEXT,
+    status TEXT CHECK(status IN ('active', 'completed', 'failed')) DEFAULT 'active',
+    initial_branch TEXT DEFAULT 'main',
+    metadata TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Orchestration logs table (replaces orchestration-log.md)
+-- Extended in v8 to support agent reasoning capture
+-- Extended in v9 to support event logging (pm_bazinga, scope_change, validator_verdict)
+-- Extended in v17 to support idempotency_key for event deduplication
+-- CHECK constraints enforce valid enumeration values at database layer
+CREATE TABLE IF NOT EXISTS orchestration_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    iteration INTEGER,
+    agent_type TEXT NOT NULL,
+    agent_id TEXT,
+    content TEXT NOT NULL,
+    log_type TEXT DEFAULT 'interaction'
+        CHECK(log_type IN ('interaction', 'reasoning', 'event')),
+    reasoning_phase TEXT
+        CHECK(reasoning_phase IS NULL OR reasoning_phase IN (
+            'understanding', 'approach', 'decisions', 'risks',
+            'blockers', 'pivot', 'completion'
+        )),
+    confidence_level TEXT
+        CHECK(confidence_level IS NULL OR confidence_level IN ('high', 'medium', 'low')),
+    references_json TEXT,
+    redacted INTEGER DEFAULT 0 CHECK(redacted IN (0, 1)),
+    group_id TEXT,
+    event_subtype TEXT,
+    event_payload TEXT,
+    idempotency_key TEXT,
+    FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_logs_session
+ON orchestration_logs(session_id, timestamp DESC);
+-- v20: Serves get_logs(agent_type=...) filter + ORDER BY timestamp DESC without a temp B-tree
+-- (v23: also replaces idx_logs_agent_type, which was a strict prefix of it)
+CREATE INDEX IF NOT EXISTS idx_logs_session_agent_ts
+ON orchestration_logs(session_id, agent_type, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_logs_reasoning
+ON orchestration_logs(session_id, log_type, reasoning_phase)
+WHERE log_type = 'reasoning';
+CREATE INDEX IF NOT EXISTS idx_logs_group_reasoning
+ON orchestration_logs(session_id, group_id, log_type)
+WHERE log_type = 'reasoning';
+CREATE INDEX IF NOT EXISTS idx_logs_events
+ON orchestration_logs(session_id, log_type, event_subtype)
+WHERE log_type = 'event';
+-- v18: Updated to include group_id for cross-group isolation
+CREATE UNIQUE INDEX IF NOT EXISTS idx_logs_idempotency
+ON orchestration_logs(session_id, event_subtype, group_id, idempotency_key)
+WHERE idempotency_key IS NOT NULL AND log_type = 'event';
+
+-- State snapshots table (replaces JSON state files)
+-- Extended in v18 to support group_id for investigation state isolation
+-- Extended in v18 to support 'investigation' state_type
+CREATE TABLE IF NOT EXISTS state_snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    group_id TEXT NOT NULL DEFAULT 'global',
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    state_type TEXT CHECK(state_type IN ('pm', 'orchestrator', 'group_status', 'investigation')),
+    state_data TEXT NOT NULL,
+    FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
+);
+-- UNIQUE index for upsert support (allows ON CONFLICT)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_state_unique
+ON state_snapshots(session_id, state_type, group_id);
+-- Performance index for queries
+CREATE INDEX IF NOT EXISTS idx_state_session_type_group
+ON state_snapshots(session_id, state_type, group_id, timestamp DESC);
+
+-- Task groups table (normalized from pm_state.json)
+-- PRIMARY KEY: Composite (id, session_id) allows same group ID across sessions
+-- Extended in v9 to support item_count for progress tracking
+-- Extended in v14 to support security_sensitive, qa_attempts, tl_review_attempts
+-- Extended in v15 to support component_path for version-specific prompt building
+-- Extended in v16 to support review_iteration, no_progress_count, blocking_issues_count
+-- Extended in v19 to support speckit_task_ids for SpecKit pre-planned task tracking
+-- v22: WITHOUT ROWID - rows are stored clustered on the (id, session_id) key
+CREATE TABLE IF NOT EXISTS task_groups (
+    id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    status TEXT CHECK(status IN (
+        'pending', 'in_progress', 'completed', 'failed',
+        'approved_pending_merge', 'merging'
+    )) DEFAULT 'pending',
+    assigned_to TEXT,
+    revision_count INTEGER DEFAULT 0,
+    last_review_status TEXT CHECK(last_review_status IN ('APPROVED', 'CHANGES_REQUESTED', NULL)),
+    feature_branch TEXT,
+    merge_status TEXT CHECK(merge_status IN ('pending', 'in_progress', 'merged', 'conflict', 'test_failure', NULL)),
+    complexity INTEGER CHECK(complexity BETWEEN 1 AND 10),
+    initial_tier TEXT CHECK(initial_tier IN ('Developer', 'Senior Software Engineer')) DEFAULT 'Developer',
+    context_references TEXT,
+    specializations TEXT,
+    item_count INTEGER DEFAULT 1,
+    security_sensitive INTEGER DEFAULT 0,
+    qa_attempts INTEGER DEFAULT 0,
+    tl_review_attempts INTEGER DEFAULT 0,
+    component_path TEXT,
+    review_iteration INTEGER DEFAULT 1 CHECK(review_iteration >= 1),
+    no_progress_count INTEGER DEFAULT 0 CHECK(no_progress_count >= 0),
+    blocking_issues_count INTEGER DEFAULT 0 CHECK(blocking_issues_count >= 0),
+    speckit_task_ids TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, session_id),
+    FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
+) WITHOUT ROWID;
+-- v20: Serves get_task_groups(status=...) filter + ORDER BY created_at, and
+-- (covering, since WITHOUT ROWID index entries carry id) the workflow router's
+-- pending/in-progress group lookups. v25: replaces idx_taskgroups_session
+CREATE INDEX IF NOT EXISTS idx_taskgroups_session_status
+ON task_groups(session_id, status, created_at);
+
+-- Token usage tracking
+CREATE TABLE IF NOT EXISTS token_usage (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    agent_type TEXT NOT NULL,
+    agent_id TEXT,
+    tokens_estimated INTEGER NOT NULL,
+    FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
+);
+-- v21: Covering index - get_token_summary(by='agent_type') and its session
+-- total read SUM(tokens_estimated) from the index without touching the table
+-- (replaces v1's idx_tokens_session on (session_id, agent_type))
+CREATE INDEX IF NOT EXISTS idx_tokens_summary
+ON token_usage(session_id, agent_type, tokens_estimated);
+-- v20: Serves get_token_summary(by='agent_id') GROUP BY without a temp B-tree
+CREATE INDEX IF NOT EXISTS idx_tokens_session_agent_id
+ON token_usage(session_id, agent_id);
+
+-- Skill outputs table (replaces individual JSON files)
+-- v11: Added agent_type, group_id, iteration for multi-invocation support
+-- v12: Added UNIQUE constraint on iteration for race condition prevention
+CREATE TABLE IF NOT EXISTS skill_outputs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    skill_name TEXT NOT NULL,
+    output_data TEXT NOT NULL,
+    agent_type TEXT,
+    group_id TEXT,
+    iteration INTEGER DEFAULT 1,
+    FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_skill_session
+ON skill_outputs(session_id, skill_name, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_skill_agent_group
+ON skill_outputs(session_id, skill_name, agent_type, group_id, iteration);
+-- v12: UNIQUE index for race condition prevention
+CREATE UNIQUE INDEX IF NOT EXISTS idx_skill_unique_iteration
+ON skill_outputs(session_id, skill_name, agent_type, group_id, iteration);
+-- v12: DESC index for "latest" query optimization
+CREATE INDEX IF NOT EXISTS idx_skill_latest
+ON skill_outputs(session_id, skill_name, agent_type, group_id, iteration DESC);
+
+-- REMOVED: Configuration table - No use case defined
+-- See research/empty-tables-analysis.md for details
+-- Table creation commented out as of 2025-11-21
+
+-- REMOVED: Decisions table - Redundant with orchestration_logs
+-- See research/empty-tables-analysis.md for details
+-- Table creation commented out as of 2025-11-21
+
+-- Development plans table (for multi-phase orchestrations)
+CREATE TABLE IF NOT EXISTS development_plans (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT UNIQUE NOT NULL,
+    original_prompt TEXT NOT NULL,
+    plan_text TEXT NOT NULL,
+    phases TEXT NOT NULL,
+    current_phase INTEGER,
+    total_phases INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    metadata TEXT,
+    FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_devplans_session
+ON development_plans(session_id);
+
+-- Success criteria table (for BAZINGA validation)
+CREATE TABLE IF NOT EXISTS success_criteria (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    criterion TEXT NOT NULL,
+    status TEXT CHECK(status IN ('pending', 'met', 'blocked', 'failed')) DEFAULT 'pending',
+    actual TEXT,
+    evidence TEXT,
+    required_for_completion BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_unique_criterion
+ON success_criteria(session_id, criterion);
+CREATE INDEX IF NOT EXISTS idx_criteria_session_status
+ON success_criteria(session_id, status);
+
+-- Context packages table (for inter-agent communication)
+CREATE TABLE IF NOT EXISTS context_packages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    group_id TEXT,
+    package_type TEXT NOT NULL CHECK(package_type IN ('research', 'failures', 'decisions', 'handoff', 'investigation')),
+    file_path TEXT NOT NULL,
+    producer_agent TEXT NOT NULL,
+    priority TEXT NOT NULL DEFAULT 'medium' CHECK(priority IN ('low', 'medium', 'high', 'critical')),
+    summary TEXT NOT NULL,
+    size_bytes INTEGER,
+    version INTEGER DEFAULT 1,
+    supersedes_id INTEGER,
+    scope TEXT DEFAULT 'group' CHECK(scope IN ('group', 'global')),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE,
+    FOREIGN KEY (supersedes_id) REFERENCES context_packages(id)
+);
+CREATE INDEX IF NOT EXISTS idx_cp_session ON context_packages(session_id);
+CREATE INDEX IF NOT EXISTS idx_cp_group ON context_packages(group_id);
+CREATE INDEX IF NOT EXISTS idx_cp_type ON context_packages(package_type);
+CREATE INDEX IF NOT EXISTS idx_cp_priority ON context_packages(priority);
+CREATE INDEX IF NOT EXISTS idx_cp_scope ON context_packages(scope);
+CREATE INDEX IF NOT EXISTS idx_cp_created ON context_packages(created_at);
+-- Composite index for relevance ranking queries (per data-model.md)
+CREATE INDEX IF NOT EXISTS idx_packages_priority_ranking ON context_packages(session_id, priority, created_at DESC);
+
+-- Context package consumers join table (for per-agent consumption tracking)
+CREATE TABLE IF NOT EXISTS context_package_consumers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    package_id INTEGER NOT NULL,
+    agent_type TEXT NOT NULL,
+    consumed_at TIMESTAMP,
+    iteration INTEGER DEFAULT 1,
+    FOREIGN KEY (package_id) REFERENCES context_packages(id) ON DELETE CASCADE,
+    UNIQUE(package_id, agent_type, iteration)
+);
+CREATE INDEX IF NOT EXISTS idx_cpc_package ON context_package_consumers(package_id);
+CREATE INDEX IF NOT EXISTS idx_cpc_agent ON context_package_consumers(agent_type);
+-- Pending-consumption lookups (agent_type + package_id, consumed_at IS NULL);
+-- v26: keyed by agent_type, package_id instead of consumed_at
+CREATE INDEX IF NOT EXISTS idx_cpc_pending ON context_package_consumers(agent_type, package_id) WHERE consumed_at IS NULL;
+
+-- Error patterns table (for context engineering - learning from failed-then-succeeded agents)
+-- Uses composite primary key (pattern_hash, project_id) to allow same pattern across projects
+CREATE TABLE IF NOT EXISTS error_patterns (
+    pattern_hash TEXT NOT NULL,
+    project_id TEXT NOT NULL,
+    signature_json TEXT NOT NULL,
+    solution TEXT NOT NULL,
+    confidence REAL DEFAULT 0.5 CHECK(confidence >= 0.0 AND confidence <= 1.0),
+    occurrences INTEGER DEFAULT 1 CHECK(occurrences >= 1),
+    lang TEXT,
+    last_seen TEXT DEFAULT (datetime('now')),
+    created_at TEXT DEFAULT (datetime('now')),
+    ttl_days INTEGER DEFAULT 90 CHECK(ttl_days > 0),
+    PRIMARY KEY (pattern_hash, project_id)
+);
+CREATE INDEX IF NOT EXISTS idx_patterns_project ON error_patterns(project_id, lang);
+CREATE INDEX IF NOT EXISTS idx_patterns_ttl ON error_patterns(last_seen, ttl_days);
+
+-- Strategies table (for context engineering - successful approaches from completions)
+CREATE TABLE IF NOT EXISTS strategies (
+    strategy_id TEXT PRIMARY KEY,
+    project_id TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    insight TEXT NOT NULL,
+    helpfulness INTEGER DEFAULT 0 CHECK(helpfulness >= 0),
+    lang TEXT,
+    framework TEXT,
+    last_seen TEXT DEFAULT (datetime('now')),
+    created_at TEXT DEFAULT (datetime('now'))
+);
+CREATE INDEX IF NOT EXISTS idx_strategies_project ON strategies(project_id, framework);
+CREATE INDEX IF NOT EXISTS idx_strategies_topic ON strategies(topic);
+
+-- Consumption scope table (for context engineering - iteration-aware package tracking)
+CREATE TABLE IF NOT EXISTS consumption_scope (
+    scope_id TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    group_id TEXT NOT NULL,
+    agent_type TEXT NOT NULL CHECK(agent_type IN ('developer', 'qa_expert', 'tech_lead', 'senior_software_engineer', 'investigator')),
+    iteration INTEGER NOT NULL CHECK(iteration >= 0),
+    package_id INTEGER NOT NULL,
+    consumed_at TEXT DEFAULT (datetime('now')),
+    FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE,
+    FOREIGN KEY (package_id) REFERENCES context_packages(id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_consumption_session ON consumption_scope(session_id, group_id, agent_type);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_consumption_unique ON consumption_scope(session_id, group_id, agent_type, iteration, package_id);
+
+-- Workflow transitions table (seeded from workflow/transitions.json via bazinga/config symlink)
+CREATE TABLE IF NOT EXISTS workflow_transitions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    current_agent TEXT NOT NULL,
+    response_status TEXT NOT NULL,
+    next_agent TEXT,
+    action TEXT NOT NULL,
+    include_context TEXT,
+    escalation_check INTEGER DEFAULT 0,
+    model_override TEXT,
+    fallback_agent TEXT,
+    bypass_qa INTEGER DEFAULT 0,
+    max_parallel INTEGER,
+    then_action TEXT,
+    UNIQUE(current_agent, response_status)
+);
+CREATE INDEX IF NOT EXISTS idx_wt_agent ON workflow_transitions(current_agent);
+
+-- Agent markers table (seeded from workflow/agent-markers.json via bazinga/config symlink)
+CREATE TABLE IF NOT EXISTS agent_markers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    agent_type TEXT NOT NULL UNIQUE,
+    required_markers TEXT NOT NULL,
+    workflow_markers TEXT
+);
+
+-- Workflow special rules table (seeded from workflow/transitions.json _special_rules)
+CREATE TABLE IF NOT EXISTS workflow_special_rules (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    rule_name TEXT NOT NULL UNIQUE,
+    description TEXT,
+    config TEXT NOT NULL
+);
+"""
+
+
+def _split_schema_ddl(ddl: str) -> dict:
+    """Map each table/index name in ddl to its CREATE statement, in DDL order."""
+    statements = {}
+    buf = []
+    for line in ddl.splitlines():
+        if not buf and not line.startswith('CREATE '):
+            continue  # comments and blank lines between statements
+        buf.append(line)
+        stmt = '\n'.join(buf)
+        if sqlite3.complete_statement(stmt):
+            name = buf[0].split('IF NOT EXISTS', 1)[1].split()[0]
+            statements[name] = stmt
+            buf = []
+    return statements
+
+
+# CREATE statement per table and index (tables precede their indexes), so a
+# repair only re-runs the objects that are actually missing
+SCHEMA_STATEMENTS = _split_schema_ddl(SCHEMA_DDL)
+SCHEMA_OBJECTS = frozenset(SCHEMA_STATEMENTS)
+
+
 def init_database(db_path: str) -> None:
-    """Initialize the BAZINGA database with complete schema."""
+    """Initialize the BAZINGA database with complete schema.
 
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    Concurrent callers (parallel agents racing on first run) are serialized
+    on an exclusive lock file next to the database: the second one waits for
+    the first to finish, then reads the final schema version and skips the
+    migrations instead of re-running them against a half-built schema.
+    """
+    if db_path == ':memory:' or not HAS_FCNTL:
+        _init_database(db_path)
+        return
 
-    # Enable foreign keys
-    cursor.execute("PRAGMA foreign_keys = ON")
+    # Separate from BazingaDB's .migrate.lock, which is held around this call
+    with open(f"{db_path}.init.lock", 'a') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)  # Released on close/exit
+        _init_database(db_path)
 
-    # Enable WAL mode for better concurrency
-    cursor.execute("PRAGMA journal_mode = WAL")
 
-    # Create schema_version table first (if doesn't exist)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS schema_version (
+def _init_database(db_path: str) -> None:
+    """Create or migrate the schema (caller holds the init lock)."""
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    setup = [
+        # Migrations need the write lock for their whole step; wait out agents'
+        # writes inside SQLite (the sqlite3 default is 5s) rather than fail
+        "PRAGMA busy_timeout = 30000",
+        # Enable foreign keys
+        "PRAGMA foreign_keys = ON",
+    ]
+
+    if db_path != ':memory:':
+        # Enable WAL mode for better concurrency
+        setup.append("PRAGMA journal_mode = WAL")
+        # WAL + NORMAL: fsync at checkpoints, not every commit (still crash-safe)
+        setup.append(f"PRAGMA synchronous = {get_synchronous_mode()}")
+
+    setup += [
+        # Map the file for reads during migrations (table copies, integrity checks)
+        "PRAGMA mmap_size = 268435456",
+        # Same page cache (~64 MB) and in-memory temp B-trees as BazingaDB's
+        # connections, for the table copies and CREATE INDEX sorts in migrations
+        "PRAGMA cache_size = -64000",
+        "PRAGMA temp_store = MEMORY",
+        # Create schema_version table first (if doesn't exist)
+        """CREATE TABLE IF NOT EXISTS schema_version (
             version INTEGER PRIMARY KEY,
             applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             description TEXT
-        )
-    """)
+        )""",
+    ]
+    # Connection setup in one executescript() call (nothing is pending on a
+    # new connection)
+    conn.executescript(";\n".join(setup) + ";")
 
     # Get current schema version
     current_version = get_schema_version(cursor)
     print(f"Current schema version: {current_version}")
 
+    # Indexes are only created/rebuilt when the schema is new or upgraded
+    schema_changed = current_version < SCHEMA_VERSION
+
+    # A brand-new database needs none of the migration steps (and their
+    # per-step commits, integrity checks and checkpoints): SCHEMA_DDL below
+    # creates the current schema and records its version in one transaction
+    is_new_db = current_version == 0 and cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name != 'schema_version'"
+    ).fetchone() is None
+
     # Run migrations if needed
-    if current_version < SCHEMA_VERSION:
+    if is_new_db:
+        print(f"New database - creating schema v{SCHEMA_VERSION}")
+    elif current_version < SCHEMA_VERSION:
         print(f"Schema upgrade required: v{current_version} -> v{SCHEMA_VERSION}")
 
         if current_version == 0 or current_version == 1:
@@ -158,37 +636,32 @@ def init_database(db_path: str) -> None:
                 print("✓ Migration to v5 complete (fresh database, skipped)")
                 current_version = 5  # Skip to next migration, CREATE TABLE will handle it
             else:
+                # Read each table's columns once; only missing ones are ALTERed
+                session_cols = get_table_columns(cursor, 'sessions')
+                task_group_cols = get_table_columns(cursor, 'task_groups')
+
                 # 1. Add initial_branch to sessions
-                try:
+                if 'initial_branch' not in session_cols:
                     cursor.execute("ALTER TABLE sessions ADD COLUMN initial_branch TEXT DEFAULT 'main'")
                     print("   ✓ Added sessions.initial_branch")
-                except sqlite3.OperationalError as e:
-                    if "duplicate column" in str(e).lower():
-                        print("   ⊘ sessions.initial_branch already exists")
-                    else:
-                        raise
+                else:
+                    print("   ⊘ sessions.initial_branch already exists")
 
                 # 2. Add feature_branch to task_groups
-                try:
+                if 'feature_branch' not in task_group_cols:
                     cursor.execute("ALTER TABLE task_groups ADD COLUMN feature_branch TEXT")
                     print("   ✓ Added task_groups.feature_branch")
-                except sqlite3.OperationalError as e:
-                    if "duplicate column" in str(e).lower():
-                        print("   ⊘ task_groups.feature_branch already exists")
-                    else:
-                        raise
+                else:
+                    print("   ⊘ task_groups.feature_branch already exists")
 
                 # 3. Add merge_status to task_groups (without CHECK - SQLite limitation)
                 # NOTE: ALTER TABLE cannot add CHECK constraints in SQLite
                 # The CHECK constraint is applied in step 4 when we recreate the table
-                try:
+                if 'merge_status' not in task_group_cols:
                     cursor.execute("ALTER TABLE task_groups ADD COLUMN merge_status TEXT")
                     print("   ✓ Added task_groups.merge_status (CHECK constraint applied in step 4)")
-                except sqlite3.OperationalError as e:
-                    if "duplicate column" in str(e).lower():
-                        print("   ⊘ task_groups.merge_status already exists")
-                    else:
-                        raise
+                else:
+                    print("   ⊘ task_groups.merge_status already exists")
 
                 # 4. Recreate task_groups with expanded status enum AND proper CHECK constraints
                 # This step applies CHECK constraints that couldn't be added via ALTER TABLE
@@ -318,14 +791,11 @@ def init_database(db_path: str) -> None:
                 current_version = 6
             else:
                 # 1. Add context_references to task_groups
-                try:
+                if 'context_references' not in get_table_columns(cursor, 'task_groups'):
                     cursor.execute("ALTER TABLE task_groups ADD COLUMN context_references TEXT")
                     print("   ✓ Added task_groups.context_references")
-                except sqlite3.OperationalError as e:
-                    if "duplicate column" in str(e).lower():
-                        print("   ⊘ task_groups.context_references already exists")
-                    else:
-                        raise
+                else:
+                    print("   ⊘ task_groups.context_references already exists")
 
                 # 2. Create context_packages table (will be created below with IF NOT EXISTS)
                 # 3. Create context_package_consumers table (will be created below with IF NOT EXISTS)
@@ -1637,11 +2107,168 @@ def init_database(db_path: str) -> None:
                 current_version = 19
                 print("✓ Migration to v19 complete (SpecKit task ID tracking)")
 
-        # Record version upgrade
+        # v19 → v20: Composite indexes matched to the hot read predicates
+        if current_version == 19:
+            print("\n--- Migrating v19 → v20 (query-matched composite indexes) ---")
+            # No data migration needed - indexes are created below with CREATE INDEX IF NOT EXISTS
+            # (get_logs by agent, get_task_groups by status, get_token_summary group-by)
+            print("✓ Migration to v20 complete (query-matched composite indexes)")
+            current_version = 20
+
+        # v20 → v21: Covering index for get_token_summary
+        if current_version == 20:
+            print("\n--- Migrating v20 → v21 (covering token summary index) ---")
+            # idx_tokens_summary (created below) extends idx_tokens_session with
+            # tokens_estimated; the old index is a strict prefix, so drop it rather
+            # than pay for both on every log_tokens insert
+            cursor.execute("DROP INDEX IF EXISTS idx_tokens_session")
+            print("   ✓ Dropped idx_tokens_session (superseded by idx_tokens_summary)")
+            print("✓ Migration to v21 complete (covering token summary index)")
+            current_version = 21
+
+        # v21 → v22: Cluster task_groups on its composite primary key
+        if current_version == 21:
+            print("\n--- Migrating v21 → v22 (task_groups WITHOUT ROWID) ---")
+
+            cursor.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='task_groups'")
+            row = cursor.fetchone()
+
+            if row is None:
+                print("   ⊘ task_groups table doesn't exist yet - will be created with full schema below")
+            elif 'WITHOUT ROWID' in row[0].upper():
+                print("   ⊘ task_groups is already a WITHOUT ROWID table")
+            else:
+                # Table recreation must be atomic (see v4→v5)
+                conn.commit()
+                try:
+                    cursor.execute("BEGIN IMMEDIATE")
+
+                    cursor.execute("""
+                        CREATE TABLE task_groups_new (
+                            id TEXT NOT NULL,
+                            session_id TEXT NOT NULL,
+                            name TEXT NOT NULL,
+                            status TEXT CHECK(status IN (
+                                'pending', 'in_progress', 'completed', 'failed',
+                                'approved_pending_merge', 'merging'
+                            )) DEFAULT 'pending',
+                            assigned_to TEXT,
+                            revision_count INTEGER DEFAULT 0,
+                            last_review_status TEXT CHECK(last_review_status IN ('APPROVED', 'CHANGES_REQUESTED', NULL)),
+                            feature_branch TEXT,
+                            merge_status TEXT CHECK(merge_status IN ('pending', 'in_progress', 'merged', 'conflict', 'test_failure', NULL)),
+                            complexity INTEGER CHECK(complexity BETWEEN 1 AND 10),
+                            initial_tier TEXT CHECK(initial_tier IN ('Developer', 'Senior Software Engineer')) DEFAULT 'Developer',
+                            context_references TEXT,
+                            specializations TEXT,
+                            item_count INTEGER DEFAULT 1,
+                            security_sensitive INTEGER DEFAULT 0,
+                            qa_attempts INTEGER DEFAULT 0,
+                            tl_review_attempts INTEGER DEFAULT 0,
+                            component_path TEXT,
+                            review_iteration INTEGER DEFAULT 1 CHECK(review_iteration >= 1),
+                            no_progress_count INTEGER DEFAULT 0 CHECK(no_progress_count >= 0),
+                            blocking_issues_count INTEGER DEFAULT 0 CHECK(blocking_issues_count >= 0),
+                            speckit_task_ids TEXT,
+                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                            PRIMARY KEY (id, session_id),
+                            FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
+                        ) WITHOUT ROWID
+                    """)
+
+                    # Copy every column the old table has (all of them at v21)
+                    cursor.execute("PRAGMA table_info(task_groups)")
+                    cols_str = ', '.join(r[1] for r in cursor.fetchall())
+                    cursor.execute(f"""
+                        INSERT INTO task_groups_new ({cols_str})
+                        SELECT {cols_str} FROM task_groups
+                    """)
+                    copied = cursor.rowcount
+
+                    cursor.execute("DROP TABLE task_groups")
+                    cursor.execute("ALTER TABLE task_groups_new RENAME TO task_groups")
+                    # idx_taskgroups_session is not recreated: v25 drops it
+                    cursor.execute("""
+                        CREATE INDEX IF NOT EXISTS idx_taskgroups_session_status
+                        ON task_groups(session_id, status, created_at)
+                    """)
+
+                    integrity = cursor.execute("PRAGMA integrity_check;").fetchone()[0]
+                    if integrity != "ok":
+                        raise sqlite3.IntegrityError(f"Migration v21→v22: Integrity check failed: {integrity}")
+
+                    conn.commit()
+                    print(f"   ✓ Recreated task_groups as WITHOUT ROWID ({copied} rows)")
+
+                    try:
+                        cursor.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+                    except Exception:
+                        pass  # WAL checkpoint is optional
+                    cursor.execute("ANALYZE task_groups;")
+
+                except Exception as e:
+                    try:
+                        conn.rollback()
+                    except Exception:
+                        pass
+                    print(f"   ✗ v21→v22 migration failed, rolled back: {e}")
+                    raise
+
+            print("✓ Migration to v22 complete (task_groups WITHOUT ROWID)")
+            current_version = 22
+
+        # v22 → v23: Fold idx_logs_agent_type into idx_logs_session_agent_ts
+        if current_version == 22:
+            print("\n--- Migrating v22 → v23 (agent log index with timestamp) ---")
+            # idx_logs_session_agent_ts (session_id, agent_type, timestamp DESC)
+            # answers every (session_id, agent_type) lookup the old index did and
+            # also satisfies ORDER BY timestamp, so keeping both only slows inserts
+            cursor.execute("DROP INDEX IF EXISTS idx_logs_agent_type")
+            print("   ✓ Dropped idx_logs_agent_type (superseded by idx_logs_session_agent_ts)")
+            print("✓ Migration to v23 complete (agent log index with timestamp)")
+            current_version = 23
+
+        # v23 → v24: Mirror the schema version into PRAGMA user_version
+        if current_version == 23:
+            print("\n--- Migrating v23 → v24 (schema version in PRAGMA user_version) ---")
+            # No data migration needed - user_version is stamped with the version
+            # row below. schema_version stays: it keeps the upgrade history and
+            # the dashboard reads it for capability detection
+            print("✓ Migration to v24 complete (schema version in PRAGMA user_version)")
+            current_version = 24
+
+        # v24 → v25: Drop idx_taskgroups_session (prefix of idx_taskgroups_session_status)
+        if current_version == 24:
+            print("\n--- Migrating v24 → v25 (single task_groups status index) ---")
+            # Active-group lookups (session_id = ? AND status = 'pending') seek
+            # straight to their entries in idx_taskgroups_session_status, so
+            # completed groups are never visited and a partial index would not
+            # be smaller in any way that matters; the narrower copy only costs writes
+            cursor.execute("DROP INDEX IF EXISTS idx_taskgroups_session")
+            print("   ✓ Dropped idx_taskgroups_session (superseded by idx_taskgroups_session_status)")
+            print("✓ Migration to v25 complete (single task_groups status index)")
+            current_version = 25
+
+        # v25 → v26: Key idx_cpc_pending by (agent_type, package_id)
+        if current_version == 25:
+            print("\n--- Migrating v25 → v26 (pending consumer index) ---")
+            # The old partial index was keyed by consumed_at, which is always
+            # NULL inside it, so it could not seek to an agent's pending rows.
+            # Recreated with the new columns by SCHEMA_DDL below
+            cursor.execute("DROP INDEX IF EXISTS idx_cpc_pending")
+            print("   ✓ Dropped idx_cpc_pending (recreated on agent_type, package_id)")
+            print("✓ Migration to v26 complete (pending consumer index)")
+            current_version = 26
+
+        # Record version upgrade (DO NOTHING keeps the first applied_at if this
+        # version was already recorded, where REPLACE would delete and rewrite it)
         cursor.execute("""
-            INSERT OR REPLACE INTO schema_version (version, description)
+            INSERT INTO schema_version (version, description)
             VALUES (?, ?)
-        """, (SCHEMA_VERSION, f"Schema v{SCHEMA_VERSION}: SpecKit task ID tracking"))
+            ON CONFLICT(version) DO NOTHING
+        """, (SCHEMA_VERSION, f"Schema v{SCHEMA_VERSION}: Pending consumer index by agent"))
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         conn.commit()
         print(f"✓ Schema upgraded to v{SCHEMA_VERSION}")
     elif current_version == SCHEMA_VERSION:
@@ -1649,424 +2276,37 @@ def init_database(db_path: str) -> None:
 
     print("\nCreating/verifying BAZINGA database schema...")
 
-    # Sessions table
-    # Extended in v9 to support metadata (JSON) for original_scope tracking
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS sessions (
-            session_id TEXT PRIMARY KEY,
-            start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            end_time TIMESTAMP,
-            mode TEXT CHECK(mode IN ('simple', 'parallel')),
-            original_requirements TEXT,
-            status TEXT CHECK(status IN ('active', 'completed', 'failed')) DEFAULT 'active',
-            initial_branch TEXT DEFAULT 'main',
-            metadata TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    print("✓ Created sessions table")
-
-    # Orchestration logs table (replaces orchestration-log.md)
-    # Extended in v8 to support agent reasoning capture
-    # Extended in v9 to support event logging (pm_bazinga, scope_change, validator_verdict)
-    # Extended in v17 to support idempotency_key for event deduplication
-    # CHECK constraints enforce valid enumeration values at database layer
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS orchestration_logs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            session_id TEXT NOT NULL,
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            iteration INTEGER,
-            agent_type TEXT NOT NULL,
-            agent_id TEXT,
-            content TEXT NOT NULL,
-            log_type TEXT DEFAULT 'interaction'
-                CHECK(log_type IN ('interaction', 'reasoning', 'event')),
-            reasoning_phase TEXT
-                CHECK(reasoning_phase IS NULL OR reasoning_phase IN (
-                    'understanding', 'approach', 'decisions', 'risks',
-                    'blockers', 'pivot', 'completion'
-                )),
-            confidence_level TEXT
-                CHECK(confidence_level IS NULL OR confidence_level IN ('high', 'medium', 'low')),
-            references_json TEXT,
-            redacted INTEGER DEFAULT 0 CHECK(redacted IN (0, 1)),
-            group_id TEXT,
-            event_subtype TEXT,
-            event_payload TEXT,
-            idempotency_key TEXT,
-            FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
+    # At the current version the DDL replay is only a repair step (e.g. after
+    # an import dropped indexes); skip parsing it when one sqlite_master read
+    # shows nothing is missing
+    missing = SCHEMA_OBJECTS - {
+        row[0] for row in cursor.execute("SELECT name FROM sqlite_master")
+    }
+    if schema_changed:
+        _create_schema(conn, is_new_db)
+    elif missing:
+        conn.executescript(
+            "BEGIN IMMEDIATE;\n"
+            + "\n".join(stmt for name, stmt in SCHEMA_STATEMENTS.items()
+                        if name in missing)
+            + "\nCOMMIT;"
         )
-    """)
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_logs_session
-        ON orchestration_logs(session_id, timestamp DESC)
-    """)
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_logs_agent_type
-        ON orchestration_logs(session_id, agent_type)
-    """)
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_logs_reasoning
-        ON orchestration_logs(session_id, log_type, reasoning_phase)
-        WHERE log_type = 'reasoning'
-    """)
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_logs_group_reasoning
-        ON orchestration_logs(session_id, group_id, log_type)
-        WHERE log_type = 'reasoning'
-    """)
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_logs_events
-        ON orchestration_logs(session_id, log_type, event_subtype)
-        WHERE log_type = 'event'
-    """)
-    # v18: Updated to include group_id for cross-group isolation
-    cursor.execute("""
-        CREATE UNIQUE INDEX IF NOT EXISTS idx_logs_idempotency
-        ON orchestration_logs(session_id, event_subtype, group_id, idempotency_key)
-        WHERE idempotency_key IS NOT NULL AND log_type = 'event'
-    """)
-    print("✓ Created orchestration_logs table with indexes")
-
-    # State snapshots table (replaces JSON state files)
-    # Extended in v18 to support group_id for investigation state isolation
-    # Extended in v18 to support 'investigation' state_type
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS state_snapshots (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            session_id TEXT NOT NULL,
-            group_id TEXT NOT NULL DEFAULT 'global',
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            state_type TEXT CHECK(state_type IN ('pm', 'orchestrator', 'group_status', 'investigation')),
-            state_data TEXT NOT NULL,
-            FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
-        )
-    """)
-    # UNIQUE index for upsert support (allows ON CONFLICT)
-    cursor.execute("""
-        CREATE UNIQUE INDEX IF NOT EXISTS idx_state_unique
-        ON state_snapshots(session_id, state_type, group_id)
-    """)
-    # Performance index for queries
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_state_session_type_group
-        ON state_snapshots(session_id, state_type, group_id, timestamp DESC)
-    """)
-    print("✓ Created state_snapshots table with indexes")
-
-    # Task groups table (normalized from pm_state.json)
-    # PRIMARY KEY: Composite (id, session_id) allows same group ID across sessions
-    # Extended in v9 to support item_count for progress tracking
-    # Extended in v14 to support security_sensitive, qa_attempts, tl_review_attempts
-    # Extended in v15 to support component_path for version-specific prompt building
-    # Extended in v16 to support review_iteration, no_progress_count, blocking_issues_count
-    # Extended in v19 to support speckit_task_ids for SpecKit pre-planned task tracking
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS task_groups (
-            id TEXT NOT NULL,
-            session_id TEXT NOT NULL,
-            name TEXT NOT NULL,
-            status TEXT CHECK(status IN (
-                'pending', 'in_progress', 'completed', 'failed',
-                'approved_pending_merge', 'merging'
-            )) DEFAULT 'pending',
-            assigned_to TEXT,
-            revision_count INTEGER DEFAULT 0,
-            last_review_status TEXT CHECK(last_review_status IN ('APPROVED', 'CHANGES_REQUESTED', NULL)),
-            feature_branch TEXT,
-            merge_status TEXT CHECK(merge_status IN ('pending', 'in_progress', 'merged', 'conflict', 'test_failure', NULL)),
-            complexity INTEGER CHECK(complexity BETWEEN 1 AND 10),
-            initial_tier TEXT CHECK(initial_tier IN ('Developer', 'Senior Software Engineer')) DEFAULT 'Developer',
-            context_references TEXT,
-            specializations TEXT,
-            item_count INTEGER DEFAULT 1,
-            security_sensitive INTEGER DEFAULT 0,
-            qa_attempts INTEGER DEFAULT 0,
-            tl_review_attempts INTEGER DEFAULT 0,
-            component_path TEXT,
-            review_iteration INTEGER DEFAULT 1 CHECK(review_iteration >= 1),
-            no_progress_count INTEGER DEFAULT 0 CHECK(no_progress_count >= 0),
-            blocking_issues_count INTEGER DEFAULT 0 CHECK(blocking_issues_count >= 0),
-            speckit_task_ids TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            PRIMARY KEY (id, session_id),
-            FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
-        )
-    """)
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_taskgroups_session
-        ON task_groups(session_id, status)
-    """)
-    print("✓ Created task_groups table with indexes")
-
-    # Token usage tracking
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS token_usage (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            session_id TEXT NOT NULL,
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            agent_type TEXT NOT NULL,
-            agent_id TEXT,
-            tokens_estimated INTEGER NOT NULL,
-            FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
-        )
-    """)
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_tokens_session
-        ON token_usage(session_id, agent_type)
-    """)
-    print("✓ Created token_usage table with indexes")
-
-    # Skill outputs table (replaces individual JSON files)
-    # v11: Added agent_type, group_id, iteration for multi-invocation support
-    # v12: Added UNIQUE constraint on iteration for race condition prevention
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS skill_outputs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            session_id TEXT NOT NULL,
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            skill_name TEXT NOT NULL,
-            output_data TEXT NOT NULL,
-            agent_type TEXT,
-            group_id TEXT,
-            iteration INTEGER DEFAULT 1,
-            FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
-        )
-    """)
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_skill_session
-        ON skill_outputs(session_id, skill_name, timestamp DESC)
-    """)
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_skill_agent_group
-        ON skill_outputs(session_id, skill_name, agent_type, group_id, iteration)
-    """)
-    # v12: UNIQUE index for race condition prevention
-    cursor.execute("""
-        CREATE UNIQUE INDEX IF NOT EXISTS idx_skill_unique_iteration
-        ON skill_outputs(session_id, skill_name, agent_type, group_id, iteration)
-    """)
-    # v12: DESC index for "latest" query optimization
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_skill_latest
-        ON skill_outputs(session_id, skill_name, agent_type, group_id, iteration DESC)
-    """)
-    print("✓ Created skill_outputs table with indexes")
-
-    # REMOVED: Configuration table - No use case defined
-    # See research/empty-tables-analysis.md for details
-    # Table creation commented out as of 2025-11-21
-
-    # REMOVED: Decisions table - Redundant with orchestration_logs
-    # See research/empty-tables-analysis.md for details
-    # Table creation commented out as of 2025-11-21
-
-    # Development plans table (for multi-phase orchestrations)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS development_plans (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            session_id TEXT UNIQUE NOT NULL,
-            original_prompt TEXT NOT NULL,
-            plan_text TEXT NOT NULL,
-            phases TEXT NOT NULL,
-            current_phase INTEGER,
-            total_phases INTEGER NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            metadata TEXT,
-            FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
-        )
-    """)
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_devplans_session
-        ON development_plans(session_id)
-    """)
-    print("✓ Created development_plans table with indexes")
-
-    # Success criteria table (for BAZINGA validation)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS success_criteria (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            session_id TEXT NOT NULL,
-            criterion TEXT NOT NULL,
-            status TEXT CHECK(status IN ('pending', 'met', 'blocked', 'failed')) DEFAULT 'pending',
-            actual TEXT,
-            evidence TEXT,
-            required_for_completion BOOLEAN DEFAULT 1,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
-        )
-    """)
-    cursor.execute("""
-        CREATE UNIQUE INDEX IF NOT EXISTS idx_unique_criterion
-        ON success_criteria(session_id, criterion)
-    """)
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_criteria_session_status
-        ON success_criteria(session_id, status)
-    """)
-    print("✓ Created success_criteria table with indexes")
-
-    # Context packages table (for inter-agent communication)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS context_packages (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            session_id TEXT NOT NULL,
-            group_id TEXT,
-            package_type TEXT NOT NULL CHECK(package_type IN ('research', 'failures', 'decisions', 'handoff', 'investigation')),
-            file_path TEXT NOT NULL,
-            producer_agent TEXT NOT NULL,
-            priority TEXT NOT NULL DEFAULT 'medium' CHECK(priority IN ('low', 'medium', 'high', 'critical')),
-            summary TEXT NOT NULL,
-            size_bytes INTEGER,
-            version INTEGER DEFAULT 1,
-            supersedes_id INTEGER,
-            scope TEXT DEFAULT 'group' CHECK(scope IN ('group', 'global')),
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE,
-            FOREIGN KEY (supersedes_id) REFERENCES context_packages(id)
-        )
-    """)
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cp_session ON context_packages(session_id)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cp_group ON context_packages(group_id)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cp_type ON context_packages(package_type)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cp_priority ON context_packages(priority)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cp_scope ON context_packages(scope)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cp_created ON context_packages(created_at)")
-    # Composite index for relevance ranking queries (per data-model.md)
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_packages_priority_ranking ON context_packages(session_id, priority, created_at DESC)")
-    print("✓ Created context_packages table with indexes")
-
-    # Context package consumers join table (for per-agent consumption tracking)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS context_package_consumers (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            package_id INTEGER NOT NULL,
-            agent_type TEXT NOT NULL,
-            consumed_at TIMESTAMP,
-            iteration INTEGER DEFAULT 1,
-            FOREIGN KEY (package_id) REFERENCES context_packages(id) ON DELETE CASCADE,
-            UNIQUE(package_id, agent_type, iteration)
-        )
-    """)
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cpc_package ON context_package_consumers(package_id)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cpc_agent ON context_package_consumers(agent_type)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cpc_pending ON context_package_consumers(consumed_at) WHERE consumed_at IS NULL")
-    print("✓ Created context_package_consumers table with indexes")
-
-    # Error patterns table (for context engineering - learning from failed-then-succeeded agents)
-    # Uses composite primary key (pattern_hash, project_id) to allow same pattern across projects
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS error_patterns (
-            pattern_hash TEXT NOT NULL,
-            project_id TEXT NOT NULL,
-            signature_json TEXT NOT NULL,
-            solution TEXT NOT NULL,
-            confidence REAL DEFAULT 0.5 CHECK(confidence >= 0.0 AND confidence <= 1.0),
-            occurrences INTEGER DEFAULT 1 CHECK(occurrences >= 1),
-            lang TEXT,
-            last_seen TEXT DEFAULT (datetime('now')),
-            created_at TEXT DEFAULT (datetime('now')),
-            ttl_days INTEGER DEFAULT 90 CHECK(ttl_days > 0),
-            PRIMARY KEY (pattern_hash, project_id)
-        )
-    """)
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_patterns_project ON error_patterns(project_id, lang)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_patterns_ttl ON error_patterns(last_seen, ttl_days)")
-    print("✓ Created error_patterns table with indexes")
-
-    # Strategies table (for context engineering - successful approaches from completions)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS strategies (
-            strategy_id TEXT PRIMARY KEY,
-            project_id TEXT NOT NULL,
-            topic TEXT NOT NULL,
-            insight TEXT NOT NULL,
-            helpfulness INTEGER DEFAULT 0 CHECK(helpfulness >= 0),
-            lang TEXT,
-            framework TEXT,
-            last_seen TEXT DEFAULT (datetime('now')),
-            created_at TEXT DEFAULT (datetime('now'))
-        )
-    """)
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_strategies_project ON strategies(project_id, framework)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_strategies_topic ON strategies(topic)")
-    print("✓ Created strategies table with indexes")
-
-    # Consumption scope table (for context engineering - iteration-aware package tracking)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS consumption_scope (
-            scope_id TEXT PRIMARY KEY,
-            session_id TEXT NOT NULL,
-            group_id TEXT NOT NULL,
-            agent_type TEXT NOT NULL CHECK(agent_type IN ('developer', 'qa_expert', 'tech_lead', 'senior_software_engineer', 'investigator')),
-            iteration INTEGER NOT NULL CHECK(iteration >= 0),
-            package_id INTEGER NOT NULL,
-            consumed_at TEXT DEFAULT (datetime('now')),
-            FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE,
-            FOREIGN KEY (package_id) REFERENCES context_packages(id) ON DELETE CASCADE
-        )
-    """)
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_consumption_session ON consumption_scope(session_id, group_id, agent_type)")
-    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_consumption_unique ON consumption_scope(session_id, group_id, agent_type, iteration, package_id)")
-    print("✓ Created consumption_scope table with indexes")
-
-    # Workflow transitions table (seeded from workflow/transitions.json via bazinga/config symlink)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS workflow_transitions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            current_agent TEXT NOT NULL,
-            response_status TEXT NOT NULL,
-            next_agent TEXT,
-            action TEXT NOT NULL,
-            include_context TEXT,
-            escalation_check INTEGER DEFAULT 0,
-            model_override TEXT,
-            fallback_agent TEXT,
-            bypass_qa INTEGER DEFAULT 0,
-            max_parallel INTEGER,
-            then_action TEXT,
-            UNIQUE(current_agent, response_status)
-        )
-    """)
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_wt_agent ON workflow_transitions(current_agent)")
-    print("✓ Created workflow_transitions table with indexes")
-
-    # Agent markers table (seeded from workflow/agent-markers.json via bazinga/config symlink)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS agent_markers (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            agent_type TEXT NOT NULL UNIQUE,
-            required_markers TEXT NOT NULL,
-            workflow_markers TEXT
-        )
-    """)
-    print("✓ Created agent_markers table")
-
-    # Workflow special rules table (seeded from workflow/transitions.json _special_rules)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS workflow_special_rules (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            rule_name TEXT NOT NULL UNIQUE,
-            description TEXT,
-            config TEXT NOT NULL
-        )
-    """)
-    print("✓ Created workflow_special_rules table")
+        print(f"✓ Recreated {len(missing)} missing tables/indexes: "
+              f"{', '.join(sorted(missing))}")
+    else:
+        print(f"✓ All {len(SCHEMA_OBJECTS)} tables and indexes present")
 
-    # Record schema version for new databases
-    current_version = get_schema_version(cursor)
-    if current_version == 0:
-        cursor.execute("""
-            INSERT INTO schema_version (version, description)
-            VALUES (?, ?)
-        """, (SCHEMA_VERSION, f"Initial schema v{SCHEMA_VERSION}"))
-        print(f"✓ Recorded schema version: v{SCHEMA_VERSION}")
+    if schema_changed:
+        # Planner statistics for the new/migrated indexes. Cheap: empty tables
+        # get no sqlite_stat1 rows, and migrated data is only scanned once here
+        cursor.execute("ANALYZE")
+        print("✓ Refreshed query planner statistics")
+    else:
+        # Up-to-date schema (every session start re-runs init): let SQLite
+        # decide whether any table's stats are missing or stale instead of
+        # re-scanning the whole database
+        cursor.execute("PRAGMA optimize")
 
-    conn.commit()
     conn.close()
 
     print(f"\n✅ Database initialized successfully at: {db_path}")
@@ -2076,6 +2316,53 @@ def init_database(db_path: str) -> None:
     print(f"   - All indexes created for optimal query performance")
 
 
+def seed_workflow_configs(db_path: str) -> bool:
+    """Seed workflow configs (transitions, markers, rules) into the database.
+
+    Loads config-seeder's seed_configs.py as a module and runs its seeders
+    in-process, so callers such as bazinga_db.py can initialize a database
+    without spawning another interpreter.
+
+    Returns:
+        True if seeding committed, False if the seeder is missing or failed.
+        Failures are non-fatal: the database is still usable without configs.
+    """
+    seed_script = _script_dir.parent.parent / "config-seeder" / "scripts" / "seed_configs.py"
+    if not seed_script.exists():
+        print(f"⚠️  Config seeder not found at {seed_script}", file=sys.stderr)
+        return False
+
+    print("\n📦 Seeding workflow configurations...")
+    conn = None
+    try:
+        import importlib.util
+        spec = importlib.util.spec_from_file_location("seed_configs", seed_script)
+        seeder = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(seeder)
+
+        conn = sqlite3.connect(db_path, timeout=5.0)
+        # Single transaction, same as seed_configs.py --all
+        conn.execute("BEGIN IMMEDIATE")
+        success = seeder.seed_transitions(conn)
+        success = seeder.seed_markers(conn) and success
+        success = seeder.seed_special_rules(conn) and success
+        if not success:
+            conn.rollback()
+            print("⚠️  Config seeding had errors - rolled back", file=sys.stderr)
+            return False
+        conn.commit()
+        print("✅ Config seeding complete")
+        return True
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        print(f"⚠️  Config seeding failed: {e}", file=sys.stderr)
+        # Don't raise - database is still usable, just without seeded configs
+        return False
+    finally:
+        if conn:
+            conn.close()
+
 def main():
     # Determine database path
     if len(sys.argv) >= 2:
@@ -2103,24 +2390,7 @@ def main():
 
     # Auto-seed workflow configs from JSON files
     # This ensures workflow_transitions table is populated after DB creation
-    seed_script = _script_dir.parent.parent / "config-seeder" / "scripts" / "seed_configs.py"
-    if seed_script.exists():
-        print("\n📦 Seeding workflow configurations...")
-        result = subprocess.run(
-            [sys.executable, str(seed_script), "--db", db_path, "--all"],
-            capture_output=True,
-            text=True
-        )
-        if result.returncode == 0:
-            # Print seed_configs output (already has ✅ prefix)
-            if result.stdout.strip():
-                print(result.stdout.strip())
-        else:
-            print(f"⚠️  Config seeding failed: {result.stderr.strip()}", file=sys.stderr)
-            # Don't exit - database is still usable, just without seeded configs
-    else:
-        print(f"⚠️  Config seeder not found at {seed_script}", file=sys.stderr)
-
+    seed_workflow_configs(db_path)
 
 if __name__ == "__main__":
     main()
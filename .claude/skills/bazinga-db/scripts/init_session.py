@@ -15,6 +15,9 @@ BEFORE spawning PM. It's idempotent - safe to run multiple times.
 """
 
 import argparse
+import contextlib
+import importlib.util
+import io
 import json
 import sqlite3
 import subprocess
@@ -54,20 +57,26 @@ def ensure_database(db_path: Path) -> bool:
         print(f"ERROR: init_db.py not found at {init_script}", file=sys.stderr)
         return False
 
-    # Run init_db.py - it's idempotent (handles migrations, won't re-create tables)
-    result = subprocess.run(
-        [sys.executable, str(init_script), str(db_path)],
-        capture_output=True,
-        text=True
-    )
-
-    if result.returncode != 0:
+    # Run init_db in-process (no second interpreter) - it's idempotent
+    # (handles migrations, won't re-create tables). Its progress output is
+    # captured so stdout stays reserved for the session ID.
+    output = io.StringIO()
+    try:
+        spec = importlib.util.spec_from_file_location("init_db", init_script)
+        init_db = importlib.util.module_from_spec(spec)
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            spec.loader.exec_module(init_db)
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            init_db.init_database(str(db_path))
+            init_db.seed_workflow_configs(str(db_path))
+    except (Exception, SystemExit) as e:
         print(f"ERROR: Database initialization failed:", file=sys.stderr)
-        print(result.stderr, file=sys.stderr)
+        print(output.getvalue(), file=sys.stderr)
+        print(e, file=sys.stderr)
         return False
 
     # Check if any output indicates success
-    if "already initialized" in result.stdout.lower() or "initialized" in result.stdout.lower():
+    if "already initialized" in output.getvalue().lower() or "initialized" in output.getvalue().lower():
         print("✓ Database ready", file=sys.stderr)
     else:
         print("✓ Database initialized", file=sys.stderr)
@@ -91,7 +91,7 @@ def load_profile():
 PROFILE = load_profile()
 
 try:
-    from similarity import calculate_similarity, extract_keywords
+    from similarity import extract_keywords, keyword_coverage
     from patterns import detect_patterns, find_utilities, extract_conventions
 except ImportError as e:
     # Graceful degradation if modules can't be imported
@@ -182,7 +182,7 @@ def find_similar_features(task_description: str, code_files: List[str], top_n: i
                 content = f.read()
 
             # Calculate similarity
-            similarity_score = calculate_similarity(task_description, content)
+            similarity_score = keyword_coverage(keywords, content.lower())
 
             if similarity_score > 0.1:  # Threshold for relevance
                 # Extract key functions/classes
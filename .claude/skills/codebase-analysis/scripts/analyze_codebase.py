@@ -36,6 +36,10 @@ class CodebaseAnalyzer:
         self.timeout = timeout
         # Global cache for cross-session sharing (project_patterns cached 1h, utilities per-session via key)
         self.cache = CacheManager("bazinga/.analysis_cache") if cache_enabled else None
+        if self.cache:
+            # Per-session utilities and per-task similarity scores get a new
+            # entry each time; drop those older than a week so the cache stays bounded
+            self.cache.clear_old_cache()
         self.pattern_detector = PatternDetector()
         self.similarity_finder = SimilarityFinder()
         self.gitignore_patterns = self._load_gitignore()
@@ -80,10 +84,12 @@ class CodebaseAnalyzer:
                     self.cache.set(utilities_cache_key, results["utilities"])
                 results["cache_misses"] += 1
 
-            # Find similar features (NOT cacheable - task specific)
+            # Find similar features (task specific; per-file scores are cached
+            # and reused for files unchanged since a run with the same keywords)
             results["similar_features"] = self.similarity_finder.find_similar(
                 self.task,
-                gitignore_patterns=self.gitignore_patterns
+                gitignore_patterns=self.gitignore_patterns,
+                cache=self.cache
             )
             results["cache_misses"] += 1
 
@@ -172,20 +178,25 @@ class CodebaseAnalyzer:
         file_count = 0
 
         for root, dirs, files in os.walk(dir_path):
-            # Filter out ignored directories
-            dirs[:] = [d for d in dirs if not self._should_ignore(os.path.join(root, d))]
+            # Stop descending once the file budget is spent
+            if file_count >= max_files:
+                break
+
+            # Filter out ignored directories (dir_path and root were already
+            # checked, so only the new name needs matching)
+            dirs[:] = [d for d in dirs if not self._should_ignore(d)]
 
             for file in files:
                 if file_count >= max_files:
                     break
 
                 if file.endswith(('.py', '.js', '.ts', '.go', '.java', '.md')):
-                    file_path = os.path.join(root, file)
-
-                    # Skip if path should be ignored
-                    if self._should_ignore(file_path):
+                    # Skip if the file name should be ignored
+                    if self._should_ignore(file):
                         continue
 
+                    file_path = os.path.join(root, file)
+
                     file_count += 1
 
                     # For .md files (like SKILL.md), extract skill info
@@ -231,8 +242,10 @@ class CodebaseAnalyzer:
         functions = []
         try:
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
-                for line in lines:
+                # Read lazily: only the first 15 names are kept, so stop there
+                for line in f:
+                    if len(functions) >= 15:
+                        break
                     # Python functions
                     if line.strip().startswith('def ') and '(' in line:
                         func_name = line.strip().split('def ')[1].split('(')[0]
@@ -332,13 +345,13 @@ class CodebaseAnalyzer:
         # Based on utilities
         if results.get("utilities"):
             # Find relevant utilities based on task keywords
-            task_words = self.task.lower().split()
+            task_words = [word for word in self.task.lower().split() if len(word) > 3]
             relevant_utils = []
             for util in results["utilities"]:
                 util_name_lower = util["name"].lower()
-                if any(word in util_name_lower for word in task_words if len(word) > 3):
+                if any(word in util_name_lower for word in task_words):
                     relevant_utils.append(util)
-                elif any(word in util.get("purpose", "").lower() for word in task_words if len(word) > 3):
+                elif any(word in util.get("purpose", "").lower() for word in task_words):
                     relevant_utils.append(util)
             
             if relevant_utils:
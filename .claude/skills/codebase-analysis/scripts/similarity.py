@@ -1,114 +1,228 @@
 #!/usr/bin/env python3
 """Find similar code to a given task."""
 
+import heapq
 import os
 import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
 from difflib import SequenceMatcher
 
+# Compiled once at import; used per file (and per line in extract_patterns)
+_WORD_RE = re.compile(r'\b[a-zA-Z]+\b')
+_SERVICE_CLASS_RE = re.compile(r'^class\s+\w+Service')
+_REPOSITORY_CLASS_RE = re.compile(r'^class\s+\w+Repository')
+_FACTORY_CLASS_RE = re.compile(r'^class\s+\w+Factory')
+_CONTROLLER_CLASS_RE = re.compile(r'^class\s+\w+Controller')
+
+# Checked for every file in the walk; str.endswith takes the whole tuple in one call
+_SOURCE_EXTENSIONS = (
+    '.py', '.js', '.ts', '.tsx', '.jsx', '.java', '.go', '.rs',
+    '.rb', '.php', '.cs', '.cpp', '.cc', '.c', '.h', '.hpp',
+    '.swift', '.kt', '.scala', '.ex', '.exs'
+)
+
+# Common words dropped from task descriptions (built once, not per call)
+_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were',
+    'implement', 'add', 'create', 'make', 'build', 'write', 'update',
+    'fix', 'change', 'modify', 'new', 'should', 'must', 'need', 'want'
+})
+
+# Keywords are ASCII ([a-zA-Z]+), so lowercasing raw bytes before decoding
+# finds the same keywords as str.lower() without its per-character Unicode work
+_ASCII_LOWER = bytes.maketrans(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ', b'abcdefghijklmnopqrstuvwxyz')
+
+
+def extract_keywords(task: str) -> List[str]:
+    """Extract meaningful keywords from task description."""
+    # Extract words
+    words = _WORD_RE.findall(task.lower())
+    
+    # Filter keywords
+    keywords = []
+    for word in words:
+        if word not in _STOP_WORDS and len(word) > 2:
+            keywords.append(word)
+            # Also add variations
+            if word.endswith('ing'):
+                base = word[:-3]
+                if len(base) > 2:
+                    keywords.append(base)
+            elif word.endswith('ed'):
+                base = word[:-2]
+                if len(base) > 2:
+                    keywords.append(base)
+
+    # Remove duplicates while preserving order
+    seen = set()
+    unique_keywords = []
+    for keyword in keywords:
+        if keyword not in seen:
+            seen.add(keyword)
+            unique_keywords.append(keyword)
+
+    return unique_keywords
+
+
+def keyword_coverage(keywords: List[str], content: str) -> float:
+    """Fraction of keywords that occur in content (0.0 to 1.0).
+
+    keywords come from extract_keywords() (computed once per task, not per
+    file); content must already be lowercased.
+    """
+    if not keywords:
+        return 0.0
+    return sum(1 for keyword in keywords if keyword in content) / len(keywords)
+
 
 class SimilarityFinder:
-    def find_similar(self, task: str, gitignore_patterns: set = None, max_files: int = 1000) -> List[Dict[str, Any]]:
-        """Find files similar to the given task."""
+    def find_similar(self, task: str, gitignore_patterns: set = None, max_files: int = 1000,
+                     cache=None) -> List[Dict[str, Any]]:
+        """Find files similar to the given task.
+
+        With a CacheManager, per-file scores for this keyword list are reused
+        across runs for files whose mtime and size are unchanged.
+        """
         if gitignore_patterns is None:
             gitignore_patterns = set()
 
         # Extract keywords from task
         keywords = self.extract_keywords(task)
         similar_files = []
-        file_count = 0
+        file_paths = []
 
         # Search for files containing keywords
+        # os.walk lists directories with os.scandir (no stat per entry)
         for root, dirs, files in os.walk("."):
-            # Filter out ignored directories
-            dirs[:] = [d for d in dirs if not self._should_ignore(os.path.join(root, d), gitignore_patterns)]
+            # Stop descending once the file budget is spent
+            if len(file_paths) >= max_files:
+                break
+
+            # Filter out ignored directories (root itself was already checked,
+            # so only the new name needs matching)
+            dirs[:] = [d for d in dirs if not self._should_ignore(d, gitignore_patterns)]
 
             for file in files:
-                if file_count >= max_files:
+                if len(file_paths) >= max_files:
                     break
 
                 # Only check source code files
                 if self._is_source_file(file):
-                    file_path = os.path.join(root, file)
-
-                    # Skip if path should be ignored
-                    if self._should_ignore(file_path, gitignore_patterns):
+                    # Skip if the file name should be ignored
+                    if self._should_ignore(file, gitignore_patterns):
                         continue
 
-                    file_count += 1
-                    similarity_score = self.calculate_similarity(file_path, keywords)
-                    
-                    if similarity_score > 0.3:  # 30% similarity threshold
-                        matched_keywords = self.get_matched_keywords(file_path, keywords)
-                        patterns = self.extract_patterns(file_path)
-                        
-                        similar_files.append({
-                            "file": file_path,
-                            "similarity": similarity_score,
-                            "matched_keywords": matched_keywords,
-                            "patterns": patterns
-                        })
-
-        # Sort by similarity score
-        similar_files.sort(key=lambda x: x["similarity"], reverse=True)
-        return similar_files[:5]  # Return top 5
+                    file_paths.append(os.path.join(root, file))
+
+        # Per-file scores from earlier runs with the same keywords
+        cache_key = "similarity_scores:" + " ".join(keywords)
+        cached_scores = (cache.get(cache_key) or {}) if cache else {}
+        scores = {}
+        to_read = []
+        for file_path in file_paths:
+            if cache:
+                try:
+                    st = os.stat(file_path)
+                except OSError:
+                    continue
+                signature = [st.st_mtime_ns, st.st_size]
+                entry = cached_scores.get(file_path)
+                if entry and entry.get("signature") == signature:
+                    scores[file_path] = entry
+                    continue
+                scores[file_path] = {"signature": signature}
+            to_read.append(file_path)
+
+        def read_file(file_path):
+            try:
+                with open(file_path, 'rb') as f:
+                    return f.read()
+            except Exception:
+                return None
+
+        # File reads release the GIL, so a small pool overlaps them (cold cache,
+        # network filesystems); scoring stays on this thread
+        workers = min(32, (os.cpu_count() or 1) * 4)
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            # Keep only a bounded window of reads in flight (not executor.map,
+            # which submits them all), so at most ~2x workers files sit in memory
+            pending = deque()
+            paths = iter(to_read)
+            for file_path in paths:
+                pending.append((file_path, executor.submit(read_file, file_path)))
+                if len(pending) >= workers * 2:
+                    break
+            while pending:
+                file_path, future = pending.popleft()
+                next_path = next(paths, None)
+                if next_path is not None:
+                    pending.append((next_path, executor.submit(read_file, next_path)))
+                raw = future.result()
+                if raw is None:
+                    scores.pop(file_path, None)
+                    continue
+                # Read each file once and share it between the passes below
+                content_lower = raw.translate(_ASCII_LOWER).decode('utf-8', errors='ignore')
+
+                entry = scores.setdefault(file_path, {})
+                entry["similarity"] = self.calculate_similarity(file_path, keywords, content_lower)
+
+                if entry["similarity"] > 0.3:  # 30% similarity threshold
+                    entry["matched_keywords"] = self.get_matched_keywords(file_path, keywords, content_lower)
+                    entry["patterns"] = self.extract_patterns(file_path, raw.decode('utf-8', errors='ignore'))
+        finally:
+            # Don't wait for queued reads if the caller's timeout fired mid-scan
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if cache:
+            cache.set(cache_key, scores)
+
+        # Collect in walk order so equal scores keep their order
+        for file_path in file_paths:
+            entry = scores.get(file_path)
+            if entry and entry["similarity"] > 0.3:
+                similar_files.append({
+                    "file": file_path,
+                    "similarity": entry["similarity"],
+                    "matched_keywords": entry["matched_keywords"],
+                    "patterns": entry["patterns"]
+                })
+
+        # Top 5 by similarity score (stable for ties, like the full sort it replaces)
+        return heapq.nlargest(5, similar_files, key=lambda x: x["similarity"])
 
     def extract_keywords(self, task: str) -> List[str]:
         """Extract meaningful keywords from task description."""
-        # Remove common words
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 
-            'implement', 'add', 'create', 'make', 'build', 'write', 'update',
-            'fix', 'change', 'modify', 'new', 'should', 'must', 'need', 'want'
-        }
-
-        # Extract words
-        words = re.findall(r'\b[a-zA-Z]+\b', task.lower())
-        
-        # Filter keywords
-        keywords = []
-        for word in words:
-            if word not in stop_words and len(word) > 2:
-                keywords.append(word)
-                # Also add variations
-                if word.endswith('ing'):
-                    base = word[:-3]
-                    if len(base) > 2:
-                        keywords.append(base)
-                elif word.endswith('ed'):
-                    base = word[:-2]
-                    if len(base) > 2:
-                        keywords.append(base)
-
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_keywords = []
-        for keyword in keywords:
-            if keyword not in seen:
-                seen.add(keyword)
-                unique_keywords.append(keyword)
-
-        return unique_keywords
-
-    def calculate_similarity(self, file_path: str, keywords: List[str]) -> float:
-        """Calculate similarity score between file and keywords."""
+        return extract_keywords(task)
+
+    def _read_file(self, file_path: str) -> str:
+        """Read a source file, ignoring undecodable bytes."""
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            return f.read()
+
+    def calculate_similarity(self, file_path: str, keywords: List[str], content: str = None) -> float:
+        """Calculate similarity score between file and keywords.
+
+        content is the lowercased file body; the file is read when it is None.
+        """
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read().lower()
+            if content is None:
+                content = self._read_file(file_path).lower()
                 
             # Calculate based on multiple factors
             scores = []
             
             # 1. Keyword presence score
             if keywords:
-                matched = sum(1 for keyword in keywords if keyword in content)
-                keyword_score = matched / len(keywords)
-                scores.append(keyword_score)
+                scores.append(keyword_coverage(keywords, content))
             
             # 2. Filename similarity
             filename = os.path.basename(file_path).lower()
-            filename_words = re.findall(r'\b[a-zA-Z]+\b', filename)
+            filename_words = _WORD_RE.findall(filename)
             if keywords and filename_words:
                 filename_matches = sum(1 for keyword in keywords if any(
                     keyword in word or word in keyword 
@@ -134,12 +248,12 @@ class SimilarityFinder:
         except Exception:
             return 0.0
 
-    def get_matched_keywords(self, file_path: str, keywords: List[str]) -> List[str]:
-        """Get list of keywords that matched in the file."""
+    def get_matched_keywords(self, file_path: str, keywords: List[str], content: str = None) -> List[str]:
+        """Get list of keywords that matched in the file (content: lowercased body)."""
         matched = []
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read().lower()
+            if content is None:
+                content = self._read_file(file_path).lower()
 
             for keyword in keywords:
                 if keyword in content:
@@ -150,27 +264,30 @@ class SimilarityFinder:
 
         return matched
 
-    def extract_patterns(self, file_path: str) -> List[str]:
-        """Extract notable patterns from a file."""
+    def extract_patterns(self, file_path: str, content: str = None) -> List[str]:
+        """Extract notable patterns from a file (content: body as read)."""
         patterns = []
         
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-                lines = content.split('\n')
+            if content is None:
+                content = self._read_file(file_path)
+            lines = content.split('\n')
 
             # Look for common patterns
             patterns_found = set()
             
             # Service/class definitions
             for line in lines:
-                if re.match(r'^class\s+\w+Service', line):
+                # The class-name regexes all need a line starting with 'class';
+                # one startswith() spares the other lines four regex calls
+                is_class = line.startswith('class')
+                if is_class and _SERVICE_CLASS_RE.match(line):
                     patterns_found.add("service layer pattern")
-                elif re.match(r'^class\s+\w+Repository', line):
+                elif is_class and _REPOSITORY_CLASS_RE.match(line):
                     patterns_found.add("repository pattern")
-                elif re.match(r'^class\s+\w+Factory', line):
+                elif is_class and _FACTORY_CLASS_RE.match(line):
                     patterns_found.add("factory pattern")
-                elif re.match(r'^class\s+\w+Controller', line):
+                elif is_class and _CONTROLLER_CLASS_RE.match(line):
                     patterns_found.add("controller pattern")
                 elif '@' in line and ('route' in line.lower() or 'app.' in line):
                     patterns_found.add("decorator-based routing")
@@ -208,13 +325,4 @@ class SimilarityFinder:
 
     def _is_source_file(self, filename: str) -> bool:
         """Check if file is a source code file."""
-        source_extensions = {
-            '.py', '.js', '.ts', '.tsx', '.jsx', '.java', '.go', '.rs',
-            '.rb', '.php', '.cs', '.cpp', '.cc', '.c', '.h', '.hpp',
-            '.swift', '.kt', '.scala', '.ex', '.exs'
-        }
-
-        for ext in source_extensions:
-            if filename.endswith(ext):
-                return True
-        return False
+        return filename.endswith(_SOURCE_EXTENSIONS)
@@ -8,6 +8,9 @@ Usage:
 """
 
 import argparse
+import contextlib
+import importlib.util
+import io
 import json
 import sqlite3
 import sys
@@ -236,14 +239,19 @@ def main():
             print(f"[INFO] Database not found at {args.db}, auto-initializing...", file=sys.stderr)
             init_script = PROJECT_ROOT / ".claude" / "skills" / "bazinga-db" / "scripts" / "init_db.py"
             if init_script.exists():
-                import subprocess
-                result = subprocess.run(
-                    [sys.executable, str(init_script), args.db],
-                    capture_output=True,
-                    text=True
-                )
-                if result.returncode != 0:
-                    print(f"ERROR: Database initialization failed: {result.stderr}", file=sys.stderr)
+                # Run init_db in-process (no second interpreter). Its progress
+                # output is captured and only shown if initialization fails;
+                # seeding happens below, so only the schema is created here
+                output = io.StringIO()
+                try:
+                    spec = importlib.util.spec_from_file_location("init_db", init_script)
+                    init_db = importlib.util.module_from_spec(spec)
+                    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+                        spec.loader.exec_module(init_db)
+                        Path(args.db).parent.mkdir(parents=True, exist_ok=True)
+                        init_db.init_database(args.db)
+                except (Exception, SystemExit) as e:
+                    print(f"ERROR: Database initialization failed: {output.getvalue()}{e}", file=sys.stderr)
                     sys.exit(1)
                 print(f"[INFO] Database initialized at {args.db}", file=sys.stderr)
             else:
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+Tests for the bazinga-db skill (BazingaDB client, CLI and init_db schema).
+
+Covers:
+- transaction() blocks are all-or-nothing
+- writers without retries still wait out a long-held write lock
+- upgrading a v19 database keeps its data and matches a fresh schema
+- hot read queries use the composite indexes
+- CLI smoke tests for the batch, field-projection, dashboard-stream and
+  rebuild-indexes commands
+- query works on database paths containing URI metacharacters
+- JSON payloads round-trip exactly like the stdlib json module, with or
+  without orjson (big integers, NaN/Infinity)
+- CLI JSON output stays ASCII-only (\\uXXXX escapes), whatever stdout encoding
+"""
+
+import contextlib
+import io
+import json
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Generator, List, Tuple
+
+import pytest
+
+# Add the bazinga-db scripts directory to path for imports
+SCRIPTS_DIR = Path(__file__).parent.parent / '.claude' / 'skills' / 'bazinga-db' / 'scripts'
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import bazinga_db
+from bazinga_db import BazingaDB, TransactionAbortedError
+import init_db
+
+SCRIPT_PATH = SCRIPTS_DIR / 'bazinga_db.py'
+V19_SCHEMA = Path(__file__).parent / 'fixtures' / 'bazinga_db_v19.sql'
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def db(tmp_path: Path) -> Generator[BazingaDB, None, None]:
+    """A BazingaDB on a fresh (auto-initialized) database with one session."""
+    client = BazingaDB(str(tmp_path / 'bazinga.db'), quiet=True)
+    client.create_session('s1', 'simple', 'Test requirements')
+    yield client
+    client.close()
+
+
+def run_init_db(db_path: Path) -> None:
+    """Run init_db.init_database() without its progress output."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        init_db.init_database(str(db_path))
+
+
+def schema_of(db_path: Path) -> Dict[Tuple[str, str], str]:
+    """Map (type, name) -> whitespace/quote-normalized SQL for every schema object."""
+    conn = sqlite3.connect(str(db_path))
+    try:
+        rows = conn.execute(
+            "SELECT type, name, sql FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'"
+        ).fetchall()
+    finally:
+        conn.close()
+    # Table rebuilds (ALTER TABLE ... RENAME) leave the table name quoted
+    return {(t, n): re.sub(r'\s+', ' ', sql or '').replace('"', '').strip() for t, n, sql in rows}
+
+
+def run_cli(db_path: Path, *args: str, env: Dict[str, str] = None) -> subprocess.CompletedProcess:
+    """Run bazinga_db.py against db_path and return the completed process."""
+    full_env = os.environ.copy()
+    if env:
+        full_env.update(env)
+    return subprocess.run(
+        [sys.executable, str(SCRIPT_PATH), '--db', str(db_path), '--quiet', *args],
+        capture_output=True,
+        text=True,
+        env=full_env,
+    )
+
+
+# ============================================================================
+# transaction()
+# ============================================================================
+
+class TestTransaction:
+    """transaction() commits every write in the block or none of them."""
+
+    def test_commits_all_writes(self, db: BazingaDB):
+        with db.transaction():
+            db.save_state('s1', 'orchestrator', {'phase': 1})
+            db.log_tokens('s1', 'developer', 100)
+
+        assert db.get_latest_state('s1', 'orchestrator') == {'phase': 1}
+        assert db.get_token_summary('s1')['total'] == 100
+
+    def test_failed_member_undoes_whole_block(self, db: BazingaDB):
+        """A writer that fails inside the block must not commit its neighbours."""
+        with pytest.raises(TransactionAbortedError):
+            with db.transaction():
+                db.save_state('s1', 'orchestrator', {'phase': 1})
+                # Unknown session: FOREIGN KEY constraint fails, writer returns an error
+                result = db.log_interaction('no_such_session', 'developer', 'content')
+                assert result['success'] is False
+                db.log_tokens('s1', 'developer', 100)
+
+        assert db.get_latest_state('s1', 'orchestrator') is None
+        assert db.get_token_summary('s1')['total'] == 0
+
+    def test_self_committing_writer_is_deferred(self, db: BazingaDB):
+        """Writers that commit directly (create_task_group) join the block too."""
+        with pytest.raises(ValueError):
+            with db.transaction():
+                assert db.create_task_group('g1', 's1', 'Group 1')['success']
+                raise ValueError("abort block")
+
+        assert db.get_task_groups('s1') == []
+
+    def test_usable_after_aborted_block(self, db: BazingaDB):
+        with pytest.raises(TransactionAbortedError):
+            with db.transaction():
+                db.log_interaction('no_such_session', 'developer', 'content')
+
+        db.save_state('s1', 'orchestrator', {'phase': 2})
+        assert db.get_latest_state('s1', 'orchestrator') == {'phase': 2}
+
+    def test_nested_blocks_rejected(self, db: BazingaDB):
+        with db.transaction():
+            with pytest.raises(RuntimeError):
+                with db.transaction():
+                    pass
+
+
+# ============================================================================
+# JSON codec
+# ============================================================================
+
+# Values orjson cannot represent the way the stdlib does
+EXACT_JSON_CASES = [
+    '{"big": 123456789012345678901234567890}',
+    '{"neg": -9223372036854775809}',
+    '{"x": NaN, "y": Infinity, "z": -Infinity}',
+    '{"plain": [1, 2.5, null, "caf\\u00e9", {"n": 18446744073709551615}]}',
+]
+
+
+class TestJsonCodec:
+    """_json_loads/_json_dumps give the stdlib's results whether or not orjson is installed."""
+
+    @pytest.mark.parametrize('text', EXACT_JSON_CASES)
+    def test_loads_matches_stdlib(self, text: str):
+        assert repr(bazinga_db._json_loads(text)) == repr(json.loads(text))
+
+    @pytest.mark.parametrize('text', EXACT_JSON_CASES)
+    def test_dumps_matches_stdlib(self, text: str):
+        obj = json.loads(text)
+
+        assert bazinga_db._json_dumps(obj, pretty=True) == json.dumps(obj, indent=2)
+        assert repr(json.loads(bazinga_db._json_dumps(obj))) == repr(obj)
+
+    def test_invalid_json_raises_json_decode_error(self):
+        with pytest.raises(json.JSONDecodeError):
+            bazinga_db._json_loads('{"x": }')
+
+    @pytest.mark.parametrize('text', EXACT_JSON_CASES)
+    def test_state_round_trip(self, db: BazingaDB, text: str):
+        state = json.loads(text)
+        db.save_state('s1', 'pm', state)
+
+        assert repr(db.get_latest_state('s1', 'pm')) == repr(state)
+
+
+# ============================================================================
+# Lock waits
+# ============================================================================
+
+class TestBusyTimeout:
+    """Writers that commit directly rely on busy_timeout alone."""
+
+    def test_busy_timeout_covers_non_retried_writers(self):
+        assert BazingaDB.BUSY_TIMEOUT_MS >= 30000
+
+    def test_update_waits_for_held_write_lock(self, db: BazingaDB):
+        db.create_task_group('g1', 's1', 'Group 1')
+        db.close()
+
+        locked = threading.Event()
+
+        def hold_write_lock():
+            other = sqlite3.connect(db.db_path)
+            try:
+                other.execute("BEGIN IMMEDIATE")
+                locked.set()
+                time.sleep(6)  # Longer than the old 5s busy_timeout
+                other.rollback()
+            finally:
+                other.close()
+
+        holder = threading.Thread(target=hold_write_lock)
+        holder.start()
+        try:
+            assert locked.wait(5)
+            result = db.update_task_group('g1', 's1', status='completed')
+        finally:
+            holder.join()
+
+        assert result['success'] is True
+        assert db.get_task_groups('s1')[0]['status'] == 'completed'
+
+
+# ============================================================================
+# Schema migrations
+# ============================================================================
+
+class TestMigrationFromV19:
+    """init_database() upgrades a v19 database to the current schema in place."""
+
+    @pytest.fixture
+    def v19_db(self, tmp_path: Path) -> Path:
+        db_path = tmp_path / 'v19.db'
+        conn = sqlite3.connect(str(db_path))
+        conn.executescript(V19_SCHEMA.read_text())
+        conn.executescript("""
+            INSERT INTO sessions (session_id, mode, original_requirements)
+                VALUES ('s1', 'parallel', 'Build it');
+            INSERT INTO task_groups (id, session_id, name, status, speckit_task_ids)
+                VALUES ('A', 's1', 'Group A', 'in_progress', '["T001"]'),
+                       ('B', 's1', 'Group B', 'completed', NULL);
+            INSERT INTO orchestration_logs (session_id, agent_type, content, iteration)
+                VALUES ('s1', 'developer', 'first', 1), ('s1', 'qa_expert', 'second', 1);
+            INSERT INTO state_snapshots (session_id, state_type, state_data)
+                VALUES ('s1', 'orchestrator', '{"phase": 3}');
+            INSERT INTO token_usage (session_id, agent_type, agent_id, tokens_estimated)
+                VALUES ('s1', 'developer', 'dev-1', 120), ('s1', 'qa_expert', NULL, 30);
+            INSERT INTO skill_outputs (session_id, skill_name, output_data, agent_type)
+                VALUES ('s1', 'lint-check', '{"status": "pass"}', 'developer');
+        """)
+        conn.commit()
+        conn.close()
+        return db_path
+
+    def test_upgrade_reaches_current_version(self, v19_db: Path):
+        run_init_db(v19_db)
+
+        conn = sqlite3.connect(str(v19_db))
+        try:
+            assert conn.execute("SELECT MAX(version) FROM schema_version").fetchone()[0] == init_db.SCHEMA_VERSION
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == init_db.SCHEMA_VERSION
+            assert conn.execute("PRAGMA integrity_check").fetchone()[0] == 'ok'
+            assert conn.execute("PRAGMA foreign_key_check").fetchall() == []
+        finally:
+            conn.close()
+
+    def test_upgraded_schema_matches_fresh_database(self, v19_db: Path, tmp_path: Path):
+        fresh = tmp_path / 'fresh.db'
+        run_init_db(fresh)
+        run_init_db(v19_db)
+
+        assert schema_of(v19_db) == schema_of(fresh)
+
+    def test_upgrade_preserves_data(self, v19_db: Path):
+        run_init_db(v19_db)
+
+        db = BazingaDB(str(v19_db), quiet=True)
+        try:
+            groups = {g['id']: g for g in db.get_task_groups('s1')}
+            assert set(groups) == {'A', 'B'}
+            assert groups['A']['status'] == 'in_progress'
+            assert groups['A']['speckit_task_ids'] == '["T001"]'
+            assert sorted(log['content'] for log in db.get_logs('s1')) == ['first', 'second']
+            assert db.get_latest_state('s1', 'orchestrator') == {'phase': 3}
+            assert db.get_token_summary('s1')['total'] == 150
+            assert db.get_skill_output('s1', 'lint-check') == {'status': 'pass'}
+        finally:
+            db.close()
+
+    def test_rerun_is_a_no_op(self, v19_db: Path):
+        run_init_db(v19_db)
+        before = schema_of(v19_db)
+        run_init_db(v19_db)
+
+        assert schema_of(v19_db) == before
+
+
+# ============================================================================
+# Query plans
+# ============================================================================
+
+class TestQueryPlans:
+    """The hot read predicates are answered from the composite indexes."""
+
+    @staticmethod
+    def plan(db: BazingaDB, sql: str, params: Tuple) -> str:
+        conn = db._get_connection()
+        return ' | '.join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+
+    @pytest.mark.parametrize('sql, params, index', [
+        ("SELECT * FROM orchestration_logs WHERE session_id = ? AND agent_type = ? "
+         "ORDER BY timestamp DESC LIMIT 10", ('s1', 'developer'), 'idx_logs_session_agent_ts'),
+        ("SELECT * FROM task_groups WHERE session_id = ? AND status = ? ORDER BY created_at",
+         ('s1', 'pending'), 'idx_taskgroups_session_status'),
+    ])
+    def test_uses_composite_index(self, db: BazingaDB, sql: str, params: Tuple, index: str):
+        plan = self.plan(db, sql, params)
+
+        assert index in plan
+        assert 'USE TEMP B-TREE' not in plan
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+class TestCLI:
+    """Smoke tests for the bazinga_db.py commands added on top of the v19 CLI."""
+
+    @pytest.fixture
+    def db_path(self, tmp_path: Path) -> Path:
+        db_path = tmp_path / 'bazinga.db'
+        result = run_cli(db_path, 'create-session', 's1', 'simple', 'Test requirements')
+        assert result.returncode == 0, result.stderr
+        return db_path
+
+    @staticmethod
+    def ok(result: subprocess.CompletedProcess) -> str:
+        assert result.returncode == 0, result.stderr
+        return result.stdout
+
+    def test_batch_runs_commands_in_one_transaction(self, db_path: Path):
+        commands: List[List[str]] = [
+            ['save-state', 's1', 'orchestrator', '{"phase": 1}'],
+            ['log-tokens', 's1', 'developer', '50'],
+        ]
+        out = json.loads(self.ok(run_cli(db_path, 'batch', json.dumps(commands))))
+
+        # One document, with each command's own output collected in order
+        assert out['success'] is True
+        assert out['commands'] == 2
+        assert out['results'][0]['success'] is True
+        assert out['results'][0]['state_type'] == 'orchestrator'
+        assert json.loads(self.ok(run_cli(db_path, 'get-state', 's1', 'orchestrator'))) == {'phase': 1}
+
+    @pytest.mark.parametrize('failing', [
+        ['log-interaction', 'no_such_session', 'developer', 'content'],
+        ['log-tokens', 's1', 'developer', 'notanint'],
+    ])
+    def test_batch_rolls_back_on_failed_command(self, db_path: Path, failing: List[str]):
+        commands = [
+            ['save-state', 's1', 'orchestrator', '{"phase": 1}'],
+            ['log-interaction', 's1', 'developer', 'content'],
+            failing,
+        ]
+        result = run_cli(db_path, 'batch', json.dumps(commands))
+
+        assert result.returncode == 1
+        # Only the rollback error is printed, not the earlier members' success results
+        out = json.loads(result.stdout)
+        assert out['success'] is False
+        assert out['failed_index'] == 2
+        assert json.loads(self.ok(run_cli(db_path, 'get-state', 's1', 'orchestrator'))) is None
+        logs = json.loads(self.ok(run_cli(db_path, 'query', 'SELECT COUNT(*) AS n FROM orchestration_logs')))
+        assert logs == [{'n': 0}]
+
+    def test_batch_rejects_unsupported_command(self, db_path: Path):
+        result = run_cli(db_path, 'batch', json.dumps([['create-task-group', 'g1', 's1', 'G']]))
+
+        assert result.returncode == 1
+        assert 'not allowed in batch' in result.stderr
+
+    def test_log_interactions_batch(self, db_path: Path, tmp_path: Path):
+        entries = tmp_path / 'logs.json'
+        entries.write_text(json.dumps([
+            {'agent_type': 'developer', 'content': 'one', 'iteration': 1},
+            {'agent_type': 'qa_expert', 'content': 'two', 'agent_id': 'qa-1'},
+        ]))
+        out = json.loads(self.ok(run_cli(db_path, 'log-interactions-batch', 's1', '--file', str(entries))))
+
+        assert out['success'] is True
+        assert out['count'] == 2
+
+    def test_log_tokens_batch(self, db_path: Path):
+        entries = [{'agent_type': 'developer', 'tokens': 10}, {'agent_type': 'qa_expert', 'tokens': 5}]
+        self.ok(run_cli(db_path, 'log-tokens-batch', 's1', json.dumps(entries)))
+
+        summary = json.loads(self.ok(run_cli(db_path, 'token-summary', 's1')))
+        assert summary['total'] == 15
+
+    def test_get_state_field(self, db_path: Path):
+        self.ok(run_cli(db_path, 'save-state', 's1', 'pm', '{"phase": 2, "groups": ["A", "B"]}'))
+
+        assert json.loads(self.ok(run_cli(db_path, 'get-state-field', 's1', 'pm', '$.phase'))) == 2
+        assert json.loads(self.ok(run_cli(db_path, 'get-state-field', 's1', 'pm', '$.groups'))) == ['A', 'B']
+        assert json.loads(self.ok(run_cli(db_path, 'get-state-field', 's1', 'pm', '$.missing'))) is None
+
+    def test_get_skill_output_field_and_has_skill_output(self, db_path: Path):
+        assert json.loads(self.ok(run_cli(db_path, 'has-skill-output', 's1', 'lint-check'))) is False
+        self.ok(run_cli(db_path, 'save-skill-output', 's1', 'lint-check', '{"status": "pass", "issues": 0}'))
+
+        assert json.loads(self.ok(run_cli(db_path, 'has-skill-output', 's1', 'lint-check'))) is True
+        assert json.loads(self.ok(run_cli(db_path, 'get-skill-output-field', 's1', 'lint-check', '$.status'))) == 'pass'
+
+    def test_dashboard_stream_is_ndjson(self, db_path: Path):
+        lines = self.ok(run_cli(db_path, 'dashboard-stream', 's1')).splitlines()
+        records = [json.loads(line) for line in lines]
+
+        kinds = [r['kind'] for r in records]
+        assert kinds[0] == 'session'
+        assert {'task_groups', 'token_summary', 'recent_logs'} <= set(kinds)
+        assert records[0]['data']['session_id'] == 's1'
+
+    def test_rebuild_indexes_restores_dropped_index(self, db_path: Path):
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("DROP INDEX idx_logs_session_agent_ts")
+        conn.commit()
+        conn.close()
+
+        out = json.loads(self.ok(run_cli(db_path, 'rebuild-indexes')))
+
+        assert out['success'] is True
+        conn = sqlite3.connect(str(db_path))
+        try:
+            assert conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_logs_session_agent_ts'"
+            ).fetchone() is not None
+        finally:
+            conn.close()
+
+    def test_save_state_keeps_exact_values(self, db_path: Path):
+        text = '{"big": 123456789012345678901234567890, "x": NaN}'
+        self.ok(run_cli(db_path, 'save-state', 's1', 'pm', text))
+
+        out = self.ok(run_cli(db_path, 'get-state', 's1', 'pm'))
+        assert out == json.dumps(json.loads(text), indent=2) + '\n'
+
+    @pytest.mark.parametrize('dirname', ['a#b', 'a?b', 'a%20b'])
+    def test_query_on_path_with_uri_metacharacters(self, tmp_path: Path, dirname: str):
+        db_path = tmp_path / dirname / 'bazinga.db'
+        db_path.parent.mkdir()
+        self.ok(run_cli(db_path, 'create-session', 's1', 'simple', 'Test requirements'))
+
+        out = self.ok(run_cli(db_path, 'query', 'SELECT session_id FROM sessions'))
+
+        assert json.loads(out) == [{'session_id': 's1'}]
+        # Nothing opened (and created) a truncated path next to the real one
+        assert sorted(p.name for p in tmp_path.iterdir()) == [dirname]
+
+    def test_output_is_ascii_escaped(self, db_path: Path):
+        state = {'note': 'café ☕ 𝄞'}
+        self.ok(run_cli(db_path, 'save-state', 's1', 'pm', json.dumps(state, ensure_ascii=False)))
+
+        # An ASCII-only stdout must not raise UnicodeEncodeError
+        ascii_env = {'PYTHONIOENCODING': 'ascii'}
+        out = self.ok(run_cli(db_path, 'get-state', 's1', 'pm', env=ascii_env))
+        assert out == json.dumps(state, indent=2) + '\n'
+
+        stream = self.ok(run_cli(db_path, 'dashboard-stream', 's1', env=ascii_env))
+        assert stream.isascii()
+        assert [r['data'] for r in map(json.loads, stream.splitlines())
+                if r['kind'] == 'pm_state'] == [state]